@@ -1,5 +1,6 @@
 import pytest
 import os
+import pickle
 
 from titan.agent import *
 
@@ -33,6 +34,60 @@ def test_agent_init(make_agent):
     assert a.hiv.aids is False
 
 
+@pytest.mark.unit
+def test_agent_slots(make_agent, make_relationship):
+    a = make_agent()
+    assert isinstance(a, Agent)
+    assert not hasattr(a, "__dict__")
+    assert not hasattr(a.hiv, "__dict__")
+    assert not hasattr(a.prep, "__dict__")
+    assert "hiv" in type(a).__slots__
+
+    with pytest.raises(AttributeError):
+        a.not_an_attr = 1
+
+    rel = make_relationship(a, make_agent())
+    assert not hasattr(rel, "__dict__")
+
+
+@pytest.mark.unit
+def test_agent_pickle(make_agent, make_relationship):
+    a = make_agent()
+    b = make_agent()
+    make_relationship(a, b)
+    a.hiv.active = True
+    a.prep.active = True
+
+    a_copy = pickle.loads(pickle.dumps(a))
+    assert type(a_copy) is Agent.get_extras_class()
+    assert a_copy.id == a.id
+    assert a_copy.race == a.race
+    assert a_copy.hiv.active
+    assert a_copy.hiv.agent is a_copy
+    assert a_copy.prep.active
+    assert a_copy.has_partners()
+    assert next(a_copy.iter_partners()).id == b.id
+
+
+@pytest.mark.unit
+def test_disabled_features(make_agent, world_location):
+    world_location.params.features.random_trial = False
+    a = make_agent()
+    b = make_agent()
+
+    # disabled features share a null instance which ignores writes
+    assert a.random_trial.is_null
+    assert a.random_trial is b.random_trial
+    assert a.random_trial.active is False
+    a.random_trial.active = True
+    assert a.random_trial.active is False
+
+    # enabled features are created on first use
+    assert not a.prep.is_null
+    assert a.prep.agent is a
+    assert a.prep is not b.prep
+
+
 @pytest.mark.unit
 def test_get_partners(make_agent):
     a = make_agent()
@@ -148,6 +203,118 @@ def test_relationship(make_agent, make_relationship):
     assert r2 in p2.relationships
 
 
+@pytest.mark.unit
+def test_relationship_store(make_agent, make_relationship):
+    a = make_agent()
+    a.partners["Sex"] = set()
+    p1 = make_agent()
+    p1.partners["Sex"] = set()
+    p2 = make_agent()
+    p2.partners["Sex"] = set()
+    r1 = make_relationship(a, p1)
+    r2 = make_relationship(a, p2)
+
+    store = RelationshipStore(["Inj", "Sex"], capacity=1)
+    store.add(r1)
+    store.add(r2)
+    assert len(store) == 2
+    assert len(store.rels) == 2
+    assert r1.store is store
+    assert store.bond[r1.index] == 1
+    assert store.end_time[r2.index] == 2
+    assert r1.duration == 2
+    assert r1.total_duration == 2
+    assert store.ending() == []
+
+    store.advance()
+    assert r1.duration == 1
+    assert r2.duration == 1
+    assert r1.total_duration == 2
+    assert store.ending() == []
+
+    # ends on the next time step
+    r2.duration = 0
+    assert store.end_time[r2.index] == 1
+    assert store.ending() == [r2]
+
+    store.advance()
+    assert r1.duration == 0
+    assert r2.duration == -1
+    assert set(store.ending()) == {r1, r2}
+
+    # remaining duration is kept once removed
+    store.remove(r2)
+    assert r2.store is None
+    assert r2.duration == -1
+    assert r2.bond_type == "Sex"
+
+    store.advance()
+    assert r1.duration == -1
+    assert store.ending() == [r1]
+    assert len(store) == 1
+
+    # rows are reused
+    r2.duration = 3
+    store.add(r2)
+    assert len(store.rels) == 2
+    assert r2.duration == 3
+
+    assert r1.progress()
+    assert r1 not in a.relationships
+
+
+@pytest.mark.unit
+def test_relationship_store_bond_types(make_agent):
+    a = make_agent(DU="Inj")
+    p1 = make_agent(DU="Inj")
+    p2 = make_agent()
+    p3 = make_agent()
+    r1 = Relationship(a, p1, 2, "Inj")
+    r2 = Relationship(a, p2, 2, "Sex")
+    r3 = Relationship(a, p3, 2, "Inj")
+
+    store = RelationshipStore(["Sex", "Inj", "SexInj"])
+    assert list(store.iter_bond_types()) == []
+
+    for rel in (r1, r2, r3):
+        store.add(rel)
+    store.remove(r2)
+    assert list(store.iter_bond_types()) == [("Inj", [r1, r3])]
+
+    store.add(r2)
+    assert list(store.iter_bond_types()) == [("Sex", [r2]), ("Inj", [r1, r3])]
+
+
+@pytest.mark.unit
+def test_agent_demographics(make_agent):
+    a = make_agent(SO="MSM", race="white", DU="None")
+    demographics = a.demographics
+    assert demographics is a.location.tables.demographics["white", "MSM", "None"]
+    assert demographics.drug_type is a.location.tables.drug_type["white", "MSM", "None"]
+
+    # follows changes to the agent's attributes
+    a.drug_type = "Inj"
+    assert (
+        a.demographics.drug_type is a.location.tables.drug_type["white", "MSM", "Inj"]
+    )
+    assert a.demographics.sex_type is demographics.sex_type
+
+    # and to the location's tables
+    a.location.params_changed()
+    assert a.demographics is a.location.tables.demographics["white", "MSM", "Inj"]
+    assert a.demographics.sex_type is not demographics.sex_type
+
+    # the lookup is cached until then
+    tables = a.location.tables
+    a.location.tables.demographics["white", "MSM", "Inj"] = demographics
+    assert a.demographics is not demographics
+    a.age += 1
+    assert a.demographics is not demographics
+    a.race = "white"
+    assert a.demographics is demographics
+    assert a.cached_tables is tables
+
+
 @pytest.mark.unit
 def test_get_partner(make_agent, make_relationship):
     a = make_agent()
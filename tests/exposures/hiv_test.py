@@ -132,3 +132,52 @@ def test_get_acute_status(make_agent, make_model):
     assert a.hiv.get_acute_status(model.time + 2) is False
     a.hiv.convert(model)
     assert a.hiv.get_acute_status(model.time + 2) is True
+
+
+@pytest.mark.unit
+def test_hiv_update_pop(make_model, params, monkeypatch):
+    params.model.seed.counter_based = True
+    params.demographics.white.sex_type.MSM.drug_type.Inj.hiv.dx.prob = 0.5
+    params.demographics.black.sex_type.MSM.drug_type.Inj.hiv.dx.prob = 0.5
+    params.hiv.aids.prob = 0.5
+    model = make_model(params)
+    model.time = model.params.hiv.start_time
+    agents = list(HIV.agents)
+    assert agents
+
+    def get_state():
+        counts = {race: dict(counts) for race, counts in HIV.dx_counts.items()}
+        return counts, [(a.hiv.dx, a.hiv.dx_time, a.hiv.aids) for a in agents]
+
+    def set_state(state):
+        counts, agent_states = state
+        HIV.dx_counts = {race: dict(c) for race, c in counts.items()}
+        for a, (dx, dx_time, aids) in zip(agents, agent_states):
+            a.hiv.dx, a.hiv.dx_time, a.hiv.aids = dx, dx_time, aids
+        model.entity_streams = {}
+
+    init_state = get_state()
+    for a in agents:
+        a.hiv.update_agent(model)
+    agent_state = get_state()
+    assert agent_state != init_state
+
+    # vectorized updates get the same values with counter based random numbers
+    set_state(init_state)
+    monkeypatch.setattr(HIV, "vectorized", True)
+    for a in agents:
+        a.hiv.update_agent(model)  # no-op when vectorized
+    assert get_state() == init_state
+    HIV.update_pop(model)
+    assert get_state() == agent_state
+
+    # dx counts stay consistent with the diagnosed agents
+    set_state(init_state)
+    model.use_counter_random = False
+    HIV.update_pop(model)
+    assert sum(sum(c.values()) for c in HIV.dx_counts.values()) == sum(
+        a.hiv.dx for a in agents
+    )
+    for a in agents:
+        if a.hiv.dx and not init_state[1][agents.index(a)][0]:
+            assert a.hiv.dx_time == model.time
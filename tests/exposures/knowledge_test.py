@@ -58,6 +58,16 @@ def test_knowledge_convert(make_model, make_agent):
     assert a.knowledge.active
     assert a.prep.active
 
+    # the feature knowledge initiates is disabled where the agent lives
+    a.location.params.features.prep = False
+    b = make_agent()
+    b.knowledge.opinion = 5
+    b.knowledge.convert(model)
+
+    assert b.knowledge.active
+    assert b.prep.is_null
+    assert not b.prep.active
+
 
 @pytest.mark.unit
 def test_knowledge_influence(make_model, make_agent):
@@ -54,6 +54,29 @@ def test_update_high_risk(make_model, make_agent, make_relationship):
     assert a.get_num_partners() < 5
 
 
+@pytest.mark.unit
+def test_update_partner_numbers(make_model, make_agent):
+    model = make_model()
+    model.pop.np_random = FakeRandom(0)  # poisson draws return the mean
+    a = make_agent()
+    model.pop.add_agent(a)
+    bond_types = model.params.classes.bond_types
+    assert all(a not in model.pop.partner_deficits[bond] for bond in bond_types)
+
+    # the partner deficits follow the new targets
+    a.high_risk.update_partner_numbers(model.pop, 2)
+    assert a.target_partners["Sex"] == 2
+    for bond in bond_types:
+        assert (a in model.pop.partner_deficits[bond]) == (
+            len(a.partners[bond]) < a.target_partners[bond]
+        )
+    assert a in model.pop.partner_deficits["Sex"]
+
+    a.high_risk.update_partner_numbers(model.pop, -2)
+    assert a.target_partners["Sex"] == 0
+    assert all(a not in model.pop.partner_deficits[bond] for bond in bond_types)
+
+
 @pytest.mark.unit
 def test_update_high_risk_incar(make_model, make_agent, make_relationship):
     model = make_model()
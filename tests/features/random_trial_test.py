@@ -3,12 +3,13 @@ import networkx as nx  # type: ignore
 
 from conftest import FakeRandom
 
-from titan.features import RandomTrial
+from titan.features import RandomTrial, Prep
 
 
 @pytest.mark.unit
 def test_initialize_random_trial_prep_all(make_model, params):
     params.features.prep = True
+    params.features.random_trial = True
     params.vaccine.on_init = False
     params.prep.cap = 0
     params.random_trial.choice = "all"
@@ -23,9 +24,37 @@ def test_initialize_random_trial_prep_all(make_model, params):
             assert agent.prep.active
 
 
+@pytest.mark.unit
+def test_initialize_random_trial_prep_disabled_agents(make_model, params):
+    params.features.prep = True
+    params.features.random_trial = True
+    params.vaccine.on_init = False
+    params.prep.cap = 0
+    params.random_trial.choice = "all"
+    model = make_model(params)
+    model.run_random = FakeRandom(-0.1)
+    model.time = model.params.random_trial.start_time
+
+    # agents in a location where prep is disabled can't be treated
+    disabled = list(model.pop.all_agents)[::2]
+    for agent in disabled:
+        agent.prep = Prep.get_null()
+
+    RandomTrial.update_pop(model)
+    for agent in model.pop.all_agents:
+        assert agent.random_trial.active
+        if agent in disabled:
+            assert not agent.random_trial.treated
+            assert not agent.prep.active
+        elif not agent.hiv.active:
+            assert agent.random_trial.treated
+            assert agent.prep.active
+
+
 @pytest.mark.unit
 def test_initialize_random_trial_prep_eigenvector(make_model, params):
     params.features.prep = True
+    params.features.random_trial = True
     params.vaccine.on_init = False
     params.prep.cap = 0
     params.hiv.start_time = 5
@@ -52,6 +81,7 @@ def test_initialize_random_trial_prep_eigenvector(make_model, params):
 @pytest.mark.unit
 def test_initialize_random_trial_prep_random(make_model, params):
     params.features.prep = True
+    params.features.random_trial = True
     params.vaccine.on_init = False
     params.prep.cap = 0
     params.hiv.start_time = 5
@@ -78,6 +108,7 @@ def test_initialize_random_trial_prep_random(make_model, params):
 @pytest.mark.unit
 def test_initialize_random_trial_pca_bridge(make_model, params):
     # knowledge bridge trial
+    params.features.random_trial = True
     params.random_trial.treatment = "knowledge"
     params.hiv.start_time = 5
     model = make_model(params)
@@ -110,6 +110,38 @@ def test_model_reproducible(tmpdir):
         assert res_a[i]["hiv_aids"] == res_b[i]["hiv_aids"]
 
 
+@pytest.mark.integration_deterministic
+def test_model_reproducible_hash_seed(tmpdir):
+    """
+    Does a seeded population come out the same whatever the hash seed (i.e. doesn't depend on the iteration order of sets of strings)
+    """
+    param_file = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "params", "integration_base.yml"
+    )
+    script = "\n".join(
+        [
+            "import sys",
+            "from titan.parse_params import create_params",
+            "from titan.population import Population",
+            "params = create_params('philly-gis', sys.argv[1], sys.argv[2])",
+            "params.model.num_pop = 500",
+            "pop = Population(params)",
+            "print(sorted((r.agent1.id, r.agent2.id, r.bond_type) for r in pop.relationships))",
+        ]
+    )
+
+    outputs = []
+    for hash_seed in ("1", "2"):
+        env = dict(os.environ, PYTHONHASHSEED=hash_seed)
+        outputs.append(
+            subprocess.check_output(
+                [sys.executable, "-c", script, param_file, str(tmpdir)], env=env
+            )
+        )
+
+    assert outputs[0] == outputs[1]
+
+
 @pytest.mark.integration_deterministic
 def test_model_pop_write_read(tmpdir):
     path_a = tmpdir.mkdir("a")
@@ -22,7 +22,6 @@ def test_sex_transmission(make_model, make_agent):
     a.hiv.active = True
     a.hiv.time = model.time  # acute
 
-    rel.total_sex_acts = 0
     model.params.calibration.acquisition = 10
 
     model.params.calibration.acquisition = 5
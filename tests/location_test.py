@@ -29,6 +29,52 @@ def test_location_init(params):
     assert len(world.neighbors) == 0
 
 
+@pytest.mark.unit
+def test_location_params_layer(params):
+    world = Location("world", params.classes.locations.world, params)
+
+    # only the branches leading to the override are copied
+    assert world.params is not params
+    assert world.params.prep is params.prep
+    assert world.params.demographics.black is params.demographics.black
+    assert world.params.demographics.white is not params.demographics.white
+    assert (
+        world.params.demographics.white.sex_type.WSW.drug_type.Inj
+        is params.demographics.white.sex_type.WSW.drug_type.Inj
+    )
+
+    # shared values read through to the model params
+    params.prep.cap = 0.9
+    assert world.params.prep.cap == 0.9
+
+
+@pytest.mark.unit
+def test_location_tables(params):
+    world = Location("world", params.classes.locations.world, params)
+
+    dt_params = world.tables.drug_type["white", "WSW", "NonInj"]
+    assert dt_params.hiv.aids.init == 1.0
+    assert world.tables.sex_type["white", "WSW"].drug_type.NonInj is dt_params
+    assert (
+        world.tables.race["white"].sex_type.WSW is world.tables.sex_type["white", "WSW"]
+    )
+
+    # tables are frozen copies, recompiled when the params are written to
+    with pytest.raises(AttributeError):
+        dt_params.hiv.aids.init = 0.5
+
+    world.params.demographics.white.sex_type.WSW.drug_type.NonInj.hiv.aids.init = 0.5
+    assert world.tables.drug_type["white", "WSW", "NonInj"].hiv.aids.init == 0.5
+    tables = world.tables
+    assert world.tables is tables
+
+    # but not when other params or locations change
+    params.classes.components = ["-1", "0"]
+    params.prep.cap = 0.5
+    Location("world", params.classes.locations.world, params)
+    assert world.tables is tables
+
+
 @pytest.mark.unit
 def test_location_init_error(params):
     location = "world"
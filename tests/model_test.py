@@ -150,6 +150,33 @@ def test_dropout_all(make_model, params):
             assert agents == []
 
 
+@pytest.mark.unit
+def test_exit_sparse(make_model, params):
+    params.model.sparse_events = True
+    params.exit_enter = ObjMap(
+        {
+            "age": {"exit_class": "age_out", "entry_class": "none"},
+            "dropout": {"exit_class": "migrate", "entry_class": "none"},
+        }
+    )
+    params.classes.exit.age_out.age = 45
+    model = make_model(params)
+    assert model.use_sparse_events
+    init_ppl = copy(model.pop.all_agents.members)
+
+    for location in model.pop.geography.locations.values():
+        for race in location.params.demographics.values():
+            for sex_type in race.sex_type.values():
+                for drug_type in sex_type.drug_type.values():
+                    drug_type.exit.migrate.prob = 1.0
+
+    model.exit()
+    assert not model.pop.all_agents.members
+    # agents only exit once, by the first exit class they meet
+    assert set(model.exits["age_out"]) == {a for a in init_ppl if a.age > 45}
+    assert set(model.exits["migrate"]) == {a for a in init_ppl if a.age <= 45}
+
+
 @pytest.mark.unit
 def test_ageout(make_model, params):
     params.exit_enter = ObjMap(
@@ -282,11 +309,11 @@ def test_agein(make_model, params):
 @pytest.mark.unit
 def test_timeline_scaling_default_def(make_model):
     model = make_model()
-    original_params = deepcopy(model.params.__getstate__())
+    original_params = deepcopy(model.params)
     model.time = 1
     model.timeline_scaling()
 
-    assert original_params == model.params.__getstate__()
+    assert original_params == model.params
 
 
 @pytest.mark.unit
@@ -332,3 +359,90 @@ def test_timeline_scaling_prep_def(make_model):
     model.timeline_scaling()
 
     assert math.isclose(original_prep_target, model.params.prep.cap, abs_tol=0.001)
+
+
+@pytest.mark.unit
+def test_timeline_scaling_location_layer(make_model):
+    model = make_model()
+    world = model.pop.geography.locations["world"]
+    path = "demographics|white|sex_type|WSW|drug_type|NonInj|hiv|aids|init"
+    model.params.timeline_scaling.timeline = ObjMap(
+        {
+            "shared": {
+                "parameter": "prep|cap",
+                "start_time": 1,
+                "stop_time": 2,
+                "scalar": 0.5,
+            },
+            "overridden": {
+                "parameter": path,
+                "start_time": 1,
+                "stop_time": 2,
+                "scalar": 0.5,
+            },
+        }
+    )
+    original_prep_cap = model.params.prep.cap
+    world_params = world.params.demographics.white.sex_type.WSW.drug_type.NonInj
+    base_params = model.params.demographics.white.sex_type.WSW.drug_type.NonInj
+
+    # each layer is scaled once
+    model.time = 1
+    model.timeline_scaling()
+    assert math.isclose(world.params.prep.cap, original_prep_cap * 0.5)
+    assert math.isclose(world_params.hiv.aids.init, 0.5)
+    assert math.isclose(base_params.hiv.aids.init, 0.05)
+    assert math.isclose(
+        world.tables.race["white"].sex_type.WSW.drug_type.NonInj.hiv.aids.init, 0.5
+    )
+
+    model.time = 2
+    model.timeline_scaling()
+    assert math.isclose(world.params.prep.cap, original_prep_cap)
+    assert math.isclose(world_params.hiv.aids.init, 1.0)
+    assert math.isclose(base_params.hiv.aids.init, 0.1)
+
+
+@pytest.mark.unit
+def test_get_random(make_model, params):
+    model = make_model()
+    assert model.get_random("prep") is model.run_random
+    assert model.get_np_random("sex") is model.np_random
+
+    params.model.seed.streams = True
+    model = make_model()
+    assert model.get_random("prep") is model.streams.get("prep")
+    assert model.get_random("prep") is not model.get_random("hiv")
+    assert model.get_np_random("sex") is model.streams.get("sex").gen
+
+
+@pytest.mark.unit
+def test_get_random_counter_based(make_model, params):
+    model = make_model()
+    agent = next(iter(model.pop.all_agents))
+    assert model.get_random("prep", agent) is model.run_random
+
+    params.model.seed.counter_based = True
+    model = make_model()
+    agent, other = list(model.pop.all_agents)[:2]
+    rel = next(iter(model.pop.relationships))
+    assert model.get_random("prep") is model.run_random
+
+    # one stream per part of the model, agent or relationship and time step
+    stream = model.get_random("prep", agent)
+    assert model.get_random("prep", agent) is stream
+    assert model.get_random("hiv", agent) is not stream
+    assert model.get_random("prep", other) is not stream
+    assert model.get_random("prep", rel) is not model.get_random("prep", rel.agent1)
+    assert model.get_np_random("prep", agent) is stream.gen
+
+    # draws don't depend on the order agents draw in
+    value = stream.random()
+    assert value == model.counter_random.random(model.time, agent.id, "agent|prep", 0)
+    model.get_random("prep", other).random()
+    assert stream.random() == model.counter_random.random(
+        model.time, agent.id, "agent|prep", 1
+    )
+
+    model.time += 1
+    assert model.get_random("prep", agent) is not stream
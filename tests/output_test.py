@@ -13,6 +13,7 @@ from titan import agent, features, exposures
 @pytest.fixture
 def stats(params, world_location):
     cur_time = 3
+    world_location.params.features.random_trial = True
     a = agent.Agent("MSM", 20, "black", "Inj", world_location)
     a.hiv.active = True
     a.hiv.time = cur_time
@@ -70,6 +71,28 @@ def test_get_stats(stats):
     assert stats["world"]["black"]["MSM"]["0"]["Inj"]["death_hiv"] == 1
 
 
+@pytest.mark.unit
+def test_get_stats_items(params, make_population):
+    pop = make_population(n=20)
+    agents = list(pop.all_agents)
+
+    classes = ["locations", "races", "sex_types", "drug_types"]
+    stats = setup_aggregates(params, [], classes, {})
+    attrs = ["location", "race", "sex_type", "drug_type"]
+    items = get_stats_items(stats, attrs, agents)
+    assert len(items) == len(agents)
+    for a, item in zip(agents, items):
+        assert item is get_stats_item(stats, attrs, a)
+
+    params.classes.components = list({str(a.component) for a in agents})
+    stats = setup_aggregates(params, [], params.outputs.classes, {})
+    attrs = ["location", "race", "sex_type", "component", "drug_type"]
+    for a, item in zip(agents, get_stats_items(stats, attrs, agents)):
+        assert item is get_stats_item(stats, attrs, a)
+
+    assert get_stats_items(stats, attrs, []) == []
+
+
 @pytest.mark.unit
 def test_basicReport(stats, params, tmpdir):
     run_id = nanoid.generate(size=8)
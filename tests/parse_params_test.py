@@ -1,5 +1,8 @@
 import pytest
 import os
+import pickle
+from copy import deepcopy
+import shutil
 
 import titan.parse_params as pp
 
@@ -47,3 +50,102 @@ def test_save_migration_probs(tmpdir):
 
     pp.create_params(None, param_file_migration, tmpdir)
     assert os.path.isfile(os.path.join(tmpdir, "migration_probs.csv"))
+
+
+@pytest.mark.unit
+def test_create_params_cache(tmpdir, monkeypatch):
+    param_file = os.path.join(tmpdir, "params.yml")
+    shutil.copy("tests/params/basic.yml", param_file)
+    cache_dir = os.path.join(tmpdir, "cache")
+    outdir = os.path.join(tmpdir, "out")
+    os.mkdir(outdir)
+
+    params = pp.create_params(None, param_file, outdir, cache_dir=cache_dir)
+    assert len(os.listdir(cache_dir)) == 1
+    with open(os.path.join(outdir, "params.yml")) as f:
+        params_yml = f.read()
+
+    # cached params are used without parsing again
+    def fail_parse(*args, **kwargs):
+        raise AssertionError("params should be cached")
+
+    os.remove(os.path.join(outdir, "params.yml"))
+    with monkeypatch.context() as m:
+        m.setattr(pp.paraml, "create_params", fail_parse)
+        cached = pp.create_params(None, param_file, outdir, cache_dir=cache_dir)
+        with pytest.raises(AssertionError):
+            pp.create_params(
+                None, param_file, outdir, error_on_unused=True, cache_dir=cache_dir
+            )
+
+    assert cached == params
+    assert isinstance(cached.demographics, pp.ObjMap)
+    with open(os.path.join(outdir, "params.yml")) as f:
+        assert f.read() == params_yml
+
+    # changing a param file invalidates the cache
+    with open(param_file, "a") as f:
+        f.write("\n# changed\n")
+    pp.create_params(None, param_file, outdir, cache_dir=cache_dir)
+    assert len(os.listdir(cache_dir)) == 2
+
+
+@pytest.mark.unit
+def test_frozen_params():
+    frozen = pp.FrozenParams(
+        pp.ObjMap({"a": {"b": 1, "c": [1, 2]}, "bins": {1: {"prob": 0.5}}})
+    )
+    assert frozen.a.b == 1
+    assert frozen["a"]["c"] == (1, 2)
+    assert frozen.bins[1].prob == 0.5
+    assert list(frozen.keys()) == ["a", "bins"]
+    assert "bins" in frozen
+    assert frozen.get("d") is None
+
+    with pytest.raises(AttributeError):
+        frozen.a.b = 2
+
+    assert pickle.loads(pickle.dumps(frozen)).bins[1].prob == 0.5
+
+
+@pytest.mark.unit
+def test_params_version():
+    params = pp.ObjMap({"a": {"b": {"c": 1}}, "d": {"e": 1}, "f": 1})
+    version = pp.get_version(params.a)
+    other_version = pp.get_version(params.d)
+
+    # writes only change the version of their section
+    params.a.b.c = 2
+    assert pp.get_version(params.a) == version + 1
+    assert pp.get_version(params.a.b) == version + 1
+    assert pp.get_version(params.d) == other_version
+
+    # writing the value already there isn't a change
+    params.a.b.c = 2
+    params.a.update({"b": params.a.b})
+    params.setdefault("f", 2)
+    assert pp.get_version(params.a) == version + 1
+
+    params.a["g"] = 3
+    params.a.update({"h": 4})
+    del params.a["h"]
+    assert pp.get_version(params.a) == version + 4
+
+    # maps written to params join the section they are written to
+    params.a.i = pp.ObjMap({"j": {"k": 1}})
+    params.a.i.j.k = 2
+    assert pp.get_version(params.a) == version + 6
+
+    # unseen changes
+    pp.params_changed(params)
+    assert pp.get_version(params.a) == version + 7
+    assert pp.get_version(params.d) == other_version + 1
+
+    # versions follow params through copies
+    params_copy = deepcopy(params)
+    params_copy.a.b.c = 3
+    assert pp.get_version(params_copy.a.i) == version + 8
+    assert pp.get_version(params.a) == version + 7
+    restored = pickle.loads(pickle.dumps(params))
+    restored.a.b.c = 3
+    assert pp.get_version(restored.a.i) == version + 8
@@ -1,7 +1,11 @@
 import pytest
 import os
+from copy import copy
+
+import numpy as np
 
 from titan.partnering import *
+from titan import utils
 from titan.agent import Agent, Relationship
 from titan.population import Population
 from titan.parse_params import create_params, ObjMap
@@ -9,13 +13,29 @@ from titan.parse_params import create_params, ObjMap
 from conftest import FakeRandom
 
 
-def test_partnership_duration(params):
+def pool_select(pop, agent, bond_type, rand_gen):
+    """
+    Select a partner from a `PartnerPool` holding all of the population's agents (partnerable or not) with the assort rules currently in its params
+    """
+    pool = PartnerPool(pop.params)
+    for a in pop.all_agents:
+        pool.add_agent(a, pool.members)
+    return pool.select(agent, bond_type, rand_gen)
+
+
+def test_partnership_duration(world_location):
     # test duration with randint
-    assert get_partnership_duration(params, FakeRandom(1.0), "Inj", "white") == 3
+    assert (
+        draw_partnership_duration(world_location, FakeRandom(1.0), "Inj", "white") == 3
+    )
     # test duration with bins
-    assert get_partnership_duration(params, FakeRandom(0.1), "Sex", "white") == 1
+    assert (
+        draw_partnership_duration(world_location, FakeRandom(0.1), "Sex", "white") == 1
+    )
     # test duration with second race
-    assert get_partnership_duration(params, FakeRandom(0.1), "Sex", "black") == 3
+    assert (
+        draw_partnership_duration(world_location, FakeRandom(0.1), "Sex", "black") == 3
+    )
 
 
 @pytest.mark.unit
@@ -33,15 +53,7 @@ def test_get_random_pwid_partner_no_PWID(make_population, make_agent, params):
     empty_pop.add_agent(idu_agent)
     empty_pop.add_agent(nidu_agent)
 
-    partner = select_partner(
-        idu_agent,
-        empty_pop.all_agents.members,
-        empty_pop.sex_partners,
-        empty_pop.pwid_agents,
-        params,
-        FakeRandom(1.0),
-        "Inj",
-    )
+    partner = pool_select(empty_pop, idu_agent, "Inj", FakeRandom(1.0))
     assert partner is None
 
 
@@ -67,15 +79,7 @@ def test_get_random_pwid_partner_w_PWID(make_population, make_agent, params):
                     bond
                 ].vars[1].value = 0.0
 
-    partner = select_partner(
-        idu_agent,
-        empty_pop.all_agents.members,
-        empty_pop.sex_partners,
-        empty_pop.pwid_agents,
-        params,
-        FakeRandom(1.0),
-        "Inj",
-    )
+    partner = pool_select(empty_pop, idu_agent, "Inj", FakeRandom(1.0))
     assert partner == idu_partner
 
 
@@ -92,33 +96,17 @@ def test_get_random_sex_partner_valid(make_population, make_agent, params):
     empty_pop.add_agent(hm_agent)
     empty_pop.add_agent(hf_partner)
 
-    hm_agent.target_partners = 10
-    hf_partner.target_partners = 10
-
-    partner = select_partner(
-        hm_agent,
-        empty_pop.all_agents.members,
-        empty_pop.sex_partners,
-        empty_pop.pwid_agents,
-        params,
-        FakeRandom(1.0),
-        "Sex",
-    )
+    hm_agent.target_partners["Sex"] = 10
+    hf_partner.target_partners["Sex"] = 10
+
+    partner = pool_select(empty_pop, hm_agent, "Sex", FakeRandom(1.0))
     assert partner == hf_partner
 
     rel = Relationship(partner, hm_agent, 10, "Sex")
     empty_pop.add_relationship(rel)
 
     # no match after bonded
-    partner = select_partner(
-        hm_agent,
-        empty_pop.all_agents.members,
-        empty_pop.sex_partners,
-        empty_pop.pwid_agents,
-        params,
-        FakeRandom(1.0),
-        "Sex",
-    )
+    partner = pool_select(empty_pop, hm_agent, "Sex", FakeRandom(1.0))
     assert partner is None
 
 
@@ -135,15 +123,7 @@ def test_get_random_sex_partner_bad(make_population, make_agent, params):
     empty_pop.add_agent(hm_agent)
     empty_pop.add_agent(msm_partner)
 
-    partner = select_partner(
-        hm_agent,
-        empty_pop.all_agents.members,
-        empty_pop.sex_partners,
-        empty_pop.pwid_agents,
-        params,
-        FakeRandom(1.0),
-        "Sex",
-    )
+    partner = pool_select(empty_pop, hm_agent, "Sex", FakeRandom(1.0))
     assert partner is None
 
 
@@ -178,15 +158,7 @@ def test_get_assort_partner_race(make_population, make_agent, params):
     )
     params.assort_mix["test_rule"] = test_rule
 
-    partner = select_partner(
-        a,
-        pop.all_agents.members,
-        pop.sex_partners,
-        pop.pwid_agents,
-        params,
-        FakeRandom(0.5),
-        "Sex",
-    )
+    partner = pool_select(pop, a, "Sex", FakeRandom(0.5))
 
     assert partner == p1
 
@@ -202,15 +174,7 @@ def test_get_assort_partner_race(make_population, make_agent, params):
     )
     params.assort_mix["test_rule"] = test_rule
 
-    partner = select_partner(
-        a,
-        pop.all_agents.members,
-        pop.sex_partners,
-        pop.pwid_agents,
-        params,
-        FakeRandom(0.5),
-        "Sex",
-    )
+    partner = pool_select(pop, a, "Sex", FakeRandom(0.5))
 
     assert partner == p2
 
@@ -254,15 +218,7 @@ def test_get_assort_partner_high_risk(make_population, make_agent, params):
     )
     params.assort_mix["test_rule"] = test_rule
 
-    partner = select_partner(
-        a,
-        pop.all_agents.members,
-        pop.sex_partners,
-        pop.pwid_agents,
-        params,
-        FakeRandom(0.5),
-        "Sex",
-    )
+    partner = pool_select(pop, a, "Sex", FakeRandom(0.5))
 
     assert partner == p1
 
@@ -278,15 +234,7 @@ def test_get_assort_partner_high_risk(make_population, make_agent, params):
     )
     params.assort_mix["test_rule"] = test_rule
 
-    partner = select_partner(
-        a,
-        pop.all_agents.members,
-        pop.sex_partners,
-        pop.pwid_agents,
-        params,
-        FakeRandom(0.5),
-        "Sex",
-    )
+    partner = pool_select(pop, a, "Sex", FakeRandom(0.5))
 
     assert partner == p2
 
@@ -334,15 +282,7 @@ def test_get_assort_partner_drug_type(make_population, make_agent, params):
     )
     params.assort_mix["test_rule"] = test_rule
 
-    partner = select_partner(
-        a,
-        pop.all_agents.members,
-        pop.sex_partners,
-        pop.pwid_agents,
-        params,
-        FakeRandom(0.5),
-        "Inj",
-    )
+    partner = pool_select(pop, a, "Inj", FakeRandom(0.5))
 
     assert partner == p1
 
@@ -358,15 +298,7 @@ def test_get_assort_partner_drug_type(make_population, make_agent, params):
     )
     params.assort_mix["test_rule"] = test_rule
 
-    partner = select_partner(
-        a,
-        pop.all_agents.members,
-        pop.sex_partners,
-        pop.pwid_agents,
-        params,
-        FakeRandom(0.5),
-        "Sex",
-    )
+    partner = pool_select(pop, a, "Sex", FakeRandom(0.5))
     assert partner == p2
 
 
@@ -401,30 +333,14 @@ def test_get_assort_same_race(make_population, make_agent, params):
     )
     params.assort_mix["test_rule"] = test_rule
 
-    partner = select_partner(
-        a,
-        pop.all_agents.members,
-        pop.sex_partners,
-        pop.pwid_agents,
-        params,
-        FakeRandom(0.5),
-        "Sex",
-    )
+    partner = pool_select(pop, a, "Sex", FakeRandom(0.5))
 
     assert partner == p1
 
     # get __other__
     params.assort_mix["test_rule"]["partner_values"]["__other__"] = 10
 
-    partner = select_partner(
-        a,
-        pop.all_agents.members,
-        pop.sex_partners,
-        pop.pwid_agents,
-        params,
-        FakeRandom(0.5),
-        "Sex",
-    )
+    partner = pool_select(pop, a, "Sex", FakeRandom(0.5))
 
     assert partner == p2
 
@@ -432,15 +348,7 @@ def test_get_assort_same_race(make_population, make_agent, params):
     params.assort_mix["test_rule"]["partner_values"]["a_key"] = 100
 
     with pytest.raises(ValueError):
-        select_partner(
-            a,
-            pop.all_agents.members,
-            pop.sex_partners,
-            pop.pwid_agents,
-            params,
-            FakeRandom(0.5),
-            "Sex",
-        )
+        pool_select(pop, a, "Sex", FakeRandom(0.5))
 
 
 @pytest.mark.unit
@@ -476,15 +384,7 @@ def test_get_assort_hiv(make_population, make_agent, params):
     )
     params.assort_mix["test_rule"] = test_rule
 
-    partner = select_partner(
-        a,
-        pop.all_agents.members,
-        pop.sex_partners,
-        pop.pwid_agents,
-        params,
-        FakeRandom(0.5),
-        "Sex",
-    )
+    partner = pool_select(pop, a, "Sex", FakeRandom(0.5))
 
     assert partner == p1
 
@@ -500,15 +400,7 @@ def test_get_assort_hiv(make_population, make_agent, params):
     )
     params.assort_mix["test_rule"] = test_rule
 
-    partner = select_partner(
-        a,
-        pop.all_agents.members,
-        pop.sex_partners,
-        pop.pwid_agents,
-        params,
-        FakeRandom(0.5),
-        "Sex",
-    )
+    partner = pool_select(pop, a, "Sex", FakeRandom(0.5))
 
     assert partner == p2
 
@@ -546,15 +438,7 @@ def test_get_assort_hiv_prep(make_population, make_agent, params):
     )
     params.assort_mix["test_rule"] = test_rule
 
-    partner = select_partner(
-        a,
-        pop.all_agents.members,
-        pop.sex_partners,
-        pop.pwid_agents,
-        params,
-        FakeRandom(0.5),
-        "Sex",
-    )
+    partner = pool_select(pop, a, "Sex", FakeRandom(0.5))
 
     assert partner == p1
 
@@ -570,15 +454,7 @@ def test_get_assort_hiv_prep(make_population, make_agent, params):
     )
     params.assort_mix["test_rule"] = test_rule
 
-    partner = select_partner(
-        a,
-        pop.all_agents.members,
-        pop.sex_partners,
-        pop.pwid_agents,
-        params,
-        FakeRandom(0.5),
-        "Sex",
-    )
+    partner = pool_select(pop, a, "Sex", FakeRandom(0.5))
 
     assert partner == p2
 
@@ -613,15 +489,7 @@ def test_get_assort_age_bin_same(make_population, make_agent, params):
     )
     params.assort_mix["test_rule"] = test_rule
 
-    partner = select_partner(
-        a,
-        pop.all_agents.members,
-        pop.sex_partners,
-        pop.pwid_agents,
-        params,
-        FakeRandom(0.5),
-        "Sex",
-    )
+    partner = pool_select(pop, a, "Sex", FakeRandom(0.5))
 
     assert partner == p1
 
@@ -656,15 +524,7 @@ def test_get_assort_age_bin_other(make_population, make_agent, params):
     )
     params.assort_mix["test_rule"] = test_rule
 
-    partner = select_partner(
-        a,
-        pop.all_agents.members,
-        pop.sex_partners,
-        pop.pwid_agents,
-        params,
-        FakeRandom(0.5),
-        "Sex",
-    )
+    partner = pool_select(pop, a, "Sex", FakeRandom(0.5))
     assert partner == p2
 
 
@@ -697,15 +557,7 @@ def test_get_assort_bond_type(make_population, make_agent, params):
     )
     params.assort_mix["test_rule"] = test_rule
 
-    partner = select_partner(
-        a,
-        pop.all_agents.members,
-        pop.sex_partners,
-        pop.pwid_agents,
-        params,
-        FakeRandom(0.5),
-        "Social",
-    )
+    partner = pool_select(pop, a, "Social", FakeRandom(0.5))
 
     assert partner is None
 
@@ -721,15 +573,7 @@ def test_get_assort_bond_type(make_population, make_agent, params):
     )
     params.assort_mix["test_rule"] = test_rule
 
-    partner = select_partner(
-        a,
-        pop.all_agents.members,
-        pop.sex_partners,
-        pop.pwid_agents,
-        params,
-        FakeRandom(0.5),
-        "Sex",
-    )
+    partner = pool_select(pop, a, "Sex", FakeRandom(0.5))
 
     assert partner == p
 
@@ -762,43 +606,19 @@ def test_get_same_assort_location(make_population, tmpdir, make_agent):
     )
     params.assort_mix["test_rule"] = test_rule
 
-    partner = select_partner(
-        e,
-        pop.all_agents.members,
-        pop.sex_partners,
-        pop.pwid_agents,
-        params,
-        FakeRandom(0.0),
-        "Sex",
-    )
+    partner = pool_select(pop, e, "Sex", FakeRandom(0.0))
 
     assert partner == s
 
     params.assort_mix.test_rule.partner_values["__neighbor__"] = 0.9  # now highest
 
-    partner = select_partner(
-        e,
-        pop.all_agents.members,
-        pop.sex_partners,
-        pop.pwid_agents,
-        params,
-        FakeRandom(0.0),
-        "Sex",
-    )
+    partner = pool_select(pop, e, "Sex", FakeRandom(0.0))
 
     assert partner in (w, n)
 
     params.assort_mix.test_rule.partner_values["__same__"] = 1.9  # now highest
 
-    partner = select_partner(
-        e,
-        pop.all_agents.members,
-        pop.sex_partners,
-        pop.pwid_agents,
-        params,
-        FakeRandom(0.0),
-        "Sex",
-    )
+    partner = pool_select(pop, e, "Sex", FakeRandom(0.0))
 
     assert partner is None
 
@@ -814,29 +634,13 @@ def test_get_same_assort_location(make_population, tmpdir, make_agent):
     )
     params.assort_mix["test_rule"] = test_rule
 
-    partner = select_partner(
-        e,
-        pop.all_agents.members,
-        pop.sex_partners,
-        pop.pwid_agents,
-        params,
-        FakeRandom(0.0),
-        "Sex",
-    )
+    partner = pool_select(pop, e, "Sex", FakeRandom(0.0))
 
     assert partner in (s, w, n)
 
     params.assort_mix.test_rule.partner_values["__same__"] = 0.9  # now highest
 
-    partner = select_partner(
-        e,
-        pop.all_agents.members,
-        pop.sex_partners,
-        pop.pwid_agents,
-        params,
-        FakeRandom(0.0),
-        "Sex",
-    )
+    partner = pool_select(pop, e, "Sex", FakeRandom(0.0))
 
     assert partner is None
 
@@ -869,43 +673,19 @@ def test_get_assort_location(make_population, tmpdir, make_agent):
     )
     params.assort_mix["test_rule"] = test_rule
 
-    partner = select_partner(
-        e,
-        pop.all_agents.members,
-        pop.sex_partners,
-        pop.pwid_agents,
-        params,
-        FakeRandom(0.0),
-        "Sex",
-    )
+    partner = pool_select(pop, e, "Sex", FakeRandom(0.0))
 
     assert partner == s
 
     params.assort_mix.test_rule.partner_values["__neighbor__"] = 0.9  # now highest
 
-    partner = select_partner(
-        e,
-        pop.all_agents.members,
-        pop.sex_partners,
-        pop.pwid_agents,
-        params,
-        FakeRandom(0.0),
-        "Sex",
-    )
+    partner = pool_select(pop, e, "Sex", FakeRandom(0.0))
 
     assert partner in (w, n)
 
     params.assort_mix.test_rule.partner_values["east"] = 1.9  # now highest
 
-    partner = select_partner(
-        e,
-        pop.all_agents.members,
-        pop.sex_partners,
-        pop.pwid_agents,
-        params,
-        FakeRandom(0.0),
-        "Sex",
-    )
+    partner = pool_select(pop, e, "Sex", FakeRandom(0.0))
 
     assert partner is None
 
@@ -921,43 +701,19 @@ def test_get_assort_location(make_population, tmpdir, make_agent):
     )
     params.assort_mix["test_rule"] = test_rule
 
-    partner = select_partner(
-        e,
-        pop.all_agents.members,
-        pop.sex_partners,
-        pop.pwid_agents,
-        params,
-        FakeRandom(0.0),
-        "Sex",
-    )
+    partner = pool_select(pop, e, "Sex", FakeRandom(0.0))
 
     assert partner in (s, n)
 
     params.assort_mix.test_rule.partner_values["east"] = 0.9  # now highest
 
-    partner = select_partner(
-        e,
-        pop.all_agents.members,
-        pop.sex_partners,
-        pop.pwid_agents,
-        params,
-        FakeRandom(0.0),
-        "Sex",
-    )
+    partner = pool_select(pop, e, "Sex", FakeRandom(0.0))
 
     assert partner is None
 
     params.assort_mix.test_rule.partner_values["west"] = 1.9  # now highest
 
-    partner = select_partner(
-        e,
-        pop.all_agents.members,
-        pop.sex_partners,
-        pop.pwid_agents,
-        params,
-        FakeRandom(0.0),
-        "Sex",
-    )
+    partner = pool_select(pop, e, "Sex", FakeRandom(0.0))
 
     assert partner == w
 
@@ -1024,3 +780,209 @@ def test_sex_possible(params):
     with pytest.raises(ValueError, match=r"Invalid .*_sex_type.*"):
         sex_possible("HM", "XYZ", sex_types)
         sex_possible("XYZ", "HM", sex_types)
+
+
+@pytest.mark.unit
+def test_partner_pool_members(make_population, params):
+    pop = make_population(n=200)
+
+    for agent in pop.all_agents:
+        for bond in params.classes.bond_types:
+            key = pop.partner_pool.get_seeker_key(agent, bond)
+            pool = set(pop.partner_pool.members[bond][key])
+
+            expected = set(pop.partnerable_agents[bond])
+            acts_allowed = params.classes.bond_types[bond].acts_allowed
+            if "injection" in acts_allowed:
+                expected &= pop.pwid_agents.members
+            if "sex" in acts_allowed:
+                expected &= pop.sex_partners[agent.sex_type]
+
+            assert pool == expected
+
+
+@pytest.mark.unit
+def test_partner_pool_select(make_population, make_agent, params):
+    pop = make_population()
+    a = make_agent(SO="MSM")
+    p1 = make_agent(SO="MSM")
+    p2 = make_agent(SO="HM")
+    for ag in (a, p1, p2):
+        ag.target_partners["Sex"] = 1
+        pop.partnerable_agents["Sex"].add(ag)
+        pop.add_agent(ag)
+
+    # HM doesn't sleep with MSM, a can't partner with themself
+    assert pop.partner_pool.select(a, "Sex", FakeRandom(0.0)) == p1
+    assert pop.partner_pool.select(a, "Sex", FakeRandom(1.0)) == p1
+
+    # existing partners are excluded
+    a.partners["Sex"].add(p1)
+    assert pop.partner_pool.select(a, "Sex", FakeRandom(0.0)) is None
+
+    # no longer partnerable
+    a.partners["Sex"].remove(p1)
+    pop.partner_pool.remove(p1, "Sex")
+    assert pop.partner_pool.select(a, "Sex", FakeRandom(0.0)) is None
+
+    pop.partner_pool.add(p1, "Sex")
+    pop.remove_agent(p1)
+    assert pop.partner_pool.select(a, "Sex", FakeRandom(0.0)) is None
+
+
+@pytest.mark.unit
+def test_partner_pool_assort(make_population, make_agent, params):
+    params.features.assort_mix = True
+    params.assort_mix["test_rule"] = ObjMap(
+        {
+            "attribute": "race",
+            "partner_attribute": "__agent__",
+            "bond_types": [],
+            "agent_value": "white",
+            "partner_values": {"white": 0.9, "__other__": 0.1},
+        }
+    )
+    pop = make_population()
+    assert pop.partner_pool.attrs == ("race",)
+
+    a = make_agent(SO="MSM", race="white")
+    p1 = make_agent(SO="MSM", race="white")
+    p2 = make_agent(SO="MSM", race="black")
+    for ag in (a, p1, p2):
+        ag.target_partners["Sex"] = 1
+        pop.partnerable_agents["Sex"].add(ag)
+        pop.add_agent(ag)
+
+    assert list(pop.partner_pool.attr_members["Sex"]["MSM"]["race"]["white"]) == [a, p1]
+
+    # assort with white
+    assert pop.partner_pool.select(a, "Sex", FakeRandom(0.5)) == p1
+
+    # get __other__
+    params.assort_mix.test_rule.partner_values["__other__"] = 10
+    assert pop.partner_pool.select(a, "Sex", FakeRandom(0.5)) == p2
+
+    # no white partners left
+    params.assort_mix.test_rule.partner_values["__other__"] = 0.1
+    pop.partner_pool.remove(p1, "Sex")
+    assert pop.partner_pool.select(a, "Sex", FakeRandom(0.5)) is None
+
+
+@pytest.mark.unit
+def test_assort_rule_targets(make_agent, params):
+    a = make_agent(race="white")
+    rule = AssortRule(
+        "test_rule",
+        ObjMap(
+            {
+                "attribute": "race",
+                "partner_attribute": "location",
+                "bond_types": ["Inj"],
+                "agent_value": "__any__",
+                "partner_values": {"__same__": 0.9, "__other__": 0.1},
+            }
+        ),
+    )
+
+    assert not rule.applies(a, "Sex")
+    assert rule.applies(a, "Inj")
+    assert rule.get_target(a, FakeRandom(0.5)) == (
+        "location",
+        frozenset(["world"]),
+        True,
+    )
+
+    rule.assort_def.partner_values["__other__"] = 10
+    assert rule.get_target(a, FakeRandom(0.5)) == (
+        "location",
+        frozenset(["world"]),
+        False,
+    )
+
+
+@pytest.mark.unit
+def test_get_stub_pairs():
+    rand_gen = np.random.default_rng(123)
+    deficits = np.array([3, 0, 2, 1, 4])
+    left, right = get_stub_pairs(deficits, rand_gen)
+
+    assert len(left) == len(right)
+    assert not any(left == right)
+    assert not any(deficits[left] == 0)
+    assert not any(deficits[right] == 0)
+
+    pairs = {frozenset(pair) for pair in zip(left, right)}
+    assert len(pairs) == len(left)
+
+    # each agent is in at most as many pairs as their deficit
+    counts = np.bincount(np.concatenate([left, right]), minlength=len(deficits))
+    assert all(counts <= deficits)
+
+    left, right = get_stub_pairs(np.array([2]), rand_gen)
+    assert len(left) == 0
+
+
+@pytest.mark.unit
+def test_match_stubs(make_agent, params):
+    params.partnership.network.matching.type = "stub"
+    a = make_agent(SO="MSM")
+    p1 = make_agent(SO="MSM")
+    p2 = make_agent(SO="HM")
+    p3 = make_agent(SO="HF")
+    agents = [a, p1, p2, p3]
+    for ag in agents:
+        ag.target_partners["Sex"] = 1
+
+    rand_gen = np.random.default_rng(123)
+    for agent, partner in match_stubs(agents, "Sex", params, rand_gen):
+        assert agent.sex_type in params.classes.sex_types[partner.sex_type].sleeps_with
+        Relationship(agent, partner, 10, bond_type="Sex")
+
+    for ag in agents:
+        assert len(ag.partners["Sex"]) <= ag.target_partners["Sex"]
+
+    # already partnered
+    a = make_agent(SO="MSM")
+    p = make_agent(SO="MSM")
+    Relationship(a, p, 10, bond_type="Sex")
+    a.target_partners["Sex"] = 2
+    p.target_partners["Sex"] = 2
+    assert not list(match_stubs([a, p], "Sex", params, rand_gen))
+
+    # only PWID can be injection partners
+    a = make_agent(DU="None")
+    p = make_agent(DU="None")
+    a.target_partners["Inj"] = 1
+    p.target_partners["Inj"] = 1
+    assert not list(match_stubs([a, p], "Inj", params, rand_gen))
+
+    p.drug_type = "Inj"
+    assert next(match_stubs([a, p], "Inj", params, rand_gen)) == (a, p)
+
+    # no rounds, no matches
+    params.partnership.network.matching.rounds = 0
+    assert not list(match_stubs([a, p], "Inj", params, rand_gen))
+
+
+@pytest.mark.unit
+def test_partner_pool_select_component(make_population, make_agent, params):
+    pop = make_population()
+    a = make_agent(SO="MSM")
+    p1 = make_agent(SO="MSM")
+    p2 = make_agent(SO="MSM")
+    p3 = make_agent(SO="HM")
+    for ag in (a, p1, p2, p3):
+        ag.target_partners["Sex"] = 1
+        pop.partnerable_agents["Sex"].add(ag)
+        pop.add_agent(ag)
+
+    # smaller component than bucket
+    component = utils.RandomSet([a, p2, p3])
+    assert pop.partner_pool.select(a, "Sex", FakeRandom(0.0), component) == p2
+    assert pop.partner_pool.select(a, "Sex", FakeRandom(0.99), component) == p2
+
+    # larger component than bucket
+    component.update([p1, make_agent(SO="MSM"), make_agent(SO="MSM")])
+    assert pop.partner_pool.select(a, "Sex", FakeRandom(0.0), component) in (p1, p2)
+
+    assert pop.partner_pool.select(a, "Sex", FakeRandom(0.0), utils.RandomSet()) is None
@@ -9,6 +9,8 @@ from titan.population_io import (
     agent_exclude_attrs,
     agent_feature_attrs,
     agent_exposure_attrs,
+    rel_attrs,
+    get_attrs,
     find_agent,
 )
 from titan.features import Prep, BaseFeature
@@ -35,7 +37,7 @@ def test_write_pop(tmpdir, make_population):
             res.append(row)
 
     for row, a in zip(res, pop.all_agents):
-        for attr in a.__dict__.keys():
+        for attr in get_attrs(a):
             if any(
                 attr in exclude_set
                 for exclude_set in (
@@ -56,7 +58,7 @@ def test_write_pop(tmpdir, make_population):
             res.append(row)
 
     for row, r in zip(res, pop.relationships):
-        for attr in r.__dict__.keys():
+        for attr in rel_attrs:
             assert repr(getattr(r, attr)) == row[attr]
 
 
@@ -77,21 +79,21 @@ def test_read_pop(tmpdir, make_population, params):
     agent = next(iter(pop.all_agents))
     new_agent = find_agent(new_pop, str(agent.id))
 
-    attrs = agent.__dict__.keys()
+    attrs = get_attrs(agent)
 
     for attr in attrs:
-        # Components aren't guaranteed to keep exact ordering
-        if attr == "component":
+        # Components aren't guaranteed to keep exact ordering, the demographics cache isn't saved
+        if attr in ("component", "cached_tables", "cached_demographics"):
             continue
 
         orig_attr = getattr(agent, attr)
         new_attr = getattr(new_agent, attr)
         if isinstance(orig_attr, BaseFeature):
-            feat_attrs = orig_attr.__dict__.keys()
+            feat_attrs = get_attrs(orig_attr)
             for feat_attr in feat_attrs:
                 assert getattr(orig_attr, feat_attr) == getattr(new_attr, feat_attr)
         elif isinstance(orig_attr, BaseExposure):
-            expose_attrs = orig_attr.__dict__.keys()
+            expose_attrs = get_attrs(orig_attr)
             for expose_attr in expose_attrs:
                 assert getattr(orig_attr, expose_attr) == getattr(new_attr, expose_attr)
         else:
@@ -116,20 +118,21 @@ def test_write_read_pop_compressed(tmpdir, make_population, params):
     agent = next(iter(pop.all_agents))
     new_agent = find_agent(new_pop, str(agent.id))
 
-    attrs = agent.__dict__.keys()
+    attrs = get_attrs(agent)
 
-    for attr in attrs:  # Components aren't guaranteed to keep exact ordering
-        if attr == "component":
+    for attr in attrs:
+        # Components aren't guaranteed to keep exact ordering, the demographics cache isn't saved
+        if attr in ("component", "cached_tables", "cached_demographics"):
             continue
 
         orig_attr = getattr(agent, attr)
         new_attr = getattr(new_agent, attr)
         if isinstance(orig_attr, BaseFeature):
-            feat_attrs = orig_attr.__dict__.keys()
+            feat_attrs = get_attrs(orig_attr)
             for feat_attr in feat_attrs:
                 assert getattr(orig_attr, feat_attr) == getattr(new_attr, feat_attr)
         elif isinstance(orig_attr, BaseExposure):
-            expose_attrs = orig_attr.__dict__.keys()
+            expose_attrs = get_attrs(orig_attr)
             for expose_attr in expose_attrs:
                 assert getattr(orig_attr, expose_attr) == getattr(new_attr, expose_attr)
         else:
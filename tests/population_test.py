@@ -1,5 +1,8 @@
 import pytest
 import os
+from math import ceil
+
+import numpy as np
 
 from titan.population import *
 from titan.parse_params import create_params, ObjMap
@@ -51,6 +54,25 @@ def test_create_agent(make_population, params):
     assert a4.random_trial.treated is False
 
 
+@pytest.mark.unit
+def test_create_agent_num_partners(make_population):
+    pop = make_population(n=100)
+    loc = pop.geography.locations["world"]
+
+    # num partners are drawn from the population generator one at a time
+    pop.np_random = np.random.default_rng(123)
+    agent = pop.create_agent(loc, "white", 0, sex_type="HM", drug_type="Inj")
+    rand_gen = np.random.default_rng(123)
+    for bond in loc.params.classes.bond_types:
+        dist_info = agent.demographics.drug_type.num_partners[bond]
+        assert agent.mean_num_partners[bond] == ceil(
+            utils.safe_dist(dist_info, rand_gen)
+            * utils.safe_divide(
+                loc.params.calibration.sex.partner, pop.mean_rel_duration[bond]["white"]
+            )
+        )
+
+
 @pytest.mark.unit
 def test_create_agent_proportions(make_population, params):
     pop = make_population(n=100)
@@ -133,7 +155,7 @@ def test_update_agent_partners_one_agent(make_population, params):
     agent = next(iter(pop.all_agents))  # the only agent in the pop
 
     for bond in params.classes.bond_types:
-        pop.update_agent_partners(agent, bond, [])  # noMatch == True
+        pop.update_agent_partners(agent, bond)  # noMatch == True
     assert agent in pop.graph.nodes()
     assert len(pop.graph.edges()) == 0
 
@@ -157,7 +179,7 @@ def test_update_agent_partners_PWID_no_match(make_population, params):
     assert p.drug_type == "None"
 
     for bond in params.classes.bond_types.keys():
-        assert pop.update_agent_partners(a, bond, [])
+        assert pop.update_agent_partners(a, bond)
         assert a in pop.graph.nodes()
         assert p in pop.graph.nodes()
         assert not a.partners[bond]
@@ -166,7 +188,7 @@ def test_update_agent_partners_PWID_no_match(make_population, params):
     p.sex_type = "MSM"
     p.drug_type = "None"
     for bond in params.classes.bond_types.keys():
-        assert pop.update_agent_partners(a, bond, [])
+        assert pop.update_agent_partners(a, bond)
         assert a in pop.graph.nodes()
         assert p in pop.graph.nodes()
         assert not a.partners[bond]
@@ -184,7 +206,7 @@ def test_update_agent_partners_MSM_no_match(make_population, params):
     pop.add_agent(a)
     pop.add_agent(p)
 
-    assert pop.update_agent_partners(a, "Sex", [])
+    assert pop.update_agent_partners(a, "Sex")
     assert a in pop.graph.nodes()
     assert p in pop.graph.nodes()
     assert not a.partners["Sex"]
@@ -216,7 +238,7 @@ def test_update_agent_partners_PWID_match(make_population, params):
     pop.add_agent(p)
     assert pop.partnerable_agents["Inj"]
 
-    no_match = pop.update_agent_partners(a, "Inj", [])
+    no_match = pop.update_agent_partners(a, "Inj")
     assert no_match is False
     assert a in pop.graph.nodes()
     assert p in pop.graph.nodes()
@@ -238,7 +260,7 @@ def test_update_agent_partners_MSM_match(make_population, params):
     pop.add_agent(a)
     pop.add_agent(p)
 
-    no_match = pop.update_agent_partners(a, "Sex", [])
+    no_match = pop.update_agent_partners(a, "Sex")
     assert no_match is False
     assert a in pop.graph.nodes()
     assert p in pop.graph.nodes()
@@ -262,7 +284,7 @@ def test_update_agent_partners_NDU_PWID_match(make_population, params):
     pop.add_agent(a)
     pop.add_agent(p)
 
-    no_match = pop.update_agent_partners(a, "Sex", [])
+    no_match = pop.update_agent_partners(a, "Sex")
     assert no_match is False
     assert a in pop.graph.nodes()
     assert p in pop.graph.nodes()
@@ -273,11 +295,11 @@ def test_update_agent_partners_NDU_PWID_match(make_population, params):
     ) in (
         a.relationships
     ):  # check that duration uses "randomly selected" (second) partner
-        assert rel.duration != partnering.get_partnership_duration(
-            a.location.params, pop.np_random, "Sex", a.race
+        assert rel.duration != partnering.draw_partnership_duration(
+            a.location, pop.np_random, "Sex", a.race
         )
-        assert rel.duration == partnering.get_partnership_duration(
-            a.location.params, pop.np_random, "Sex", p.race
+        assert rel.duration == partnering.draw_partnership_duration(
+            a.location, pop.np_random, "Sex", p.race
         )
 
 
@@ -387,6 +409,108 @@ def test_update_partner_assignments_no_match(make_population, params):
     assert len(pop.graph.edges()) == 0
 
 
+@pytest.mark.unit
+def test_partner_deficits(make_population, params):
+    pop = make_population(n=0)
+    a = pop.create_agent(pop.geography.locations["world"], "white", 0, sex_type="MSM")
+    p = pop.create_agent(pop.geography.locations["world"], "white", 0, sex_type="HM")
+    a.drug_type = "None"
+    p.drug_type = "None"
+    a.target_partners["Sex"] = 1
+    p.target_partners["Sex"] = 1
+    pop.add_agent(a)
+    pop.add_agent(p)
+    assert a in pop.partner_deficits["Sex"]
+    assert p in pop.partner_deficits["Sex"]
+
+    rel = ag.Relationship(a, p, 10, bond_type="Sex")
+    pop.add_relationship(rel)
+    assert a not in pop.partner_deficits["Sex"]
+    assert p not in pop.partner_deficits["Sex"]
+
+    # target changes are picked up through update_partnerability
+    a.target_partners["Sex"] = 2
+    pop.update_partnerability(a)
+    assert a in pop.partner_deficits["Sex"]
+
+    rel.unbond()
+    pop.remove_relationship(rel)
+    assert p in pop.partner_deficits["Sex"]
+
+    # neither can find a partner (MSM and HM don't match)
+    pop.update_partner_assignments(1)
+    assert pop.num_unsatisfied["Sex"] == 2
+
+    # agents who didn't try to find a partner aren't counted
+    b = pop.create_agent(pop.geography.locations["world"], "white", 0, sex_type="HM")
+    b.target_partners["Sex"] = 0
+    pop.add_agent(b)
+    update_agent_partners = pop.update_agent_partners
+
+    def short_of_partners_during_round(agent, bond_type):
+        if bond_type == "Sex":
+            b.target_partners["Sex"] = 1
+            pop.update_partnerability(b)
+        return update_agent_partners(agent, bond_type)
+
+    pop.update_agent_partners = short_of_partners_during_round
+    pop.update_partner_assignments(1)
+    assert b in pop.partner_deficits["Sex"]
+    assert pop.num_unsatisfied["Sex"] == 2
+
+    pop.remove_agent(a)
+    assert a not in pop.partner_deficits["Sex"]
+
+
+@pytest.mark.unit
+def test_update_partner_assignments_stub(make_population, params):
+    params.partnership.network.matching.type = "stub"
+    pop = make_population(n=100)
+    assert pop.use_stub_matching("Sex")
+
+    num_rels = len(pop.relationships)
+    for a in pop.all_agents:
+        a.target_partners["Sex"] = len(a.partners["Sex"]) + 1
+        pop.update_partnerability(a)
+
+    pop.update_partner_assignments(1)
+    assert len(pop.relationships) > num_rels
+    for rel in pop.relationships:
+        assert rel.agent1 != rel.agent2
+        if rel.bond_type == "Inj":
+            assert rel.agent2.drug_type == "Inj"
+
+    # same component partnering falls back to sequential
+    params.partnership.network.same_component.prob = 0.5
+    assert not pop.use_stub_matching("Sex")
+
+
+@pytest.mark.unit
+def test_use_stub_matching_assort(make_population, params):
+    params.partnership.network.matching.type = "stub"
+    params.features.assort_mix = True
+    params.assort_mix = ObjMap(
+        {
+            "test_rule": {
+                "attribute": "race",
+                "partner_attribute": "__agent__",
+                "bond_types": ["Inj"],
+                "agent_value": "white",
+                "partner_values": {"white": 0.9, "__other__": 0.1},
+            }
+        }
+    )
+    pop = make_population(n=100)
+    assert pop.use_stub_matching("Sex")
+    assert not pop.use_stub_matching("Inj")
+
+    # a rule with no bond types applies to all of them
+    params.assort_mix["test_rule"].bond_types = []
+    pop = make_population(n=100)
+    assert not pop.use_stub_matching("Sex")
+    assert not pop.use_stub_matching("Inj")
+
+
 @pytest.mark.unit
 def test_network_init_scale_free(params):
     """Test if all Inj,NonInj,None drug use agents are in the population"""
@@ -0,0 +1,185 @@
+import pytest
+
+import random
+
+import numpy as np
+
+from titan.samplers import *
+from titan import utils
+from titan.parse_params import ObjMap
+
+from conftest import FakeRandom
+
+
+@pytest.mark.unit
+def test_sampler_bins(params):
+    defn = params.partnership.duration.Sex.white
+    sampler = Sampler(defn)
+    assert sampler.type == "bins"
+
+    # single draws match walking the bins
+    for rand_val in (0.1, 0.5, 1.0):
+        rand_gen = FakeRandom(rand_val)
+        i = utils.get_independent_bin(rand_gen, defn.bins)
+        assert sampler.draw(FakeRandom(rand_val)) == utils.safe_random_int(
+            defn.bins[i].min, defn.bins[i].max, rand_gen
+        )
+
+    rand_gen = np.random.default_rng(123)
+    values = sampler.sample(rand_gen, 1000)
+    assert values.shape == (1000,)
+    low = min(b.min for b in defn.bins.values())
+    high = max(b.max for b in defn.bins.values())
+    assert values.min() >= low
+    assert values.max() < high
+
+    # buffered draws are drawn in blocks and are reproducible given the seed
+    block = Sampler(defn, block_size=16).sample(np.random.default_rng(1), 16)
+    sampler = Sampler(defn, block_size=16)
+    rand_gen = np.random.default_rng(1)
+    draws = [sampler.draw(rand_gen) for _ in range(20)]
+    assert draws[:16] == list(block)
+
+    sampler = Sampler(defn, block_size=16)
+    rand_gen = np.random.default_rng(1)
+    assert [sampler.draw(rand_gen) for _ in range(20)] == draws
+
+    # unbuffered draws only take one value from the generator
+    rand_gen = np.random.default_rng(1)
+    assert (
+        sampler.draw(rand_gen, buffered=False)
+        == sampler.sample(np.random.default_rng(1), 1)[0]
+    )
+    expected = np.random.default_rng(1)
+    sampler.sample(expected, 1)
+    assert rand_gen.random() == expected.random()
+    assert sampler.buffer_gen is not rand_gen
+
+
+@pytest.mark.unit
+def test_sampler_cumulative_inclusive():
+    defn = ObjMap(
+        {
+            "type": "bins",
+            "bins": {
+                1: {"prob": 0.5, "min": 1, "max": 1},
+                2: {"prob": 0.5, "min": 2, "max": 3},
+            },
+        }
+    )
+    sampler = Sampler(defn, cumulative=True, inclusive=True)
+    assert sampler.draw(FakeRandom(0.4)) == 1
+    assert sampler.draw(FakeRandom(0.9)) == 2
+
+    values = sampler.sample(np.random.default_rng(123), 1000)
+    assert set(values) == {1, 2, 3}
+
+
+@pytest.mark.unit
+def test_sampler_distribution():
+    defn = ObjMap(
+        {
+            "type": "distribution",
+            "distribution": {
+                "dist_type": "set_value",
+                "vars": {1: {"value": 2.6, "value_type": "float"}},
+            },
+        }
+    )
+    assert Sampler(defn).draw(FakeRandom(0.5)) == 2
+    assert Sampler(defn, rounding="round").draw(FakeRandom(0.5)) == 3
+    assert list(Sampler(defn).sample(np.random.default_rng(123), 3)) == [2, 2, 2]
+
+    defn.distribution.dist_type = "poisson"
+    values = Sampler(defn).sample(np.random.default_rng(123), 1000)
+    assert values.dtype == np.int64
+    assert values.min() >= 0
+
+    defn.type = "not a thing"
+    with pytest.raises(Exception):
+        Sampler(defn)
+
+
+@pytest.mark.unit
+def test_sampler_bare_distribution():
+    defn = ObjMap(
+        {
+            "dist_type": "weibull_modified",
+            "vars": {
+                1: {"value": 0.5, "value_type": "float"},
+                2: {"value": 11, "value_type": "float"},
+            },
+        }
+    )
+    sampler = Sampler(defn, rounding=None)
+    assert sampler.type == "distribution"
+    assert sampler.draw(FakeRandom(0.5)) == 5.284983153100216
+
+    # batch draws are the same as drawing one at a time
+    values = sampler.sample(np.random.default_rng(123), 5)
+    rand_gen = np.random.default_rng(123)
+    assert list(values) == [utils.safe_dist(defn, rand_gen) for _ in range(len(values))]
+
+    defn.dist_type = "pert"
+    defn.vars = ObjMap(
+        {
+            1: {"value": 2, "value_type": "int"},
+            2: {"value": 5, "value_type": "int"},
+            3: {"value": 100, "value_type": "int"},
+            4: {"value": 4, "value_type": "int"},
+        }
+    )
+    values = Sampler(defn, rounding=None).sample(np.random.default_rng(123), 1000)
+    assert values.dtype == float
+    assert values.min() > 2
+    assert values.max() < 100
+
+
+@pytest.mark.unit
+def test_sampler_cache(params):
+    cache = SamplerCache()
+    defn = params.partnership.duration.Sex.white
+    sampler = cache.get(("duration", "Sex", "white"), defn)
+    assert cache.get(("duration", "Sex", "white"), defn) is sampler
+
+    # changes elsewhere in the params keep the sampler and the values it has drawn
+    rand_gen = np.random.default_rng(0)
+    sampler.draw(rand_gen)
+    buffer = sampler.buffer
+    params.classes.components = ["-1", "0"]
+    params.partnership.duration.Sex.white.type = defn.type
+    assert cache.get(("duration", "Sex", "white"), defn) is sampler
+    params.partnership.duration.Sex.black.bins[1].min = 2
+    assert cache.get(("duration", "Sex", "white"), defn) is sampler
+    assert sampler.buffer is buffer
+
+    # changes to the definition are compiled
+    params.partnership.duration.Sex.white.bins[1].max += 1
+    new_sampler = cache.get(("duration", "Sex", "white"), defn)
+    assert new_sampler is not sampler
+    assert new_sampler.maxs[0] == sampler.maxs[0] + 1
+    sampler = new_sampler
+
+    # a new definition is compiled
+    new_defn = params.partnership.duration.Sex.black
+    assert cache.get(("duration", "Sex", "white"), new_defn) is not sampler
+
+    cache.clear()
+    assert cache.samplers == {}
+
+
+@pytest.mark.unit
+def test_sparse_bernoulli():
+    for rand_gen in (np.random.default_rng(123), random.Random(123)):
+        assert sparse_bernoulli(rand_gen, 0, 0.5) == []
+        assert sparse_bernoulli(rand_gen, 10, 0.0) == []
+        assert sparse_bernoulli(rand_gen, 10, 1.0) == list(range(10))
+
+        successes = sparse_bernoulli(rand_gen, 100000, 0.01)
+        assert successes == sorted(set(successes))
+        assert 0 <= successes[0] and successes[-1] < 100000
+        assert 800 < len(successes) < 1200
+
+    # the gaps between successes are geometric
+    assert sparse_bernoulli(FakeRandom(0.4), 10, 0.5) == list(range(10))
+    assert sparse_bernoulli(FakeRandom(0.8), 10, 0.5) == [2, 5, 8]
@@ -0,0 +1,112 @@
+import pytest
+
+import pickle
+
+import numpy as np
+
+from titan.streams import *
+
+
+@pytest.mark.unit
+def test_random_stream():
+    stream = RandomStream(np.random.default_rng(123), block_size=4)
+    expected = np.random.default_rng(123).random(8)
+    assert [stream.random() for _ in range(8)] == list(expected)
+
+    # the rest of random.Random draws from the stream
+    assert 1 <= stream.randint(1, 3) <= 3
+    assert stream.choice([1, 2, 3]) in (1, 2, 3)
+    assert sorted(stream.sample([1, 2, 3], 3)) == [1, 2, 3]
+    assert 0 < stream.betavariate(2, 3) < 1
+
+    copied = pickle.loads(pickle.dumps(stream))
+    assert [copied.random() for _ in range(5)] == [stream.random() for _ in range(5)]
+
+
+@pytest.mark.unit
+def test_random_streams():
+    streams = RandomStreams(123)
+    assert streams.get("prep") is streams.get("prep")
+
+    # streams are independent of each other and how much they're used
+    other = RandomStreams(123)
+    for _ in range(10):
+        other.get("hiv").random()
+    assert [streams.get("prep").random() for _ in range(5)] == [
+        other.get("prep").random() for _ in range(5)
+    ]
+    assert streams.get("hiv").random() != streams.get("prep").random()
+
+    assert (
+        RandomStreams(456).get("prep").random()
+        != RandomStreams(123).get("prep").random()
+    )
+
+
+@pytest.mark.unit
+def test_philox():
+    # known answers from the Random123 test vectors
+    assert philox((0, 0, 0, 0), (0, 0)) == [
+        0x6627E8D5,
+        0xE169C58D,
+        0xBC57AC4C,
+        0x9B00DBD8,
+    ]
+    counter = (0x243F6A88, 0x85A308D3, 0x13198A2E, 0x03707344)
+    key = (0xA4093822, 0x299F31D0)
+    assert philox(counter, key) == [0xD16CFE09, 0x94FDCCEB, 0x5001E420, 0x24126EA1]
+
+    counters = np.array([counter, (0, 0, 0, 0)], dtype=np.uint64).T
+    assert philox_array(counters, key)[:, 0].tolist() == philox(counter, key)
+
+
+@pytest.mark.unit
+def test_counter_random():
+    counter_random = CounterRandom(123)
+    value = counter_random.random(3, 5, "agent|hiv")
+    assert 0 <= value < 1
+    assert counter_random.random(3, 5, "agent|hiv") == value
+    assert counter_random.random(3, 5, "agent|hiv", 1) != value
+    assert counter_random.random(4, 5, "agent|hiv") != value
+    assert counter_random.random(3, 6, "agent|hiv") != value
+    assert counter_random.random(3, 5, "agent|prep") != value
+    assert CounterRandom(456).random(3, 5, "agent|hiv") != value
+
+    # vectorized values are the same as one at a time
+    ids = np.array([5, 1, 9])
+    for index in range(3):
+        assert counter_random.uniforms(-2, ids, "agent|hiv", index).tolist() == [
+            counter_random.random(-2, i, "agent|hiv", index) for i in ids
+        ]
+
+    stream = counter_random.stream(3, 5, "agent|hiv")
+    assert [stream.random() for _ in range(3)] == [
+        counter_random.random(3, 5, "agent|hiv", i) for i in range(3)
+    ]
+    assert 1 <= stream.randint(1, 3) <= 3
+    assert stream.gen.poisson(3) >= 0
+
+    copied = pickle.loads(pickle.dumps(stream))
+    assert [copied.random() for _ in range(5)] == [stream.random() for _ in range(5)]
+
+
+@pytest.mark.unit
+def test_counter_stream_gen():
+    counter_random = CounterRandom(123)
+
+    # adjacent entities and (burn in) steps don't share or overlap numpy streams
+    draws = {
+        (step, entity_id): counter_random.stream(step, entity_id, "relationship|sex")
+        .gen.random(16)
+        .tolist()
+        for step in (-5, -2, -1, 0)
+        for entity_id in (5, 6)
+    }
+    values = [value for values in draws.values() for value in values]
+    assert len(set(values)) == len(values)
+
+    # and are reproducible
+    assert (
+        counter_random.stream(-2, 5, "relationship|sex").gen.random(16).tolist()
+        == draws[(-2, 5)]
+    )
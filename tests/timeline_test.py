@@ -0,0 +1,73 @@
+import pytest
+
+from titan.timeline import *
+from titan.location import Location
+from titan.parse_params import ObjMap
+
+
+@pytest.fixture
+def timeline_defs():
+    return ObjMap(
+        {
+            "prep": {
+                "parameter": "prep|cap",
+                "start_time": 2,
+                "stop_time": 4,
+                "scalar": 0.5,
+            },
+            "aids": {
+                "parameter": "demographics|white|sex_type|WSW|drug_type|NonInj|hiv|aids|init",
+                "start_time": 2,
+                "stop_time": 2,
+                "scalar": 0.5,
+            },
+        }
+    )
+
+
+@pytest.mark.unit
+def test_timeline_schedule(params, timeline_defs):
+    params.timeline_scaling.timeline = timeline_defs
+    timeline = Timeline(params)
+    timeline.add_layer(params)
+    timeline.compile()
+
+    assert [c.param for c in timeline.schedule[2]] == [
+        "prep|cap",
+        timeline_defs.aids.parameter,
+    ]
+    assert timeline.schedule[4] == [ParamChange(0, "prep|cap", 0.5, True)]
+    assert set(timeline.schedule) == {2, 4}
+
+
+@pytest.mark.unit
+def test_timeline_step(params, timeline_defs):
+    world = Location("world", params.classes.locations.world, params)
+
+    timeline = Timeline(params)
+    timeline.add_layer(params)
+    timeline.add_layer(world.params, params)
+
+    prep_cap = params.prep.cap
+    tables = world.tables
+    timeline.step(2)  # compiled from the original (default) definitions
+    assert params.prep.cap == prep_cap
+
+    # schedule is recompiled once the definitions are replaced
+    params.timeline_scaling.timeline = timeline_defs
+    timeline.step(1)
+    assert params.prep.cap == prep_cap
+
+    # the location's tables see the change
+    timeline.step(2)
+    assert world.tables is not tables
+    assert params.prep.cap == prep_cap * 0.5
+    assert world.params.prep.cap == prep_cap * 0.5
+    aids = world.params.demographics.white.sex_type.WSW.drug_type.NonInj.hiv.aids
+    assert aids.init == 0.5
+    assert params.demographics.white.sex_type.WSW.drug_type.NonInj.hiv.aids.init == 0.05
+
+    timeline.step(4)
+    assert params.prep.cap == prep_cap
+    assert world.params.prep.cap == prep_cap
+    assert aids.init == 0.5
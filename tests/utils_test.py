@@ -4,8 +4,10 @@ import os
 import sys
 import random
 import subprocess
+from copy import copy
 
 import numpy as np
+import networkx as nx
 import oyaml as yaml
 
 import titan.utils as utils
@@ -23,6 +25,49 @@ def test_check_rand_int():
         utils.get_check_rand_int(3.3)
 
 
+@pytest.mark.unit
+def test_memo():
+    calls = []
+
+    @utils.memo(maxsize=2)
+    def f(*args):
+        calls.append(args)
+        return len(calls)
+
+    assert f(1) == 1
+    assert f(1) == 1
+    assert f(2) == 2
+    assert f.cache_info() == utils.MemoInfo(hits=1, misses=2, maxsize=2, currsize=2)
+
+    # least recently used is evicted
+    f(1)
+    assert f(3) == 3
+    assert f(1) == 1
+    assert f(2) == 4
+    assert f.cache_info().currsize == 2
+
+    # ObjMaps are keyed by identity, not their constant hash
+    a = ObjMap({"x": 1})
+    b = ObjMap({"x": 2})
+    assert f(a) != f(b)
+    assert f(a) == f(a)
+
+    # results for params which have been changed aren't used
+    num_calls = len(calls)
+    a.x = 3
+    f(a)
+    assert len(calls) == num_calls + 1
+
+    # writing to other params doesn't change them
+    b.x = 3
+    f(a)
+    assert len(calls) == num_calls + 1
+
+    assert utils.get_memo_info()[f"{__name__}.test_memo.<locals>.f"] == f.cache_info()
+    f.cache_clear()
+    assert f.cache_info() == utils.MemoInfo(0, 0, 2, 0)
+
+
 @pytest.mark.unit
 def test_safe_divide():
     assert utils.safe_divide(1, 0) == 0.0
@@ -49,6 +94,38 @@ def test_safe_shuffle():
     assert utils.safe_shuffle([1, 2, 3], rand_gen) != [1, 2, 3]
 
 
+@pytest.mark.unit
+def test_random_set():
+    rand_set = utils.RandomSet([1, 2, 3, 2])
+    assert len(rand_set) == 3
+    assert list(rand_set) == [1, 2, 3]
+    assert rand_set == {1, 2, 3}
+
+    rand_set.add(4)
+    rand_set.discard(1)
+    rand_set.discard(5)
+    assert 1 not in rand_set
+    assert list(rand_set) == [4, 2, 3]
+    assert rand_set[0] == 4
+
+    with pytest.raises(KeyError):
+        rand_set.remove(1)
+
+    rand_set_copy = copy(rand_set)
+    rand_set_copy.add(5)
+    assert 5 not in rand_set
+    assert rand_set - {2} == {3, 4}
+
+    rand_gen = random.Random(123)
+    assert rand_set.choice(rand_gen) in (2, 3, 4)
+    assert utils.safe_random_choice(rand_set, rand_gen) in (2, 3, 4)
+    assert sorted(utils.safe_shuffle(rand_set, rand_gen)) == [2, 3, 4]
+
+    rand_set.clear()
+    assert len(rand_set) == 0
+    assert rand_set.choice(rand_gen) is None
+
+
 @pytest.mark.unit
 def test_safe_dist():
     rand_gen = np.random.RandomState(123)
@@ -199,6 +276,53 @@ def test_get_cumulative_bin(params):
     assert utils.get_independent_bin(rand_gen, bin_def) == len(bin_def)
 
 
+@pytest.mark.unit
+def test_dynamic_components():
+    graph = nx.Graph()
+    components = utils.DynamicComponents(lambda node: graph.adj[node])
+
+    def assert_matches_graph():
+        expected = sorted(sorted(c) for c in nx.connected_components(graph))
+        assert sorted(sorted(c) for c in components.iter_components()) == expected
+        for node in graph.nodes:
+            assert node in components.get_members(node)
+
+    for node in range(6):
+        graph.add_node(node)
+        components.add_node(node)
+    assert len(components) == 6
+
+    for edge in [(0, 1), (1, 2), (3, 4), (2, 0)]:
+        graph.add_edge(*edge)
+        components.add_edge(*edge)
+    assert_matches_graph()
+    assert components.get_root(0) == components.get_root(2)
+    assert len(components.pop_modified()) == 3
+    assert components.pop_modified() == set()
+
+    # still connected through 0 - 2
+    graph.remove_edge(0, 1)
+    components.remove_edge(0, 1)
+    assert components.dirty
+    assert_matches_graph()
+    assert not components.dirty
+
+    graph.remove_edge(1, 2)
+    components.remove_edge(1, 2)
+    assert_matches_graph()
+
+    graph.remove_node(3)
+    components.remove_node(3)
+    assert_matches_graph()
+    assert 3 not in components.parent
+
+    # adding an edge adds missing nodes
+    graph.add_edge(5, 6)
+    components.add_edge(5, 6)
+    assert_matches_graph()
+    assert len(components) == 4
+
+
 @pytest.mark.unit
 def test_grid_file_to_edges():
     grid_file = "tests/params/geography.csv"
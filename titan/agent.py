@@ -1,32 +1,109 @@
 #!/usr/bin/env python
 # encoding: utf-8
 
-from typing import Dict, Set, Optional, Iterator, Iterable
+from typing import Dict, Set, List, Optional, Iterator, Iterable, Tuple
+
+import numpy as np  # type: ignore
 
 from .utils import (
     safe_divide,
-    safe_dist,
-    get_independent_bin,
     safe_random_choice,
-    safe_random_int,
+    RandomSet,
 )
-from .location import Location
+from .location import Location, ParamTables, Demographics
 from . import features
 from . import exposures
 
 
+def _slot_values(obj) -> Dict[str, object]:
+    return {
+        attr: getattr(obj, attr)
+        for klass in type(obj).__mro__
+        for attr in getattr(klass, "__slots__", ())
+        if hasattr(obj, attr)
+    }
+
+
+def _new_with_id(cls: type, id: int):
+    # agents and relationships are hashed by id, which needs to be set before
+    # the rest of their state when unpickling sets that refer back to them
+    obj = cls.__new__(cls)
+    obj.id = id
+    return obj
+
+
 class Agent:
     """
     This class constructs and represents an agent within the population
+
+    Agents are slotted to keep them small.  As exposures and features are discovered from the subclasses of `BaseExposure` and `BaseFeature`, creating an `Agent` actually creates an instance of a slotted subclass with an attribute for each of them (see `Agent.get_extras_class`).
+
+    Exposures and features which are disabled in the agent's location's params are the class's shared null instance (see `BaseFeature.get_null`), enabled ones are created the first time they are used.
     """
 
+    __slots__ = (
+        "id",
+        "sex_type",
+        "age",
+        "race",
+        "drug_type",
+        "location",
+        "component",
+        "sex_role",
+        "relationships",
+        "partners",
+        "mean_num_partners",
+        "target_partners",
+        "cached_tables",
+        "cached_demographics",
+    )
+
+    # attributes the agent's demographic params depend on, see demographics
+    demographic_attrs = frozenset(("sex_type", "race", "drug_type", "location"))
+
     # class variable for agent creation
     next_agent_id = 0
 
+    # slotted subclass holding the exposures and features, see get_extras_class
+    extras_class: Optional[type] = None
+    # exposure and feature classes by attribute name
+    extras: Dict[str, type] = {}
+
     @classmethod
     def update_id_counter(cls, last_id):
         cls.next_agent_id = last_id + 1
 
+    @classmethod
+    def get_extras_class(cls) -> type:
+        """
+        Get the subclass of Agent with a slot for each exposure and feature, creating it if there isn't one yet or if exposures or features have been added since it was created.
+
+        returns:
+            slotted subclass of Agent
+        """
+        extras = {
+            extra.name: extra
+            for extra in exposures.BaseExposure.__subclasses__()
+            + features.BaseFeature.__subclasses__()
+        }
+        if Agent.extras_class is None or Agent.extras_class.extras != extras:
+            Agent.extras_class = type(
+                "Agent",
+                (Agent,),
+                {
+                    "__slots__": tuple(extras),
+                    "__module__": __name__,
+                    "extras": extras,
+                },
+            )
+
+        return Agent.extras_class
+
+    def __new__(cls, *args, **kwargs):
+        if cls is Agent:
+            cls = cls.get_extras_class()
+        return super().__new__(cls)
+
     def __init__(
         self,
         sex_type: str,
@@ -54,6 +131,10 @@ class Agent:
 
         self.update_id_counter(self.id)
 
+        # demographic params for the agent, see demographics
+        self.cached_tables: Optional[ParamTables] = None
+        self.cached_demographics: Optional[Demographics] = None
+
         # agent properties
         self.sex_type = sex_type
         self.age = age
@@ -70,14 +151,47 @@ class Agent:
         self.mean_num_partners: Dict[str, int] = {}
         self.target_partners: Dict[str, int] = {}
 
-        # agent exposures params
-        # model features
+        # agent exposures params, enabled exposures are created on first use
         for exposure in exposures.BaseExposure.__subclasses__():
-            setattr(self, exposure.name, exposure(self))
+            if not location.params.exposures[exposure.name]:
+                setattr(self, exposure.name, exposure.get_null())
 
-        # model features
+        # model features, enabled features are created on first use
         for feature in features.BaseFeature.__subclasses__():
-            setattr(self, feature.name, feature(self))
+            if not location.params.features[feature.name]:
+                setattr(self, feature.name, feature.get_null())
+
+    def __getattr__(self, name: str):
+        """
+        Create an enabled exposure or feature the first time it is used (only called if `name` isn't set on the agent)
+        """
+        extra = type(self).extras.get(name)
+        if extra is None:
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            )
+
+        value = extra(self)
+        setattr(self, name, value)
+        return value
+
+    def __setattr__(self, name: str, value):
+        if name in Agent.demographic_attrs:
+            object.__setattr__(self, "cached_tables", None)
+        object.__setattr__(self, name, value)
+
+    @property
+    def demographics(self) -> Demographics:
+        """
+        The agent's demographic params (`race`, `sex_type` and `drug_type` levels) from its location's param tables.  The lookup is cached on the agent until its location, race, sex_type or drug_type changes or the location's tables are recompiled (e.g. after timeline scaling).
+        """
+        tables = self.location.tables
+        if self.cached_tables is not tables:
+            self.cached_demographics = tables.demographics[
+                self.race, self.sex_type, self.drug_type
+            ]
+            self.cached_tables = tables
+        return self.cached_demographics  # type: ignore[return-value]
 
     def __str__(self) -> str:
         """
@@ -109,6 +223,11 @@ class Agent:
     def __hash__(self) -> int:
         return self.id
 
+    def __reduce__(self):
+        # the extras class shares its name with Agent, so pickle by way of
+        # `Agent.__new__`, which looks up the extras class again on load
+        return (_new_with_id, (Agent, self.id), (None, _slot_values(self)))
+
     @property
     def age_bin(self):
         for key, val in self.location.params.classes.age_bins.items():
@@ -187,7 +306,22 @@ class Agent:
 
 
 class Relationship:
-    """Class for agent relationships."""
+    """
+    Class for agent relationships.
+
+    Once a relationship is added to a population, it is a view onto its row of the population's `RelationshipStore`, which holds its remaining `duration`.
+    """
+
+    __slots__ = (
+        "agent1",
+        "agent2",
+        "id",
+        "store",
+        "index",
+        "detached_duration",
+        "total_duration",
+        "bond_type",
+    )
 
     # class variable for relationship creation
     next_rel_id = 0
@@ -230,8 +364,12 @@ class Relationship:
 
         self.update_id_counter(self.id)
 
+        # row in the population's RelationshipStore, once added
+        self.store: Optional[RelationshipStore] = None
+        self.index = -1
+
         # Relationship properties
-        self.duration = duration
+        self.detached_duration = duration
         self.total_duration = duration
         self.bond_type = bond_type
 
@@ -246,6 +384,25 @@ class Relationship:
     def __hash__(self) -> int:
         return self.id
 
+    def __reduce__(self):
+        return (_new_with_id, (Relationship, self.id), (None, _slot_values(self)))
+
+    @property
+    def duration(self) -> int:
+        """
+        Remaining target duration of the relationship.  Once the relationship is in a `RelationshipStore`, this is computed from the time step its row is scheduled to end.
+        """
+        if self.store is None:
+            return self.detached_duration
+        return int(self.store.end_time[self.index]) - self.store.time
+
+    @duration.setter
+    def duration(self, duration: int):
+        if self.store is None:
+            self.detached_duration = duration
+        else:
+            self.store.reschedule(self, self.store.time + duration)
+
     def progress(self, force: bool = False) -> bool:
         """
         Progress a relationship to the next time step (decrementing remaining target duration), or end a relationship if the duration is 0 or if `force` is set to `True`
@@ -304,12 +461,13 @@ class Relationship:
         else:
             raise ValueError("Agent must be in this relationship")
 
-    def get_number_of_sex_acts(self, rand_gen) -> int:
+    def get_number_of_sex_acts(self, rand_gen, buffered: bool = True) -> int:
         """
         Number of sex acts in the relationship during the time step.
 
         args:
             rand_gen: np random number generator (e.g. self.run_random in model)
+            buffered: whether values can be drawn ahead from `rand_gen` (see `Sampler.draw`)
 
         returns:
             number of sex acts
@@ -317,18 +475,14 @@ class Relationship:
         agent = safe_random_choice([self.agent1, self.agent2], rand_gen)
         freq_params = agent.location.params.partnership.sex.frequency[self.bond_type]
 
-        if freq_params.type == "bins":
-            i = get_independent_bin(rand_gen, freq_params.bins)
-            return safe_random_int(
-                freq_params.bins[i].min, freq_params.bins[i].max, rand_gen
-            )
-
-        elif freq_params.type == "distribution":
-            return round(safe_dist(freq_params.distribution, rand_gen))
-
-        else:
+        if freq_params.type not in ("bins", "distribution"):
             raise Exception("Sex acts must be defined as bin or distribution")
 
+        sampler = agent.location.samplers.get(
+            ("sex_acts", self.bond_type), freq_params, rounding="round"
+        )
+        return sampler.draw(rand_gen, buffered)
+
     def __str__(self):
         return (
             f"\t{self.id}\t{self.agent1.id}\t{self.agent2.id}\t{self.duration}\t"
@@ -339,6 +493,158 @@ class Relationship:
         return str(self.id)
 
 
+class RelationshipStore:
+    """
+    Columnar store of the relationships in a population.  Each relationship occupies a row of numpy arrays holding its bond type (as an index into `bond_types`) and the time step it ends, rows of removed relationships are put on a free list and reused.  A relationship's remaining `duration` is read from its row.
+
+    The store also acts as a timing wheel: rows are bucketed by the time step they end, so that each time step only the relationships which are ending need to be visited.  The store keeps its own clock which is advanced once per time step, a relationship's remaining duration is the difference between the time it ends and the clock.
+    """
+
+    def __init__(self, bond_types: Iterable[str], capacity: int = 1024):
+        """
+        Create an empty RelationshipStore
+
+        args:
+            bond_types: names of the bond types relationships can have [params.classes.bond_types]
+            capacity: number of rows to allocate initially, the store grows as needed
+        """
+        self.bond_types = list(bond_types)
+        self.bond_codes = {bond: i for i, bond in enumerate(self.bond_types)}
+        self.time = 0
+
+        self.bond = np.full(capacity, -1, dtype=np.int16)
+        self.end_time = np.zeros(capacity, dtype=np.int64)
+        self.rels: List[Optional[Relationship]] = [None] * capacity
+        self.free: List[int] = list(range(capacity - 1, -1, -1))
+
+        # end time -> rows of relationships ending at that time
+        self.buckets: Dict[int, RandomSet] = {}
+
+    def __len__(self) -> int:
+        return len(self.rels) - len(self.free)
+
+    def grow(self):
+        """
+        Double the number of rows in the store.
+        """
+        capacity = len(self.rels)
+        self.bond = np.concatenate([self.bond, np.full(capacity, -1, np.int16)])
+        self.end_time = np.concatenate([self.end_time, np.zeros_like(self.end_time)])
+        self.rels.extend([None] * capacity)
+        self.free.extend(range(2 * capacity - 1, capacity - 1, -1))
+
+    def add(self, rel: Relationship):
+        """
+        Move a relationship into a row of the store and schedule it to end after its remaining duration.
+
+        args:
+            rel: relationship to add
+        """
+        if rel.store is not None:
+            return
+
+        if not self.free:
+            self.grow()
+
+        i = self.free.pop()
+        self.bond[i] = self.bond_codes[rel.bond_type]
+        self.end_time[i] = self.time + rel.detached_duration
+        self.rels[i] = rel
+        self.schedule(i)
+
+        rel.store = self
+        rel.index = i
+
+    def remove(self, rel: Relationship):
+        """
+        Remove a relationship from the store, its remaining duration is frozen at its current value.
+
+        args:
+            rel: relationship to remove
+        """
+        if rel.store is not self:
+            return
+
+        i = rel.index
+        rel.detached_duration = rel.duration
+
+        self.unschedule(i)
+        self.bond[i] = -1
+        self.rels[i] = None
+        self.free.append(i)
+
+        rel.store = None
+        rel.index = -1
+
+    def reschedule(self, rel: Relationship, end_time: int):
+        """
+        Move a relationship to a new end time.
+
+        args:
+            rel: relationship to reschedule
+            end_time: time step the relationship should now end
+        """
+        if rel.store is not self:
+            return
+
+        i = rel.index
+        self.unschedule(i)
+        self.end_time[i] = end_time
+        self.schedule(i)
+
+    def schedule(self, i: int):
+        """
+        Add a row to the bucket for the time step it ends (or the current time step if it should already have ended).
+        """
+        end_time = max(int(self.end_time[i]), self.time)
+        self.buckets.setdefault(end_time, RandomSet()).add(i)
+
+    def unschedule(self, i: int):
+        """
+        Remove a row from its bucket.
+        """
+        end_time = max(int(self.end_time[i]), self.time)
+        bucket = self.buckets.get(end_time)
+        if bucket is not None:
+            bucket.discard(i)
+            if not bucket:
+                del self.buckets[end_time]
+
+    def ending(self) -> List[Relationship]:
+        """
+        Get the relationships which end at the current time step (with no remaining duration).
+
+        returns:
+            list of relationships
+        """
+        return [self.rels[i] for i in self.buckets.get(self.time, ())]  # type: ignore[misc]
+
+    def advance(self):
+        """
+        Advance the store's clock one time step, decrementing the remaining duration of all relationships in the store.  Relationships which had no remaining duration are carried over to the next time step.
+        """
+        ended = self.buckets.pop(self.time, None)
+        self.time += 1
+        if ended:
+            self.buckets.setdefault(self.time, RandomSet()).update(ended)
+
+    def iter_bond_types(self) -> Iterator[Tuple[str, List[Relationship]]]:
+        """
+        Get the relationships in the store grouped by bond type, read from the bond type column.
+
+        returns:
+            iterator of bond types and the relationships (in row order) with that bond type
+        """
+        rows_by_bond = np.argsort(self.bond, kind="stable")
+        counts = np.bincount(self.bond + 1, minlength=len(self.bond_types) + 1)
+        start = counts[0]  # free rows sort first
+        for code, bond_type in enumerate(self.bond_types):
+            stop = start + counts[code + 1]
+            if stop > start:
+                yield bond_type, [self.rels[i] for i in rows_by_bond[start:stop]]  # type: ignore[misc]
+            start = stop
+
+
 class AgentSet:
     """
     Container for agents into heirarchical sets (e.g. all_agents > hiv_agents)
@@ -358,7 +664,7 @@ class AgentSet:
         """
         # members stores agent set members in a dictionary keyed by ID
         self.id = id
-        self.members: Set[Agent] = set()
+        self.members: RandomSet = RandomSet()
         self.subset: Dict[str, AgentSet] = {}
 
         # parent_set stores the parent set if this set is a member of an
@@ -379,7 +685,7 @@ class AgentSet:
         """
         Clears a set of any members and subsets
         """
-        self.members: Set[Agent] = set()
+        self.members: RandomSet = RandomSet()
         self.subset: Dict[str, str] = {}
 
     def __iter__(self) -> Iterator[Agent]:
@@ -1,22 +1,28 @@
+import numpy as np  # type: ignore
 from numpy import log  # type: ignore
 
 """
 This file contains distributions that don't exist in numpy.
+
+Each distribution takes an optional `size`.  If passed, an array of that many values is drawn at once (this requires a numpy random number generator), otherwise a single value is drawn.
 """
 
 
-def set_value(np_random, value):
+def set_value(np_random, value, size=None):
     """
     A distribution that always returns the value passed
 
     args:
         np_random: random number generator (to conform to distribution interface)
         value: value to return
+        size: number of values to return
     """
-    return value
+    if size is None:
+        return value
+    return np.full(size, value)
 
 
-def pert(np_random, low, peak, high, temperature):
+def pert(np_random, low, peak, high, temperature, size=None):
     """
     A pert distribution, inspired by [tensorflow](https://github.com/tensorflow/probability/blob/c833ee5cd9f60f3257366b25447b9e50210b0590/tensorflow_probability/python/distributions/pert.py#L137)
 
@@ -35,6 +41,7 @@ def pert(np_random, low, peak, high, temperature):
         peak: modal point in distribution
         high: distribution high value
         temperature: scaling factor
+        size: number of values to draw
     """
     assert low < peak < high
     assert temperature > 0
@@ -42,10 +49,10 @@ def pert(np_random, low, peak, high, temperature):
     scale = high - low
     alpha = 1.0 + temperature * (peak - low) / scale
     beta = 1.0 + temperature * (high - peak) / scale
-    return low + scale * np_random.beta(alpha, beta)
+    return low + scale * np_random.beta(alpha, beta, size)
 
 
-def weibull_modified(np_random, shape, scale):
+def weibull_modified(np_random, shape, scale, size=None):
     """
     Modified version of numpy's (single parameter) weibull distribution to use the 2-parameter weibull.
 
@@ -53,15 +60,19 @@ def weibull_modified(np_random, shape, scale):
         np_random: random number generator
         shape: weibull shape parameter
         scale: weibull scale parameter
+        size: number of values to draw
     """
-    random_number = np_random.random()
+    if size is None:
+        random_number = np_random.random()
+    else:
+        random_number = np_random.random(size)
     return scale * (-log(1 - random_number)) ** (1 / shape)
 
 
-def poisson(np_rand, mu: float):
+def poisson(np_rand, mu: float, size=None):
     """
     Mirrors scipy poisson.rvs function as used in code
     """
     if mu < 0:
-        return 0
-    return np_rand.poisson(mu)
+        return 0 if size is None else np.zeros(size, dtype=np.int64)
+    return np_rand.poisson(mu, size)
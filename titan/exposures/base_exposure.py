@@ -3,19 +3,37 @@ from typing import List, Dict
 from .. import agent
 from .. import population
 from .. import model
+from .. import utils
 
 
 class BaseExposure:
+    __slots__ = ("active", "agent")
+
     name: str = ""
     """Name of exposure in the params file.  Also used to name the attribute in Agent"""
 
     stats: List[str] = []
     """List of names of stats that come from this exposure (e.g. hiv.dx)"""
 
+    is_null: bool = False
+    """Whether this is the shared instance used by agents for which the exposure is disabled"""
+
     def __init__(self, agent: "agent.Agent"):
         self.active = False
         self.agent = agent
 
+    @classmethod
+    def get_null(cls) -> "BaseExposure":
+        """
+        Get the immutable instance of this exposure shared by all agents for which it is disabled (see `utils.make_null`), so that references to the exposure from elsewhere in the model see an inactive exposure.
+
+        returns:
+            the null exposure
+        """
+        if "null_instance" not in cls.__dict__:
+            cls.null_instance = utils.make_null(cls)
+        return cls.null_instance  # type: ignore[attr-defined]
+
     @classmethod
     def init_class(cls, params):
         """
@@ -45,6 +63,16 @@ class BaseExposure:
         """
         pass
 
+    @classmethod
+    def update_pop(cls, model: "model.TITAN"):
+        """
+        Update the exposure for the entire population (class method).  This is called in `TITAN.update_all_agents` before agent-level updates are made.
+
+        args:
+            model: the instance of TITAN currently being run
+        """
+        pass
+
     @classmethod
     def add_agent(cls, agent: "agent.Agent"):
         """
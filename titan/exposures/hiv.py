@@ -1,4 +1,7 @@
-from typing import List, Dict, Optional, Set
+from collections import Counter
+from typing import List, Dict, Optional, Tuple
+
+import numpy as np  # type: ignore
 
 from . import base_exposure
 from .. import agent
@@ -8,6 +11,8 @@ from .. import utils
 
 
 class HIV(base_exposure.BaseExposure):
+    __slots__ = ("aids", "dx", "dx_time", "time")
+
     name: str = "hiv"
     stats: List[str] = ["hiv", "hiv_dx", "hiv_aids", "hiv_new", "hiv_dx_new"]
     """
@@ -23,9 +28,12 @@ class HIV(base_exposure.BaseExposure):
     dx_counts: Dict[str, Dict[str, int]] = {}
     """Counts of diagnosed agents by race and sex_type"""
 
-    agents: Set["agent.Agent"] = set()
+    agents: utils.RandomSet = utils.RandomSet()
     """Agents with active hiv"""
 
+    vectorized: bool = False
+    """Whether agents are diagnosed and progress to aids in `update_pop` instead of `update_agent` [params.hiv.vectorized]"""
+
     def __init__(self, agent: "agent.Agent"):
         super().__init__(agent)
 
@@ -47,7 +55,8 @@ class HIV(base_exposure.BaseExposure):
             race: {so: 0 for so in params.classes.sex_types}
             for race in params.classes.races
         }
-        cls.agents = set()
+        cls.agents = utils.RandomSet()
+        cls.vectorized = params.hiv.vectorized
 
     def init_agent(self, pop: "population.Population", time: int):
         """
@@ -59,11 +68,7 @@ class HIV(base_exposure.BaseExposure):
             pop: the population this agent is a part of
             time: the current time step
         """
-        agent_params = (
-            self.agent.location.params.demographics[self.agent.race]
-            .sex_type[self.agent.sex_type]
-            .drug_type[self.agent.drug_type]
-        )
+        agent_params = self.agent.demographics.drug_type
 
         # HIV
         if (
@@ -99,23 +104,108 @@ class HIV(base_exposure.BaseExposure):
         args:
             model: the instance of TITAN currently being run
         """
+        if self.vectorized:
+            return
+
         if self.active and model.time >= model.params.hiv.start_time:
             if not self.dx:
-                test_prob = (
-                    self.agent.location.params.demographics[self.agent.race]
-                    .sex_type[self.agent.sex_type]
-                    .drug_type[self.agent.drug_type]
-                    .hiv.dx.prob
-                )
+                test_prob = self.agent.demographics.drug_type.hiv.dx.prob
 
                 # Rescale based on calibration param
                 test_prob *= model.calibration.test_frequency
 
-                if model.run_random.random() < test_prob:
+                if model.get_random(self.name, self.agent).random() < test_prob:
                     self.diagnose(model)
 
             self.progress_to_aids(model)
 
+    @classmethod
+    def update_pop(cls, model: "model.TITAN"):
+        """
+        If hiv is vectorized [params.hiv.vectorized], determine which agents with hiv become diagnosed and which progress to aids, as `update_agent` does for each agent, but for all of them at once.
+
+        The probabilities are computed once per demographic cell (for diagnosis) and per location and haart status (for aids) and the random values are drawn as arrays.  With counter based random numbers [params.model.seed.counter_based], each agent gets the same values it would in `update_agent`.
+
+        args:
+            model: the instance of TITAN currently being run
+        """
+        if not cls.vectorized or model.time < model.params.hiv.start_time:
+            return
+
+        agents = list(cls.agents)
+        if not agents:
+            return
+
+        # index of each agent's cell, and the probabilities for each cell
+        test_cells: Dict[int, int] = {}
+        test_probs: List[float] = []
+        test_cell = np.empty(len(agents), dtype=np.int64)
+        aids_cells: Dict[Tuple, int] = {}
+        aids_probs: List[float] = []
+        aids_cell = np.empty(len(agents), dtype=np.int64)
+        for i, agent in enumerate(agents):
+            drug_type_params = agent.demographics.drug_type
+            cell = test_cells.get(id(drug_type_params))
+            if cell is None:
+                cell = len(test_probs)
+                test_cells[id(drug_type_params)] = cell
+                test_probs.append(
+                    drug_type_params.hiv.dx.prob * model.calibration.test_frequency
+                )
+            test_cell[i] = cell
+
+            haart = agent.haart  # type: ignore[attr-defined]
+            key = (agent.location, haart.active, haart.adherent)
+            cell = aids_cells.get(key)
+            if cell is None:
+                cell = len(aids_probs)
+                aids_cells[key] = cell
+                aids_probs.append(
+                    agent.location.params.hiv.aids.prob * haart.aids_scale()
+                )
+            aids_cell[i] = cell
+
+        dx = np.fromiter((agent.hiv.dx for agent in agents), dtype=bool, count=len(agents))  # type: ignore[attr-defined]
+
+        # undiagnosed agents draw for diagnosis, then all agents draw for aids
+        if model.use_counter_random:
+            ids = np.fromiter(
+                (agent.id for agent in agents), dtype=np.int64, count=len(agents)
+            )
+            purpose = f"agent|{cls.name}"
+            first = model.counter_random.uniforms(model.time, ids, purpose, 0)
+            second = model.counter_random.uniforms(model.time, ids, purpose, 1)
+            test_vals = first
+            aids_vals = np.where(dx, first, second)
+        else:
+            rand_gen = model.get_np_random(cls.name)
+            test_vals = rand_gen.random(len(agents))
+            aids_vals = rand_gen.random(len(agents))
+
+        newly_dx = ~dx & (test_vals < np.array(test_probs)[test_cell])
+        cls.diagnose_agents([agents[i] for i in np.flatnonzero(newly_dx)], model.time)
+
+        for i in np.flatnonzero(aids_vals < np.array(aids_probs)[aids_cell]):
+            agents[i].hiv.aids = True  # type: ignore[attr-defined]
+
+    @classmethod
+    def diagnose_agents(cls, agents: List["agent.Agent"], time: int):
+        """
+        Mark many agents with hiv as diagnosed at once, as `diagnose` does for one agent.
+
+        args:
+            agents: agents with active hiv which aren't diagnosed
+            time: the current time step
+        """
+        counts: Counter = Counter()
+        for agent in agents:
+            agent.hiv.dx = True  # type: ignore[attr-defined]
+            agent.hiv.dx_time = time  # type: ignore[attr-defined]
+            counts[(agent.race, agent.sex_type)] += 1
+
+        for (race, sex_type), count in counts.items():
+            cls.dx_counts[race][sex_type] += count
+
     @classmethod
     def add_agent(cls, agent: "agent.Agent"):
         """
@@ -191,7 +281,7 @@ class HIV(base_exposure.BaseExposure):
             model, interaction, partner, num_acts
         )
 
-        if model.run_random.random() < p:
+        if model.get_random("hiv", rel).random() < p:
             # if agent HIV+ partner becomes HIV+
             partner.hiv.convert(model)  # type: ignore[attr-defined]
 
@@ -264,7 +354,7 @@ class HIV(base_exposure.BaseExposure):
             p *= 1 - self.agent.location.params.hiv.dx.risk_reduction[interaction]
 
         # Racial calibration parameter to attain proper race incidence disparity
-        p *= partner.location.params.demographics[partner.race].hiv.transmission
+        p *= partner.demographics.race.hiv.transmission
 
         # Scaling parameter for per act transmission.
         p *= model.calibration.acquisition
@@ -328,5 +418,5 @@ class HIV(base_exposure.BaseExposure):
         aids_prob = self.agent.location.params.hiv.aids.prob
         p = self.agent.haart.aids_scale()  # type: ignore[attr-defined]
 
-        if model.run_random.random() < p * aids_prob:
+        if model.get_random(self.name, self.agent).random() < p * aids_prob:
             self.aids = True
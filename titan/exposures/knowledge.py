@@ -11,6 +11,8 @@ from .. import utils
 
 
 class Knowledge(base_exposure.BaseExposure):
+    __slots__ = ("opinion",)
+
     name: str = "knowledge"
     stats: List[str] = ["knowledge_aware"]
     """
@@ -57,7 +59,7 @@ class Knowledge(base_exposure.BaseExposure):
         if (
             model.time >= knowledge_params.start_time
             and not self.active
-            and model.run_random.random() < knowledge_params.prob
+            and model.get_random(self.name, self.agent).random() < knowledge_params.prob
         ):
             self.convert(model)
 
@@ -92,7 +94,7 @@ class Knowledge(base_exposure.BaseExposure):
             model, interaction, rel.agent2, num_acts
         )
 
-        if model.run_random.random() < p:
+        if model.get_random("knowledge", rel).random() < p:
             agent1_aware = rel.agent1.knowledge.active  # type: ignore[attr-defined]
             agent2_aware = rel.agent2.knowledge.active  # type: ignore[attr-defined]
 
@@ -143,10 +145,11 @@ class Knowledge(base_exposure.BaseExposure):
         self.active = True  # type: ignore[attr-defined]
         if (
             self.opinion > params.opinion.threshold  # type: ignore[attr-defined]
-            and model.run_random.random() < params.feature.prob
+            and model.get_random(self.name, self.agent).random() < params.feature.prob
         ):
             agent_attr = getattr(self.agent, params.feature.name)
-            agent_attr.initiate(model, force=True)
+            if not agent_attr.is_null:
+                agent_attr.initiate(model, force=True)
 
 
 # ===================== HELPER FUNCTIONS ===================
@@ -179,6 +182,7 @@ def influence(model: "model.TITAN", rel: "ag.Relationship"):
         < params.opinion.threshold
         < partner.knowledge.opinion  # type: ignore[attr-defined]
     ):
-        if model.run_random.random() < params.feature.prob:
+        if model.get_random("knowledge", rel).random() < params.feature.prob:
             agent_attr = getattr(partner, params.feature.name)
-            agent_attr.initiate(model, force=True)
+            if not agent_attr.is_null:
+                agent_attr.initiate(model, force=True)
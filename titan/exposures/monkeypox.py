@@ -1,4 +1,4 @@
-from typing import List, Dict, Optional, Set
+from typing import List, Dict, Optional
 
 from . import base_exposure
 from .. import agent
@@ -8,6 +8,8 @@ from .. import utils
 
 
 class MonkeyPox(base_exposure.BaseExposure):
+    __slots__ = ("dx", "dx_time", "time")
+
     name: str = "monkeypox"
     stats: List[str] = [
         "monkeypox",
@@ -27,7 +29,7 @@ class MonkeyPox(base_exposure.BaseExposure):
     dx_counts: Dict[str, Dict[str, int]] = {}
     """Counts of diagnosed agents by race and sex_type"""
 
-    agents: Set["agent.Agent"] = set()
+    agents: utils.RandomSet = utils.RandomSet()
     """Agents who have ever had monkeypox"""
 
     def __init__(self, agent: "agent.Agent"):
@@ -50,7 +52,7 @@ class MonkeyPox(base_exposure.BaseExposure):
             race: {so: 0 for so in params.classes.sex_types}
             for race in params.classes.races
         }
-        cls.agents = set()
+        cls.agents = utils.RandomSet()
 
     def init_agent(self, pop: "population.Population", time: int):
         """
@@ -62,11 +64,7 @@ class MonkeyPox(base_exposure.BaseExposure):
             pop: the population this agent is a part of
             time: the current time step
         """
-        agent_params = (
-            self.agent.location.params.demographics[self.agent.race]
-            .sex_type[self.agent.sex_type]
-            .drug_type[self.agent.drug_type]
-        )
+        agent_params = self.agent.demographics.drug_type
 
         # Monkeypox
         if (
@@ -101,17 +99,12 @@ class MonkeyPox(base_exposure.BaseExposure):
         """
         if self.active and model.time >= model.params.monkeypox.start_time:
             if not self.dx:
-                test_prob = (
-                    self.agent.location.params.demographics[self.agent.race]
-                    .sex_type[self.agent.sex_type]
-                    .drug_type[self.agent.drug_type]
-                    .monkeypox.dx.prob
-                )
+                test_prob = self.agent.demographics.drug_type.monkeypox.dx.prob
 
                 # Rescale based on calibration param
                 test_prob *= model.calibration.test_frequency
 
-                if model.run_random.random() < test_prob:
+                if model.get_random(self.name, self.agent).random() < test_prob:
                     self.diagnose(model)
 
     @classmethod
@@ -187,7 +180,7 @@ class MonkeyPox(base_exposure.BaseExposure):
             model, interaction, partner, num_acts
         )
 
-        if model.run_random.random() < p:
+        if model.get_random("monkeypox", rel).random() < p:
             # if agent monkeypox+ partner becomes monkeypox+
             partner.monkeypox.convert(model)  # type: ignore[attr-defined]
 
@@ -241,7 +234,7 @@ class MonkeyPox(base_exposure.BaseExposure):
             p *= 1 - self.agent.location.params.monkeypox.dx.risk_reduction[interaction]
 
         # Racial calibration parameter to attain proper race incidence disparity
-        p *= partner.location.params.demographics[partner.race].monkeypox.transmission
+        p *= partner.demographics.race.monkeypox.transmission
 
         # Scaling parameter for per act transmission.
         p *= model.calibration.acquisition
@@ -3,6 +3,7 @@ from typing import List, Dict
 from .. import agent
 from .. import population
 from .. import model
+from .. import utils
 
 
 class BaseFeature:
@@ -19,12 +20,17 @@ class BaseFeature:
     method).
     """
 
+    __slots__ = ("active", "agent")
+
     name: str = ""
     """Name of feature in the params file.  Also used to name the attribute in Agent"""
 
     stats: List[str] = []
     """List of names of stats that come from this feature (e.g. numFeat)"""
 
+    is_null: bool = False
+    """Whether this is the shared instance used by agents for which the feature is disabled"""
+
     def __init__(self, agent: "agent.Agent"):
         """
         Constructor for an instance of the feature.  This is called from within `Agent.__init__` and passes the agent to the feature to create a two way binding.  All features must have the attributes of `active` and `agent`.  By default `active` is false and `agent` is the passed agent.
@@ -37,6 +43,18 @@ class BaseFeature:
         self.active = False
         self.agent = agent
 
+    @classmethod
+    def get_null(cls) -> "BaseFeature":
+        """
+        Get the immutable instance of this feature shared by all agents for which it is disabled (see `utils.make_null`), so that references to the feature from elsewhere in the model see an inactive feature.
+
+        returns:
+            the null feature
+        """
+        if "null_instance" not in cls.__dict__:
+            cls.null_instance = utils.make_null(cls)
+        return cls.null_instance  # type: ignore[attr-defined]
+
     @classmethod
     def init_class(cls, params):
         """
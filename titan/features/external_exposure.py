@@ -5,6 +5,8 @@ from .. import model
 
 
 class ExternalExposure(base_feature.BaseFeature):
+    __slots__ = ()
+
     name = "external_exposure"
 
     def __init__(self, agent: "agent.Agent"):
@@ -37,6 +39,9 @@ class ExternalExposure(base_feature.BaseFeature):
             model: the instance of TITAN currently being run
         """
         params = self.agent.location.params.external_exposure
-        if self.active and model.run_random.random() < params.convert_prob:
+        if (
+            self.active
+            and model.get_random(self.name, self.agent).random() < params.convert_prob
+        ):
             agent_exposure = getattr(self.agent, params.exposure)
             agent_exposure.convert(model)
@@ -12,6 +12,8 @@ class HAART(base_feature.BaseFeature):
     Highly Active Antiretroviral Theray (HAART) is a treatment regimen.
     """
 
+    __slots__ = ("adherent", "ever")
+
     name = "haart"
     stats = ["haart"]
     """
@@ -52,12 +54,7 @@ class HAART(base_feature.BaseFeature):
             pop: the population this agent is a part of
             time: the current time step
         """
-        haart_params = (
-            self.agent.location.params.demographics[self.agent.race]
-            .sex_type[self.agent.sex_type]
-            .drug_type[self.agent.drug_type]
-            .haart
-        )
+        haart_params = self.agent.demographics.drug_type.haart
         if (
             self.agent.hiv.dx  # type: ignore[attr-defined]
             and pop.pop_random.random() < haart_params.init
@@ -78,12 +75,7 @@ class HAART(base_feature.BaseFeature):
             and model.time >= model.params.hiv.start_time  # haart starts with hiv
         ):
             # Determine probability of HIV treatment
-            haart_params = (
-                self.agent.location.params.demographics[self.agent.race]
-                .sex_type[self.agent.sex_type]
-                .drug_type[self.agent.drug_type]
-                .haart
-            )
+            haart_params = self.agent.demographics.drug_type.haart
             # Go on HAART
             if not self.active:
                 self.enroll(model, haart_params)
@@ -91,20 +83,25 @@ class HAART(base_feature.BaseFeature):
             # Update agents on HAART
             else:
                 # Go off HAART
-                if model.run_random.random() < haart_params.discontinue:
+                if (
+                    model.get_random(self.name, self.agent).random()
+                    < haart_params.discontinue
+                ):
                     self.active = False
                     self.adherent = False
                     self.remove_agent(self.agent)
                 # Become non-adherent
                 elif (
                     self.adherent
-                    and model.run_random.random() < haart_params.adherence.discontinue
+                    and model.get_random(self.name, self.agent).random()
+                    < haart_params.adherence.discontinue
                 ):
                     self.adherent = False
                 # Become adherent
                 elif (
                     not self.adherent
-                    and model.run_random.random() < haart_params.adherence.become
+                    and model.get_random(self.name, self.agent).random()
+                    < haart_params.adherence.become
                 ):
                     self.adherent = True
 
@@ -204,7 +201,7 @@ class HAART(base_feature.BaseFeature):
 
         # take value from dictionary for cap
         if num_haart_agents < (haart_params.cap * num_dx_agents):
-            self.initiate(model.run_random, haart_params, "prob")
+            self.initiate(model.get_random(self.name, self.agent), haart_params, "prob")
 
     def enroll_prob(self, model: "model.TITAN", haart_params: ObjMap):
         """
@@ -215,8 +212,13 @@ class HAART(base_feature.BaseFeature):
             haart_params: the HAART demographic params for this agent
         """
         if self.ever and self.agent.location.params.haart.use_reinit:
-            if model.run_random.random() < haart_params.reinit.prob:
-                self.initiate(model.run_random, haart_params, "prob")
+            if (
+                model.get_random(self.name, self.agent).random()
+                < haart_params.reinit.prob
+            ):
+                self.initiate(
+                    model.get_random(self.name, self.agent), haart_params, "prob"
+                )
         else:
             # Find enroll probability based on time since diagnosis
             enroll_prob = 0.0
@@ -226,8 +228,10 @@ class HAART(base_feature.BaseFeature):
                     enroll_prob = i.prob * model.calibration.haart.coverage
                     break
 
-            if model.run_random.random() < (enroll_prob):
-                self.initiate(model.run_random, haart_params, "prob")
+            if model.get_random(self.name, self.agent).random() < (enroll_prob):
+                self.initiate(
+                    model.get_random(self.name, self.agent), haart_params, "prob"
+                )
 
     def initiate(self, rand_gen, haart_params: ObjMap, init_or_prob: str):
         """
@@ -11,6 +11,8 @@ from ..distributions import poisson
 
 
 class HighRisk(base_feature.BaseFeature):
+    __slots__ = ("duration", "ever", "time")
+
     name = "high_risk"
     stats = [
         "high_risk_new",
@@ -51,12 +53,7 @@ class HighRisk(base_feature.BaseFeature):
             pop: the population this agent is a part of
             time: the current time step
         """
-        if (
-            pop.pop_random.random()
-            < self.agent.location.params.demographics[self.agent.race]
-            .sex_type[self.agent.sex_type]
-            .high_risk.init
-        ):
+        if pop.pop_random.random() < self.agent.demographics.sex_type.high_risk.init:
             self.become_high_risk(pop, time)
 
     def update_agent(self, model: "model.TITAN"):
@@ -81,7 +78,7 @@ class HighRisk(base_feature.BaseFeature):
                 ):
                     if (
                         not partner.high_risk.active  # type: ignore[attr-defined]
-                        and model.run_random.random()
+                        and model.get_random(self.name, self.agent).random()
                         < partner.location.params.high_risk.prob
                     ):
                         partner.high_risk.become_high_risk(model.pop, model.time)  # type: ignore[attr-defined]
@@ -100,7 +97,8 @@ class HighRisk(base_feature.BaseFeature):
                     len(self.agent.partners[bond]) - num_ended
                 ) > self.agent.target_partners[bond]:
                     rel = utils.safe_random_choice(
-                        self.agent.relationships, model.run_random
+                        self.agent.relationships,
+                        model.get_random(self.name, self.agent),
                     )
                     if rel is not None:
                         num_ended += 1
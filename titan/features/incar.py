@@ -8,6 +8,8 @@ from .. import utils
 
 
 class Incar(base_feature.BaseFeature):
+    __slots__ = ("release_time", "time")
+
     name = "incar"
     stats = ["incar", "incar_hiv", "new_release", "new_release_hiv"]
     """
@@ -36,11 +38,7 @@ class Incar(base_feature.BaseFeature):
             pop: the population this agent is a part of
             time: the current time step
         """
-        incar_params = (
-            self.agent.location.params.demographics[self.agent.race]
-            .sex_type[self.agent.sex_type]
-            .incar
-        )
+        incar_params = self.agent.demographics.sex_type.incar
         jail_duration = incar_params.duration.init
 
         prob_incar = incar_params.init
@@ -85,47 +83,45 @@ class Incar(base_feature.BaseFeature):
                 if hiv_bool:
                     if self.agent.haart.active:  # type: ignore[attr-defined]
                         if (
-                            model.run_random.random()
+                            model.get_random(self.name, self.agent).random()
                             <= self.agent.location.params.incar.haart.discontinue
                         ):
                             self.agent.haart.active = False  # type: ignore[attr-defined]
                             self.agent.haart.adherent = False  # type: ignore[attr-defined]
 
         # should the agent become incarcerated?
-        elif model.run_random.random() < (
-            self.agent.location.params.demographics[self.agent.race]
-            .sex_type[self.agent.sex_type]
-            .incar.prob
+        elif model.get_random(self.name, self.agent).random() < (
+            self.agent.demographics.sex_type.incar.prob
             * hiv_multiplier
             * model.calibration.incarceration
         ):
-            incar_duration = (
-                self.agent.location.params.demographics[self.agent.race]
-                .sex_type[self.agent.sex_type]
-                .incar.duration.prob
-            )
+            incar_duration = self.agent.demographics.sex_type.incar.duration.prob
 
-            bin = utils.get_cumulative_bin(model.run_random, incar_duration)
+            bin = utils.get_cumulative_bin(
+                model.get_random(self.name, self.agent), incar_duration
+            )
 
             self.time = model.time
             self.release_time = model.time + utils.safe_random_int(
-                incar_duration[bin].min, incar_duration[bin].max, model.run_random
+                incar_duration[bin].min,
+                incar_duration[bin].max,
+                model.get_random(self.name, self.agent),
             )
             self.active = True
 
             if hiv_bool:
                 if not self.agent.hiv.dx:  # type: ignore[attr-defined]
                     if (
-                        model.run_random.random()
+                        model.get_random(self.name, self.agent).random()
                         < self.agent.location.params.incar.hiv.dx
                     ):
                         self.agent.hiv.diagnose(model)  # type: ignore[attr-defined]
                 else:  # Then tested and HIV, check to enroll in ART
                     if (
-                        model.run_random.random()
+                        model.get_random(self.name, self.agent).random()
                         < self.agent.location.params.incar.haart.prob
                     ):
-                        self.agent.haart.adherent = model.run_random.random() < self.agent.location.params.incar.haart.adherence  # type: ignore[attr-defined]
+                        self.agent.haart.adherent = model.get_random(self.name, self.agent).random() < self.agent.location.params.incar.haart.adherence  # type: ignore[attr-defined]
                         # Add agent to HAART class set, update agent params
                         self.agent.haart.active = True  # type: ignore[attr-defined]
 
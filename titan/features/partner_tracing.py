@@ -4,6 +4,8 @@ from .. import model
 
 
 class PartnerTracing(base_feature.BaseFeature):
+    __slots__ = ("time",)
+
     name = "partner_tracing"
 
     def __init__(self, agent: "agent.Agent"):
@@ -35,7 +37,8 @@ class PartnerTracing(base_feature.BaseFeature):
                     partner_exposure = getattr(ptnr, params.exposure)
                     if (
                         not partner_exposure.dx
-                        and model.run_random.random() < params.prob
+                        and model.get_random(self.name, self.agent).random()
+                        < params.prob
                     ):
                         ptnr.partner_tracing.active = True  # type: ignore[attr-defined]
                         ptnr.partner_tracing.time = model.time  # type: ignore[attr-defined]
@@ -45,7 +48,7 @@ class PartnerTracing(base_feature.BaseFeature):
                 self.active
                 and self.time < model.time
                 and not agent_exposure.dx
-                and model.run_random.random() < params.dx_prob
+                and model.get_random(self.name, self.agent).random() < params.dx_prob
             ):
                 agent_exposure.diagnose(model)
 
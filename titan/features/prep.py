@@ -11,6 +11,8 @@ from .. import exposures
 
 
 class Prep(base_feature.BaseFeature):
+    __slots__ = ("adherent", "last_dose_time", "time", "type")
+
     name = "prep"
     stats = ["prep", "prep_new", "prep_injectable", "prep_oral"]
     """
@@ -57,12 +59,7 @@ class Prep(base_feature.BaseFeature):
         params = self.agent.location.params
         if self.eligible(time):
             if "Racial" in params.prep.target_model:
-                if (
-                    pop.pop_random.random()
-                    < params.demographics[self.agent.race]
-                    .sex_type[self.agent.sex_type]
-                    .prep.init
-                ):
+                if pop.pop_random.random() < self.agent.demographics.sex_type.prep.init:
                     self.enroll(pop.pop_random, time)
             elif pop.pop_random.random() < params.prep.init:
                 self.enroll(pop.pop_random, time)
@@ -166,19 +163,17 @@ class Prep(base_feature.BaseFeature):
         params = self.agent.location.params
 
         if force:
-            self.enroll(model.run_random, model.time)
+            self.enroll(model.get_random(self.name, self.agent), model.time)
         elif params.prep.cap_as_prob:
             if "Racial" in params.prep.target_model:
                 if (
-                    model.run_random.random()
-                    <= params.demographics[self.agent.race]
-                    .sex_type[self.agent.sex_type]
-                    .prep.cap
+                    model.get_random(self.name, self.agent).random()
+                    <= self.agent.demographics.sex_type.prep.cap
                 ):
-                    self.enroll(model.run_random, model.time)
+                    self.enroll(model.get_random(self.name, self.agent), model.time)
             else:
-                if model.run_random.random() <= params.prep.cap:
-                    self.enroll(model.run_random, model.time)
+                if model.get_random(self.name, self.agent).random() <= params.prep.cap:
+                    self.enroll(model.get_random(self.name, self.agent), model.time)
         else:
             if "Racial" in params.prep.target_model:
                 num_prep_agents = self.counts[self.agent.race]
@@ -188,9 +183,9 @@ class Prep(base_feature.BaseFeature):
                 }
 
                 num_hiv_agents = len(all_hiv_agents & all_race)
-                target_prep = (len(all_race) - num_hiv_agents) * params.demographics[
-                    self.agent.race
-                ].sex_type[self.agent.sex_type].prep.cap
+                target_prep = (
+                    len(all_race) - num_hiv_agents
+                ) * self.agent.demographics.sex_type.prep.cap
             else:
                 num_prep_agents = sum(self.counts.values())
                 target_prep = int(
@@ -199,7 +194,7 @@ class Prep(base_feature.BaseFeature):
                 )
 
             if num_prep_agents < target_prep:
-                self.enroll(model.run_random, model.time)
+                self.enroll(model.get_random(self.name, self.agent), model.time)
 
     def enroll(self, rand_gen, time):
         """
@@ -215,10 +210,7 @@ class Prep(base_feature.BaseFeature):
         self.last_dose_time = time
 
         self.adherent = (
-            rand_gen.random()
-            < params.demographics[self.agent.race]
-            .sex_type[self.agent.sex_type]
-            .prep.adherence
+            rand_gen.random() < self.agent.demographics.sex_type.prep.adherence
         )
 
         if "Inj" in params.prep.type and "Oral" in params.prep.type:
@@ -246,10 +238,8 @@ class Prep(base_feature.BaseFeature):
 
         if self.type == "Oral":
             if (
-                model.run_random.random()
-                < self.agent.location.params.demographics[self.agent.race]
-                .sex_type[self.agent.sex_type]
-                .prep.discontinue
+                model.get_random(self.name, self.agent).random()
+                < self.agent.demographics.sex_type.prep.discontinue
             ):
                 self.discontinue()
             else:
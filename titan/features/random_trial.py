@@ -9,6 +9,8 @@ import networkx as nx  # type: ignore
 
 
 class RandomTrial(base_feature.BaseFeature):
+    __slots__ = ("suitable", "treated")
+
     name = "random_trial"
     stats = [
         "random_trial",
@@ -74,7 +76,7 @@ class RandomTrial(base_feature.BaseFeature):
         )
         for comp in components:
             total_nodes += comp.number_of_nodes()
-            if model.run_random.random() < rt_params.prob:
+            if model.get_random(cls.name).random() < rt_params.prob:
                 # Component selected as treatment pod!
                 for agent in comp.nodes:
                     agent.random_trial.active = True
@@ -116,14 +118,14 @@ class RandomTrial(base_feature.BaseFeature):
                     ]  # all suitable agents in bridges
 
                     chosen_agent = utils.safe_random_choice(
-                        suitable_agents, model.run_random
+                        suitable_agents, model.get_random(cls.name)
                     )  # select change agent
                     if chosen_agent is not None:
                         chosen_agent.random_trial.suitable = True  # type: ignore[attr-defined]
 
                     else:  # if no suitable agents, mark a non-suitable agent
                         chosen_agent = utils.safe_random_choice(
-                            list(comp.nodes), model.run_random
+                            list(comp.nodes), model.get_random(cls.name)
                         )
 
                     chosen_agent.random_trial.treated = True  # type: ignore[attr-defined]
@@ -138,14 +140,14 @@ class RandomTrial(base_feature.BaseFeature):
                     # if there are agents who meet eligibility criteria,
                     # select one randomly
                     chosen_agent = utils.safe_random_choice(
-                        suitable_agents, model.run_random
+                        suitable_agents, model.get_random(cls.name)
                     )
 
                     if chosen_agent is not None:
                         chosen_agent.random_trial.suitable = True
                     else:  # if no suitable agents, mark a non-suitable agent
                         chosen_agent = utils.safe_random_choice(
-                            list(comp.nodes), model.run_random
+                            list(comp.nodes), model.get_random(cls.name)
                         )
 
                     chosen_agent.random_trial.treated = True  # type: ignore[attr-defined]
@@ -170,14 +172,16 @@ class RandomTrial(base_feature.BaseFeature):
 
 
 def treat_prep(agent, model):
-    agent.prep.enroll(model.run_random, model.time)
+    agent.prep.enroll(model.get_random("random_trial", agent), model.time)
 
 
 def suitable_prep(agent, model) -> bool:
     if (
-        not agent.hiv.active
+        not agent.prep.is_null
+        and not agent.hiv.active
         and not agent.prep.active
-        and model.run_random.random() < agent.location.params.prep.cap
+        and model.get_random("random_trial", agent).random()
+        < agent.location.params.prep.cap
         and not agent.vaccine.active
     ):
         return True
@@ -6,6 +6,8 @@ from .. import utils
 
 
 class SyringeServices(base_feature.BaseFeature):
+    __slots__ = ()
+
     name = "syringe_services"
 
     enrolled_risk = 0.0
@@ -55,7 +57,7 @@ class SyringeServices(base_feature.BaseFeature):
                 num_pwid_agents = model.pop.pwid_agents.num_members()
                 if 0 < ssp_num_slots < num_pwid_agents:
                     ssp_num_slots = round(
-                        model.run_random.betavariate(
+                        model.get_random(cls.name).betavariate(
                             ssp_num_slots,
                             num_pwid_agents - ssp_num_slots,
                         )
@@ -64,7 +66,8 @@ class SyringeServices(base_feature.BaseFeature):
                 break
 
         target_set = utils.safe_shuffle(
-            (model.pop.pwid_agents.members - ssp_agents), model.run_random
+            (model.pop.pwid_agents.members - ssp_agents),
+            model.get_random(cls.name),
         )
 
         # unenroll agents if above cap
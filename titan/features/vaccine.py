@@ -9,6 +9,8 @@ from .. import model
 
 
 class Vaccine(base_feature.BaseFeature):
+    __slots__ = ("time", "type")
+
     name = "vaccine"
     stats = ["vaccine"]
     """
@@ -36,10 +38,7 @@ class Vaccine(base_feature.BaseFeature):
         if (
             not self.agent.hiv.active  # type: ignore[attr-defined]
             and self.agent.location.params.vaccine.on_init
-            and pop.pop_random.random()
-            < self.agent.location.params.demographics[self.agent.race]
-            .sex_type[self.agent.sex_type]
-            .vaccine.init
+            and pop.pop_random.random() < self.agent.demographics.sex_type.vaccine.init
         ):
             self.vaccinate(time)
 
@@ -57,21 +56,18 @@ class Vaccine(base_feature.BaseFeature):
             and not self.agent.hiv.active  # type: ignore[attr-defined]
         ):
             vaccine_params = self.agent.location.params.vaccine
-            agent_params = (
-                self.agent.location.params.demographics[self.agent.race]
-                .sex_type[self.agent.sex_type]
-                .vaccine
-            )
+            agent_params = self.agent.demographics.sex_type.vaccine
 
             if self.active:
                 if (
                     vaccine_params.booster
                     and (model.time - self.time) == agent_params.booster.interval
-                    and model.run_random.random() < agent_params.booster.prob
+                    and model.get_random(self.name, self.agent).random()
+                    < agent_params.booster.prob
                 ):
                     self.vaccinate(model.time)
             elif model.time == vaccine_params.start_time:
-                if model.run_random.random() < agent_params.prob:
+                if model.get_random(self.name, self.agent).random() < agent_params.prob:
                     self.vaccinate(model.time)
 
     def set_stats(self, stats: Dict[str, int], time: int):
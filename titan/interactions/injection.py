@@ -23,22 +23,14 @@ class Injection(base_interaction.BaseInteraction):
         assert rel.agent1.drug_type == "Inj"
         assert rel.agent2.drug_type == "Inj"
 
-        agent_params = (
-            rel.agent1.location.params.demographics[rel.agent1.race]
-            .sex_type[rel.agent1.sex_type]
-            .injection
-        )
-        partner_params = (
-            rel.agent2.location.params.demographics[rel.agent2.race]
-            .sex_type[rel.agent2.sex_type]
-            .injection
-        )
+        agent_params = rel.agent1.demographics.sex_type.injection
+        partner_params = rel.agent2.demographics.sex_type.injection
 
         mean_num_acts = (
             min(agent_params.num_acts, partner_params.num_acts)
             * model.calibration.injection.act
         )
-        share_acts = poisson(model.np_random, mean_num_acts)
+        share_acts = poisson(model.get_np_random(cls.name, rel), mean_num_acts)
 
         if share_acts < 1:
             return 0
@@ -54,8 +46,9 @@ class Injection(base_interaction.BaseInteraction):
         if rel.agent1.hiv.dx or rel.agent1.hiv.dx:  # type: ignore[attr-defined]
             p_unsafe_injection *= 1 - model.params.hiv.dx.risk_reduction.injection
 
+        rand_gen = model.get_random(cls.name, rel)
         for n in range(share_acts):
-            if model.run_random.random() > p_unsafe_injection:
+            if rand_gen.random() > p_unsafe_injection:
                 share_acts -= 1
 
         return share_acts
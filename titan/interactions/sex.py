@@ -16,19 +16,17 @@ class Sex(base_interaction.BaseInteraction):
             model: The model being run
             rel : Relationship
         """
+        np_random = model.get_np_random(cls.name, rel)
         # unprotected sex probabilities for primary partnerships
+        # (counter-based generators are per relationship, so aren't drawn ahead from)
         mean_sex_acts = (
-            rel.get_number_of_sex_acts(model.np_random) * model.calibration.sex.act
+            rel.get_number_of_sex_acts(np_random, buffered=not model.use_counter_random)
+            * model.calibration.sex.act
         )
-        total_sex_acts = poisson(model.np_random, mean_sex_acts)
+        total_sex_acts = poisson(np_random, mean_sex_acts)
 
         # Get condom usage
-        p_safe_sex = (
-            rel.agent1.location.params.demographics[rel.agent1.race]
-            .sex_type[rel.agent1.sex_type]
-            .safe_sex[rel.bond_type]
-            .prob
-        )
+        p_safe_sex = rel.agent1.demographics.sex_type.safe_sex[rel.bond_type].prob
 
         # increase condom usage if diagnosed
         if rel.agent1.hiv.dx or rel.agent2.hiv.dx:  # type: ignore[attr-defined]
@@ -40,8 +38,9 @@ class Sex(base_interaction.BaseInteraction):
 
         # Reduction of risk acts between partners for condom usage
         unsafe_sex_acts = total_sex_acts
+        rand_gen = model.get_random(cls.name, rel)
         for n in range(unsafe_sex_acts):
-            if model.run_random.random() < p_safe_sex:
+            if rand_gen.random() < p_safe_sex:
                 unsafe_sex_acts -= 1
 
         return unsafe_sex_acts
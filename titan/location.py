@@ -1,11 +1,55 @@
-from typing import Optional, Set, Dict, List, Any
-from copy import deepcopy
+from typing import Optional, Set, Dict, List, Any, Tuple, NamedTuple
+from copy import copy
 import math
 import os
 import csv
 
-from .parse_params import ObjMap
+from .parse_params import ObjMap, FrozenParams
+from . import parse_params
 from . import utils
+from . import samplers
+
+
+class Demographics(NamedTuple):
+    """
+    The params for each level of a demographic group (e.g. `race` is `params.demographics[race]`)
+    """
+
+    race: FrozenParams
+    sex_type: FrozenParams
+    drug_type: FrozenParams
+
+
+class ParamTables:
+    """
+    Frozen copies of a location's demographic params, looked up by a tuple of the demographic attributes instead of walking `params.demographics[race].sex_type[sex_type].drug_type[drug_type]` through ObjMaps.
+
+    * `race[race]`
+    * `sex_type[race, sex_type]`
+    * `drug_type[race, sex_type, drug_type]`
+    * `demographics[race, sex_type, drug_type]` - all three levels as a `Demographics`
+    """
+
+    def __init__(self, params: ObjMap):
+        """
+        Compile the tables from a location's params
+
+        args:
+            params: location's parameters
+        """
+        demographics = FrozenParams(params.demographics)
+        self.race: Dict[str, FrozenParams] = dict(demographics.items())
+        self.sex_type: Dict[Tuple[str, str], FrozenParams] = {}
+        self.drug_type: Dict[Tuple[str, str, str], FrozenParams] = {}
+        self.demographics: Dict[Tuple[str, str, str], Demographics] = {}
+        for race, race_params in self.race.items():
+            for st, st_params in race_params.sex_type.items():
+                self.sex_type[race, st] = st_params
+                for dt, dt_params in st_params.drug_type.items():
+                    self.drug_type[race, st, dt] = dt_params
+                    self.demographics[race, st, dt] = Demographics(
+                        race_params, st_params, dt_params
+                    )
 
 
 class Location:
@@ -21,6 +65,7 @@ class Location:
         """
         # location properties
         self.name = name
+        self.base_params = params
         self.params = self.create_params(params)
         self.ppl = defn.ppl  # percent of overall population assigned to this location
         self.category = defn.category  # arbitrary category, can be used for migration
@@ -33,6 +78,11 @@ class Location:
 
         self.migration_weights: Dict[str, Any] = {}
 
+        # compiled duration/act samplers and param tables for this location's params
+        self.samplers = samplers.SamplerCache()
+        self.compiled_tables: Optional[ParamTables] = None
+        self.compiled_tables_version = -1
+
         self.neighbors: Set[str] = set()  # or maybe edges instead
 
     def __str__(self):
@@ -50,25 +100,56 @@ class Location:
     def __hash__(self):
         return hash(self.name)
 
+    @property
+    def params_version(self) -> Tuple[int, int]:
+        """
+        Version of this location's demographic params, which the param tables and results memoized for the location are compiled from (see `parse_params.get_version`).  A location's params only copy the branches it scales from the model params (see `create_params`), so this is the version of both the copies and the model params.
+        """
+        return (
+            parse_params.get_version(self.params.demographics),
+            parse_params.get_version(self.base_params.demographics),
+        )
+
+    @property
+    def tables(self) -> ParamTables:
+        """
+        Demographic param tables for this location, compiled on first use after its demographic params change (see `params_version`).
+        """
+        version = self.params_version
+        if self.compiled_tables is None or self.compiled_tables_version != version:
+            self.compiled_tables = ParamTables(self.params)
+            self.compiled_tables_version = version
+        return self.compiled_tables
+
+    def params_changed(self):
+        """
+        Note that this location's params have been changed in a way their ObjMaps can't see, so anything compiled from them is recompiled on next use.
+        """
+        parse_params.params_changed(self.params)
+
     def create_params(self, params: ObjMap) -> ObjMap:
         """
         Scale or override the generic parameters with any location based scaling from params.location.scaling
 
+        The location's params are a layer over the generic parameters: only the branches of the params tree leading to a scaled or overridden value are copied, everything else is shared with (and reads through to) `params`.
+
         args:
             params: model parameters
 
         returns:
             new parameter object with scaled values for this location
         """
-        new_params = deepcopy(params)
+        new_params = copy(params)
 
-        defns = new_params.location.scaling[self.name]
+        defns = params.location.scaling[self.name]
         for param_path, defn in defns.items():
             if param_path != "ls_default":
                 if defn.field == "scalar":
-                    utils.scale_param(new_params, param_path, defn.scalar)
+                    utils.scale_param(new_params, param_path, defn.scalar, base=params)
                 elif defn.field == "override":
-                    utils.override_param(new_params, param_path, defn.override)
+                    utils.override_param(
+                        new_params, param_path, defn.override, base=params
+                    )
 
         return new_params
 
@@ -1,6 +1,5 @@
 import random
-from typing import Dict, List, Optional
-from copy import copy
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 import os
 import logging
 
@@ -11,7 +10,16 @@ from . import agent as ag
 from . import output as ao
 from . import probabilities as prob
 from .parse_params import ObjMap
-from . import exposures, features, interactions, population, utils
+from . import (
+    exposures,
+    features,
+    interactions,
+    population,
+    samplers,
+    streams,
+    timeline,
+    utils,
+)
 
 
 class TITAN:
@@ -78,6 +86,25 @@ class TITAN:
         logging.info(f"  Run seed was set to: {self.run_seed}")
         self.run_random = random.Random(self.run_seed)
         self.np_random = np.random.default_rng(self.run_seed)
+        # named streams for each part of the model, see get_random
+        self.use_streams = params.model.seed.streams
+        self.streams = streams.RandomStreams(self.run_seed)
+        # counter-based streams per agent/relationship, see get_random
+        self.use_counter_random = params.model.seed.counter_based
+        self.counter_random = streams.CounterRandom(self.run_seed)
+        self.entity_streams: Dict[Tuple[str, str, int], streams.CounterStream] = {}
+        self.entity_streams_time = self.time
+        self.use_sparse_events = (
+            params.model.sparse_events and not self.use_counter_random
+        )
+        # compiled act samplers for the model level params
+        self.samplers = samplers.SamplerCache()
+
+        # schedule of timeline scaling for the model and location params
+        self.timeline = timeline.Timeline(self.params)
+        self.timeline.add_layer(self.params)
+        for location in self.pop.geography.locations.values():
+            self.timeline.add_layer(location.params, location.base_params)
         random.seed(self.run_seed)
         logging.info(("  FIRST RANDOM CALL {}".format(random.randint(0, 100))))
 
@@ -174,6 +201,9 @@ class TITAN:
 
         logging.info("  ===! Main Loop Complete !===")
 
+        for name, info in utils.get_memo_info().items():
+            logging.debug(f"  memo - {name}: {info}")
+
     def step(self, outdir: str):
         """
         A single time step in the model:
@@ -213,6 +243,7 @@ class TITAN:
         self.print_stats(stats, outdir)
 
         logging.info(f"Number of relationships: {len(self.pop.relationships)}")
+        logging.info(f"Agents short of partners: {self.pop.num_unsatisfied}")
         self.pop.all_agents.print_subsets(logging.info)
 
     def update_all_agents(self):
@@ -226,7 +257,7 @@ class TITAN:
         4. Update partner assignments (create new relationships as needed)
         5. Create an agent zero (if enabled and the time is right)
         6. Agents in relationships interact
-        7. Update features at the population level
+        7. Update exposures and features at the population level
         8. Update each agent's status for:
             * age
             * all exposures
@@ -234,15 +265,20 @@ class TITAN:
         """
         # If static network, ignore relationship progression
         if not self.params.features.static_network:
-            for rel in copy(self.pop.relationships):
-                if (
-                    self.params.partnership.dissolve.enabled
-                    and self.time == self.params.partnership.dissolve.time
-                ):
-                    rel.progress(force=True)
-                    self.pop.remove_relationship(rel)
-                elif rel.progress():
-                    self.pop.remove_relationship(rel)
+            if (
+                self.params.partnership.dissolve.enabled
+                and self.time == self.params.partnership.dissolve.time
+            ):
+                ending_rels = list(self.pop.relationships)
+            else:
+                ending_rels = self.pop.relationship_store.ending()
+
+            for rel in ending_rels:
+                rel.progress(force=True)
+                self.pop.remove_relationship(rel)
+
+            # remaining relationships are one time step closer to ending
+            self.pop.relationship_store.advance()
 
         if self.params.features.exit_enter:
             self.exit()
@@ -261,8 +297,13 @@ class TITAN:
         ):
             self.make_agent_zero()
 
-        for rel in self.pop.relationships:
-            self.agents_interact(rel)
+        for bond_type, rels in self.pop.relationship_store.iter_bond_types():
+            interaction_types = self.params.classes.bond_types[bond_type].acts_allowed
+            for rel in rels:
+                self.agents_interact(rel, interaction_types)
+
+        for exposure in self.exposures:
+            exposure.update_pop(self)
 
         for feature in self.features:
             feature.update_pop(self)
@@ -311,7 +352,9 @@ class TITAN:
                 max_partners = num_partners
                 max_agent = agent
 
-        agent_zero = utils.safe_random_choice(zero_eligible, self.run_random)
+        agent_zero = utils.safe_random_choice(
+            zero_eligible, self.get_random("agent_zero")
+        )
         if agent_zero:  # if eligible agent, make agent 0
             logging.info(f"\tAgent zero selected: {agent_zero}")
             zero_attr = getattr(agent_zero, self.params.agent_zero.exposure)
@@ -323,32 +366,87 @@ class TITAN:
         else:
             raise ValueError("No agent zero!")
 
+    def get_random(
+        self, name: str, entity: Optional[Union["ag.Agent", "ag.Relationship"]] = None
+    ) -> random.Random:
+        """
+        Get the random number generator for a part of the model (e.g. a feature).  This is its own stream (see `RandomStreams`) if `params.model.seed.streams` is enabled, otherwise the model's `run_random`.
+
+        If `params.model.seed.counter_based` is enabled and the draws are for an agent or relationship, the generator is instead a counter-based stream (see `CounterRandom`) for the part of the model, the agent or relationship and the time step, so the values don't depend on the order agents and relationships are updated in.
+
+        args:
+            name: name of the part of the model (e.g. `prep`, `sex`, `exit`)
+            entity: the agent or relationship the draws are for, if any
+
+        returns:
+            a random number generator
+        """
+        if entity is not None and self.use_counter_random:
+            return self.get_entity_stream(name, entity)
+        if self.use_streams:
+            return self.streams.get(name)
+        return self.run_random
+
+    def get_np_random(
+        self, name: str, entity: Optional[Union["ag.Agent", "ag.Relationship"]] = None
+    ) -> np.random.Generator:
+        """
+        Get the numpy random number generator for a part of the model.  This is the generator of its own stream if `params.model.seed.streams` is enabled, otherwise the model's `np_random`, or of the counter-based stream as in `get_random`.
+
+        args:
+            name: name of the part of the model (e.g. `sex`)
+            entity: the agent or relationship the draws are for, if any
+
+        returns:
+            a numpy random number generator
+        """
+        if entity is not None and self.use_counter_random:
+            return self.get_entity_stream(name, entity).gen
+        if self.use_streams:
+            return self.streams.get(name).gen
+        return self.np_random
+
+    def get_entity_stream(
+        self, name: str, entity: Union["ag.Agent", "ag.Relationship"]
+    ) -> streams.CounterStream:
+        """
+        Get the counter-based stream for a part of the model and an agent or relationship at the current time step.  The stream is kept for the rest of the time step, so successive draws get successive values.
+
+        args:
+            name: name of the part of the model (e.g. `hiv`)
+            entity: the agent or relationship the draws are for
+
+        returns:
+            the stream
+        """
+        if self.entity_streams_time != self.time:
+            self.entity_streams = {}
+            self.entity_streams_time = self.time
+
+        kind = "relationship" if isinstance(entity, ag.Relationship) else "agent"
+        key = (name, kind, entity.id)
+        stream = self.entity_streams.get(key)
+        if stream is None:
+            stream = self.counter_random.stream(self.time, entity.id, f"{kind}|{name}")
+            self.entity_streams[key] = stream
+
+        return stream
+
     def timeline_scaling(self):
         """
         Scale/un-scale any params with timeline_scaling definitions per their
-        definition.  Applied to all parameters (main model, and location specific).
+        definition.  Applied to all parameters (main model, and location specific), see `Timeline`.
         """
         if not self.params.features.timeline_scaling:
             return None
 
-        # gather all of the param objectss to be scaled
-        params_set = [self.params]
-        for location in self.pop.geography.locations.values():
-            params_set.append(location.params)
-
-        # iterate over each param and update the values if the time is right
-        for params in params_set:
-            for defn in params.timeline_scaling.timeline.values():
-                param = defn.parameter
-                if param != "ts_default":
-                    if defn.start_time == self.time:
-                        logging.info(f"timeline scaling - {param}")
-                        utils.scale_param(params, param, defn.scalar)
-                    elif defn.stop_time == self.time:
-                        logging.info(f"timeline un-scaling - {param}")
-                        utils.scale_param(params, param, 1 / defn.scalar)
-
-    def agents_interact(self, rel: "ag.Relationship"):
+        self.timeline.step(self.time)
+
+    def agents_interact(
+        self,
+        rel: "ag.Relationship",
+        interaction_types: Optional[Iterable[str]] = None,
+    ):
         """
         Let an agent interact with a partner.
 
@@ -360,8 +458,12 @@ class TITAN:
 
         args:
             rel : The relationship that the agents interact in
+            interaction_types: the acts allowed for the relationship's bond type, looked up from the params if not passed
         """
-        interaction_types = self.params.classes.bond_types[rel.bond_type].acts_allowed
+        if interaction_types is None:
+            interaction_types = self.params.classes.bond_types[
+                rel.bond_type
+            ].acts_allowed
         # If either agent is incarcerated, skip their interaction
         if rel.agent1.incar.active or rel.agent2.incar.active:  # type: ignore[attr-defined]
             return
@@ -380,7 +482,12 @@ class TITAN:
         if self.exits == {}:
             return
 
+        if self.use_sparse_events:
+            self.exit_sparse()
+            return
+
         for agent in self.pop.all_agents:
+            rand_gen = self.get_random("exit", agent)
             for strategy in self.params.exit_enter.values():
                 # Get parameters of the exit class
                 exit = self.params.classes.exit[strategy.exit_class]
@@ -410,19 +517,13 @@ class TITAN:
                         * self.calibration.mortality
                     )
 
-                    if self.run_random.random() < p:
+                    if rand_gen.random() < p:
                         # agent dies
                         self.exits[strategy.exit_class].append(agent)
                         break
                 elif case == "drop_out":
-                    p = (
-                        agent.location.params.demographics[agent.race]
-                        .sex_type[agent.sex_type]
-                        .drug_type[agent.drug_type]
-                        .exit[strategy.exit_class]
-                        .prob
-                    )
-                    if self.run_random.random() < p:
+                    p = agent.demographics.drug_type.exit[strategy.exit_class].prob
+                    if rand_gen.random() < p:
                         # agent leaves study pop
                         self.exits[strategy.exit_class].append(agent)
                         break
@@ -431,6 +532,66 @@ class TITAN:
             for agent in exit_list:
                 self.pop.remove_agent(agent)
 
+    def exit_sparse(self):
+        """
+        Allow agents to exit the model as in `exit`, but draw deaths and drop outs for each group of agents sharing an exit probability at once (see `samplers.sparse_bernoulli`).  Exit classes are applied in order to the agents which haven't exited yet.
+        """
+        rand_gen = self.get_random("exit")
+        remaining = list(self.pop.all_agents)
+        for strategy in self.params.exit_enter.values():
+            exit = self.params.classes.exit[strategy.exit_class]
+            exit_list = self.exits[strategy.exit_class]
+            num_exited = len(exit_list)
+
+            # agents grouped by the arguments their exit probability depends on
+            groups: Dict[Tuple, List["ag.Agent"]] = {}
+            case = exit.exit_type
+            for agent in remaining:
+                if exit.ignore_incar and agent.incar.active:
+                    continue
+
+                if case == "age_out":
+                    if agent.age > exit.age:
+                        exit_list.append(agent)
+                elif case == "death":
+                    key = (
+                        agent.hiv.active,
+                        agent.hiv.aids,
+                        agent.drug_type,
+                        agent.sex_type,
+                        agent.haart.adherent,
+                        agent.race,
+                        agent.location,
+                    )
+                    groups.setdefault(key, []).append(agent)
+                elif case == "drop_out":
+                    key = (agent.location, agent.race, agent.sex_type, agent.drug_type)
+                    groups.setdefault(key, []).append(agent)
+
+            for key, agents in groups.items():
+                if case == "death":
+                    p = (
+                        prob.get_death_rate(
+                            *key,
+                            self.params.model.time.steps_per_year,
+                            strategy.exit_class,
+                        )
+                        * self.calibration.mortality
+                    )
+                else:
+                    p = agents[0].demographics.drug_type.exit[strategy.exit_class].prob
+
+                for i in samplers.sparse_bernoulli(rand_gen, len(agents), p):
+                    exit_list.append(agents[i])
+
+            if len(exit_list) > num_exited:
+                exited = set(exit_list[num_exited:])
+                remaining = [agent for agent in remaining if agent not in exited]
+
+        for exit_list in self.exits.values():
+            for agent in exit_list:
+                self.pop.remove_agent(agent)
+
     def enter(self):
         """
         Create new agents and/or replace exited agents.
@@ -441,6 +602,7 @@ class TITAN:
             * replace: use exited agent's characteristics to get new characteristics
 
         """
+        rand_gen = self.get_random("enter")
         for strategy in self.params.exit_enter.values():
             entrance = self.params.classes.enter[strategy.entry_class]
             if entrance.enter_type == "new_agent":
@@ -473,7 +635,7 @@ class TITAN:
             elif entrance.enter_type == "replace":
                 for agent in self.exits[strategy.exit_class]:
                     age = entrance.age if entrance.age_in else None
-                    if self.run_random.random() < entrance.prob:
+                    if rand_gen.random() < entrance.prob:
                         new_agent = self.pop.create_agent(
                             agent.location,
                             agent.race,
@@ -1,7 +1,7 @@
 #!/usr/bin/env python
 # encoding: utf-8
 
-from typing import Dict, Any, List, Iterator
+from typing import Dict, Any, List, Iterator, Tuple
 import itertools
 import os
 
@@ -110,6 +110,33 @@ def get_stats_item(stats: Dict[str, Any], attrs: List[str], agent: "ag.Agent"):
     return stats_item
 
 
+def get_stats_items(
+    stats: Dict[str, Any], attrs: List[str], agents: List["ag.Agent"]
+) -> List[Dict[str, int]]:
+    """
+    Get the leaf node of the stats dictionary for each of the agents.  Agents are grouped by the values of their attributes so that each leaf node is only looked up once.
+
+    args:
+        stats: a nested dictionary of attributes to count
+        attrs: a list of attribute values to find the count for
+        agents: the agents to get the leaf nodes for
+
+    returns:
+        a stats_item dictionary for each agent, in the same order as the agents
+    """
+    items: Dict[Tuple, Dict[str, int]] = {}
+    stats_items = []
+    for agent in agents:
+        key = tuple(getattr(agent, attr) for attr in attrs)
+        stats_item = items.get(key)
+        if stats_item is None:
+            stats_item = get_stats_item(stats, attrs, agent)
+            items[key] = stats_item
+        stats_items.append(stats_item)
+
+    return stats_items
+
+
 def add_agent_to_stats(stats_item: Dict[str, int], key: str):
     """
     Update the stats dictionary counts for the key given the agent's attributes
@@ -147,9 +174,8 @@ def get_stats(
     # attribute names (non-plural)
     attrs = [clss[:-1] for clss in params.outputs.classes]
 
-    for a in all_agents:
-        stats_item = get_stats_item(stats, attrs, a)
-
+    agents = list(all_agents)
+    for a, stats_item in zip(agents, get_stats_items(stats, attrs, agents)):
         add_agent_to_stats(stats_item, "agents")
 
         for reportable in reportables:
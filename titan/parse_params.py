@@ -5,21 +5,79 @@ from inspect import getsourcefile
 from pathlib import Path
 import shutil
 import math
-from typing import Optional, Dict
-from copy import deepcopy
+import hashlib
+import pickle
+import tempfile
+from typing import Optional, Dict, List, Tuple
+from copy import copy, deepcopy
+
+
+class ParamsVersion:
+    """
+    Version of a section of a params tree (e.g. `params.demographics` and everything under it), incremented whenever one of the section's values is changed in place, so anything compiled or memoized from the section can tell it is stale.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+
+def get_version(params: "ObjMap") -> int:
+    """
+    Get the version of the section of the params tree `params` is part of.
+    """
+    return ObjMap._get_section(params).value
+
+
+def params_changed(params: "ObjMap"):
+    """
+    Note that params have been changed in a way their ObjMaps can't see, incrementing the version of `params` and of each section directly under it.
+    """
+    sections = {id(section): section for section in ObjMap._iter_sections(params)}
+    for section in sections.values():
+        section.value += 1
+
+
+def copy_into(params: "ObjMap", parent: "ObjMap") -> "ObjMap":
+    """
+    Shallow copy a map which `parent` shares with other params, so it can be changed without changing them (see `utils.get_param_from_path`).  The copy joins `parent`'s section (or starts a new one if `parent` is the root of its tree), the maps it still shares stay in theirs.
+    """
+    result = copy(params)
+    object.__setattr__(result, "_section", ObjMap._child_section(parent))
+    object.__setattr__(result, "_is_root", False)
+    return result
+
+
+def same_value(old, new) -> bool:
+    """
+    Whether writing `new` over `old` leaves a param unchanged.  Maps are only the same if they are the same object.
+    """
+    return old is new or (
+        type(old) is type(new) and not isinstance(new, dict) and (old == new) is True
+    )
 
 
 class ObjMap(dict):
     """
     A dictionary-like class which allows accessing members either using standard
     dictionary notation or dots.  Note the hash function is hard-coded - beware.
+
+    Each map directly under the root of a params tree is a section, which shares a `ParamsVersion` with the maps nested in it (see `get_version`).  Writing a different value to an ObjMap after it is created increments its section's version.  A new tree of maps written to an ObjMap joins its section, maps which are already part of a tree (e.g. branches shared by a location's params and the model params, see `Location.create_params`) stay in their own.
     """
 
-    def __init__(self, d: Dict):
+    def __init__(self, d: Dict, section: Optional[ParamsVersion] = None):
+        """
+        args:
+            d: the values of the map
+            section: version of the section the map is part of, a map created without one is the root of its own tree
+        """
+        object.__setattr__(self, "_section", section or ParamsVersion())
+        object.__setattr__(self, "_is_root", section is None)
         for k, v in d.items():
             if isinstance(v, dict):
-                v = self.__class__(v)
-            self[k] = v
+                v = self.__class__(v, ObjMap._child_section(self))
+            dict.__setitem__(self, k, v)
 
     def __getattribute__(self, k):
         try:
@@ -30,24 +88,169 @@ class ObjMap(dict):
     def __setattr__(self, k, v):
         return self.__setitem__(k, v)
 
+    def _get_section(self) -> ParamsVersion:
+        try:
+            return object.__getattribute__(self, "_section")
+        except AttributeError:
+            # maps unpickled from older caches start their own section
+            object.__setattr__(self, "_section", ParamsVersion())
+            object.__setattr__(self, "_is_root", False)
+            return object.__getattribute__(self, "_section")
+
+    def _child_section(self) -> ParamsVersion:
+        # the maps directly under the root each start a section
+        if object.__getattribute__(self, "__dict__").get("_is_root"):
+            return ParamsVersion()
+        return ObjMap._get_section(self)
+
+    def _iter_sections(self):
+        yield ObjMap._get_section(self)
+        for v in dict.values(self):
+            if isinstance(v, ObjMap):
+                yield ObjMap._get_section(v)
+
+    def _join_section(self, section: ParamsVersion):
+        object.__setattr__(self, "_section", section)
+        object.__setattr__(self, "_is_root", False)
+        for v in dict.values(self):
+            if isinstance(v, ObjMap):
+                ObjMap._join_section(v, section)
+
+    def _changed(self):
+        ObjMap._get_section(self).value += 1
+
+    def __setitem__(self, k, v):
+        if k in self and same_value(dict.__getitem__(self, k), v):
+            return
+        if isinstance(v, ObjMap) and object.__getattribute__(v, "__dict__").get(
+            "_is_root"
+        ):
+            ObjMap._join_section(v, ObjMap._child_section(self))
+        ObjMap._changed(self)
+        dict.__setitem__(self, k, v)
+
+    def __delitem__(self, k):
+        dict.__delitem__(self, k)
+        ObjMap._changed(self)
+
+    def update(self, *args, **kwargs):
+        for k, v in dict(*args, **kwargs).items():
+            self.__setitem__(k, v)
+
+    def setdefault(self, k, default=None):
+        if k not in self:
+            self.__setitem__(k, default)
+        return dict.__getitem__(self, k)
+
+    def pop(self, k, *args):
+        if k in self:
+            ObjMap._changed(self)
+        return dict.pop(self, k, *args)
+
+    def popitem(self):
+        item = dict.popitem(self)
+        ObjMap._changed(self)
+        return item
+
+    def clear(self):
+        if self:
+            ObjMap._changed(self)
+        dict.clear(self)
+
     def __hash__(self):
         return 1234567890
 
     def __getstate__(self):
         return self.__dict__
 
+    def __reduce__(self):
+        # restore the items without going through `__setitem__`, which would
+        # count them as changes and move the maps into new sections
+        return (restore_obj_map, (self.__class__, dict(self), self.__getstate__()))
+
     def __setstate__(self, state):
         self.__dict__.update(state)
 
+    def __copy__(self):
+        cls = self.__class__
+        result = cls.__new__(cls)
+        # a shallow copy stays in the section of the maps it shares
+        for k, v in self.__dict__.items():
+            object.__setattr__(result, k, v)
+        dict.update(result, self)
+        return result
+
     def __deepcopy__(self, memo):
         cls = self.__class__
         result = cls.__new__(cls)
         memo[id(self)] = result
+        # the copied maps share copies of the sections they were in
+        result.__dict__.update(deepcopy(self.__dict__, memo))
         for k, v in self.items():
-            result[k] = deepcopy(v, memo)
+            dict.__setitem__(result, k, deepcopy(v, memo))
         return result
 
 
+def restore_obj_map(cls: type, items: Dict, state: Dict) -> ObjMap:
+    """
+    Rebuild a pickled ObjMap (see `ObjMap.__reduce__`).
+    """
+    obj = cls.__new__(cls)
+    dict.update(obj, items)
+    obj.__setstate__(state)
+    return obj
+
+
+class FrozenParams:
+    """
+    A read only copy of an ObjMap for use in hot paths.  Members are stored as plain instance attributes, so dot access is a normal attribute lookup instead of going through `ObjMap.__getattribute__`.  Nested dictionaries are frozen as well and lists become tuples.
+
+    Members can still be accessed with dictionary notation (e.g. for non-string keys such as bin numbers) and iterated over like a dictionary.
+    """
+
+    def __init__(self, d: Dict):
+        members = vars(self)
+        for k, v in d.items():
+            if isinstance(v, dict):
+                v = FrozenParams(v)
+            elif isinstance(v, list):
+                v = tuple(v)
+            members[k] = v
+
+    def __setattr__(self, k, v):
+        raise AttributeError("FrozenParams are read only")
+
+    def __getitem__(self, k):
+        return vars(self)[k]
+
+    def __contains__(self, k):
+        return k in vars(self)
+
+    def __iter__(self):
+        return iter(vars(self))
+
+    def __len__(self):
+        return len(vars(self))
+
+    def __repr__(self):
+        return f"FrozenParams({vars(self)})"
+
+    def __reduce__(self):
+        return (self.__class__, (dict(vars(self)),))
+
+    def get(self, k, default=None):
+        return vars(self).get(k, default)
+
+    def keys(self):
+        return vars(self).keys()
+
+    def values(self):
+        return vars(self).values()
+
+    def items(self):
+        return vars(self).items()
+
+
 # ============== PARSING FUNCTIONS ======================
 
 
@@ -94,21 +297,88 @@ def check_params(params: ObjMap):
         ), f"assort values must add to 1, not {assort_value} in {param}"
 
 
+def get_params_hash(paths: List[str], error_on_unused: bool) -> str:
+    """
+    Hash the contents of the files that go into parsing params, so that parsed params can be reused until any of them change.
+
+    args:
+        paths: files or directories (all files in them are included) in the order they are parsed
+        error_on_unused: whether the params are checked for unused parameters
+
+    returns:
+        hex digest of the files' contents
+    """
+    digest = hashlib.sha256()
+    digest.update(f"paraml {getattr(paraml, '__version__', '')}\n".encode())
+    digest.update(f"error_on_unused {error_on_unused}\n".encode())
+    for path in paths:
+        if os.path.isdir(path):
+            files = sorted(str(f) for f in Path(path).rglob("*") if f.is_file())
+        else:
+            files = [path]
+
+        digest.update(f"path {path}\n".encode())
+        for file_name in files:
+            digest.update(f"file {os.path.relpath(file_name, path)}\n".encode())
+            with open(file_name, "rb") as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+
+    return digest.hexdigest()
+
+
+def read_params_cache(cache_file: str) -> Optional[Tuple[ObjMap, str]]:
+    """
+    Read parsed params and the computed params yaml from the params cache.
+
+    args:
+        cache_file: path to the cached params
+
+    returns:
+        the params and computed params yaml, or `None` if they aren't cached
+    """
+    try:
+        with open(cache_file, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+
+def write_params_cache(cache_file: str, params: ObjMap, params_yml: str):
+    """
+    Write parsed params and the computed params yaml to the params cache.  The file is written then moved into place so concurrent runs never read a partial file.
+
+    args:
+        cache_file: path to cache the params at
+        params: parsed and checked params
+        params_yml: contents of the computed params file
+    """
+    cache_dir = os.path.dirname(cache_file)
+    os.makedirs(cache_dir, exist_ok=True)
+    fd, tmp_file = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        pickle.dump((params, params_yml), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_file, cache_file)
+
+
 def create_params(
     setting_name: Optional[str],
     param_path: str,
     outdir: str,
     error_on_unused: bool = False,
+    cache_dir: Optional[str] = None,
 ) -> ObjMap:
     """
     Entry function - given the path to the setting, params, output directory and whether
     or not to use the base setting. Parse and create a params (ObjMap) object.
 
+    If a `cache_dir` is passed, the parsed params are cached there keyed by a hash of the param definitions, setting and param files (see `get_params_hash`), and reused instead of parsing again until any of those files change.
+
     args:
         setting_name: path to a settings file or directory or `None`
         param_path: path to parameter file or directory
         outdir: path to directory where computed params will be saved
         error_on_unused: throw a hard error if there are unused parameters, otherwise warnings are only printed
+        cache_dir: path to directory to cache parsed params in
 
     returns:
         computed/validated model paramters with defaults filled in where needed
@@ -134,15 +404,32 @@ def create_params(
 
     param_paths.append(param_path)
 
-    parsed = paraml.create_params(
-        param_defs,
-        *param_paths,
-        out_path=os.path.join(outdir, "params.yml"),
-        error_on_unused=error_on_unused,
-    )
+    out_path = os.path.join(outdir, "params.yml")
+    cache_file = None
+    cached = None
+    if cache_dir is not None:
+        params_hash = get_params_hash([param_defs] + param_paths, error_on_unused)
+        cache_file = os.path.join(cache_dir, f"{params_hash}.pickle")
+        cached = read_params_cache(cache_file)
+
+    if cached is not None:
+        parsed, params_yml = cached
+        with open(out_path, "w") as f:
+            f.write(params_yml)
+    else:
+        parsed = paraml.create_params(
+            param_defs,
+            *param_paths,
+            out_path=out_path,
+            error_on_unused=error_on_unused,
+        )
+
+        parsed = ObjMap(parsed)
+        check_params(parsed)
 
-    parsed = ObjMap(parsed)
-    check_params(parsed)
+        if cache_file is not None:
+            with open(out_path) as f:
+                write_params_cache(cache_file, parsed, f.read())
 
     # copy migration file if enabled
     if parsed.location.migration.enabled:
@@ -2,8 +2,19 @@
 # encoding: utf-8
 
 # Imports
-from typing import Optional, Dict, Set
-from copy import copy
+from typing import (
+    Optional,
+    Dict,
+    Set,
+    List,
+    Tuple,
+    Iterable,
+    Iterator,
+    Container,
+    FrozenSet,
+    Sequence,
+)
+from operator import attrgetter
 
 import numpy as np  # type: ignore
 
@@ -12,93 +23,584 @@ from . import utils
 from . import parse_params
 
 
-def select_partner(
-    agent: "agent.Agent",
-    partnerable_agents: Set["agent.Agent"],
-    sex_partners: Dict,
-    pwid_agents: "agent.AgentSet",
-    params: "parse_params.ObjMap",
+class PartnerPool:
+    """
+    Index of the agents that can currently be selected as a partner, kept up to date as agents enter/exit the population and gain/lose partnerability.
+
+    For each bond type, agents are bucketed by the sex type of the agent seeking a partner (if the bond type allows sex) and only PWID are included if the bond type allows injection.  A bucket therefore holds exactly the agents that can partner with the seeking agent before excluding the agent and their existing partners, and a candidate can be drawn from it in constant time.
+
+    If assortative mixing is used, buckets are further split by the values of any partner attributes the assort rules target which don't change over an agent's time in the population (`race`, `sex_type`, `drug_type`, `sex_role` and `location`, which is updated on migration), so that a matching partner can be drawn directly from the targeted sub-buckets.
+    """
+
+    max_tries = 10
+    """Number of rejected candidates before falling back to scanning the bucket"""
+
+    bucket_attrs = ("race", "sex_type", "drug_type", "sex_role", "location")
+    """Agent attributes eligible for assort sub-buckets"""
+
+    def __init__(self, params: "parse_params.ObjMap"):
+        """
+        Initialize an empty PartnerPool.
+
+        args:
+            params: model parameters
+        """
+        self.params = params
+
+        self.assort_rules = compile_assort_rules(params)
+        self.attrs = tuple(
+            {
+                rule.partner_attribute: None
+                for rule in self.assort_rules
+                if rule.partner_attribute in self.bucket_attrs
+            }
+        )
+
+        # bond type -> seeker's sex type (or None) -> agents in bucket
+        self.members: Dict[str, Dict[Optional[str], utils.RandomSet]] = {}
+        # bond type -> seeker's sex type (or None) -> attribute -> value -> sub-bucket
+        self.attr_members: Dict[str, Dict[Optional[str], Dict[str, Dict]]] = {}
+        for bond_type in params.classes.bond_types:
+            self.members[bond_type] = {}
+            self.attr_members[bond_type] = {}
+            for key in self.iter_seeker_keys(bond_type):
+                self.members[bond_type][key] = utils.RandomSet()
+                self.attr_members[bond_type][key] = {attr: {} for attr in self.attrs}
+
+        # agent -> bond type -> buckets the agent belongs in when partnerable
+        self.agent_keys: Dict["agent.Agent", Dict[str, Tuple]] = {}
+        # agent -> attribute -> value of the sub-bucket the agent is in
+        self.agent_values: Dict["agent.Agent", Dict[str, str]] = {}
+
+    def iter_seeker_keys(self, bond_type: str) -> Iterable[Optional[str]]:
+        """
+        Get the bucket keys for a bond type
+
+        args:
+            bond_type: type of relationship that is being formed
+
+        returns:
+            sex types if the bond type allows sex, otherwise `None`
+        """
+        if "sex" in self.params.classes.bond_types[bond_type].acts_allowed:
+            return self.params.classes.sex_types.keys()
+        else:
+            return (None,)
+
+    def get_seeker_key(self, agent: "agent.Agent", bond_type: str) -> Optional[str]:
+        """
+        Get the bucket an agent seeking a partner should draw from
+
+        args:
+            agent: agent in need of a partner
+            bond_type: type of relationship that is being formed
+
+        returns:
+            the agent's sex type if the bond type allows sex, otherwise `None`
+        """
+        if "sex" in self.params.classes.bond_types[bond_type].acts_allowed:
+            return agent.sex_type
+        else:
+            return None
+
+    def get_partner_keys(self, agent: "agent.Agent", bond_type: str) -> Tuple:
+        """
+        Get the buckets an agent can be selected as a partner from
+
+        args:
+            agent: agent who could be selected as a partner
+            bond_type: type of relationship that is being formed
+
+        returns:
+            tuple of bucket keys
+        """
+        acts_allowed = self.params.classes.bond_types[bond_type].acts_allowed
+        if "injection" in acts_allowed and agent.drug_type != "Inj":
+            return ()
+
+        if "sex" in acts_allowed:
+            return tuple(self.params.classes.sex_types[agent.sex_type].sleeps_with)
+        else:
+            return (None,)
+
+    def add_agent(self, agent: "agent.Agent", bond_types: Iterable[str]):
+        """
+        Register an agent as a member of the population, adding them to the buckets for the bond types they are currently partnerable for.
+
+        args:
+            agent: agent to register
+            bond_types: bond types the agent is currently partnerable for
+        """
+        self.agent_keys[agent] = {
+            bond_type: self.get_partner_keys(agent, bond_type)
+            for bond_type in self.members
+        }
+        self.agent_values[agent] = {
+            attr: get_str_attr(agent, attr) for attr in self.attrs
+        }
+        for bond_type in bond_types:
+            self.add(agent, bond_type)
+
+    def remove_agent(self, agent: "agent.Agent"):
+        """
+        Remove an agent from all buckets and unregister them.
+
+        args:
+            agent: agent to remove
+        """
+        if agent in self.agent_keys:
+            for bond_type in self.members:
+                self.remove(agent, bond_type)
+            del self.agent_keys[agent]
+            del self.agent_values[agent]
+
+    def update_agent(self, agent: "agent.Agent"):
+        """
+        Move a registered agent to the correct sub-buckets after one of their bucketed attributes (e.g. `location`) has changed.
+
+        args:
+            agent: agent whose attributes changed
+        """
+        values = self.agent_values.get(agent)
+        if values is None or not self.attrs:
+            return
+
+        bond_types = [
+            bond_type
+            for bond_type, keys in self.agent_keys[agent].items()
+            if keys and agent in self.members[bond_type][keys[0]]
+        ]
+        for bond_type in bond_types:
+            self.remove(agent, bond_type)
+
+        for attr in self.attrs:
+            values[attr] = get_str_attr(agent, attr)
+
+        for bond_type in bond_types:
+            self.add(agent, bond_type)
+
+    def add(self, agent: "agent.Agent", bond_type: str):
+        """
+        Mark a registered agent as partnerable for a bond type.
+
+        args:
+            agent: agent that became partnerable
+            bond_type: bond type the agent is partnerable for
+        """
+        keys = self.agent_keys.get(agent)
+        if keys is None:
+            return
+
+        for key in keys[bond_type]:
+            members = self.members[bond_type][key]
+            if agent not in members:
+                members.add(agent)
+                attr_members = self.attr_members[bond_type][key]
+                for attr, value in self.agent_values[agent].items():
+                    attr_members[attr].setdefault(value, utils.RandomSet()).add(agent)
+
+    def remove(self, agent: "agent.Agent", bond_type: str):
+        """
+        Mark a registered agent as no longer partnerable for a bond type.
+
+        args:
+            agent: agent that is no longer partnerable
+            bond_type: bond type the agent is no longer partnerable for
+        """
+        keys = self.agent_keys.get(agent)
+        if keys is None:
+            return
+
+        for key in keys[bond_type]:
+            members = self.members[bond_type][key]
+            if agent in members:
+                members.discard(agent)
+                attr_members = self.attr_members[bond_type][key]
+                for attr, value in self.agent_values[agent].items():
+                    attr_members[attr][value].discard(agent)
+
+    def select(
+        self,
+        agent: "agent.Agent",
+        bond_type: str,
+        rand_gen,
+        component: Optional[Sequence["agent.Agent"]] = None,
+    ) -> Optional["agent.Agent"]:
+        """
+        Select a partner uniformly at random from the agents that can partner with `agent` for this bond type, excluding the agent and their existing partners.  If assortative mixing is enabled, the partner must also match the assort rules that apply to the agent [params.assort_mix].  If a component is passed, the partner must also be a member of it.
+
+        Candidates are drawn from the agent's bucket (or the sub-buckets targeted by the assort rules, or the component if it is smaller) and rejected if they are excluded or don't match, if too many are rejected (or the bucket is mostly excluded agents) the bucket is scanned instead.
+
+        args:
+            agent: agent in need of a partner
+            bond_type: type of relationship that is being formed
+            rand_gen: random number generator
+            component: members of the agent's network component, if the partner must come from it
+
+        returns:
+            new partner or `None`
+        """
+        key = self.get_seeker_key(agent, bond_type)
+        members = self.members[bond_type][key]
+        if not members:
+            return None
+
+        excluded = agent.get_partners()
+        excluded.add(agent)
+
+        targets = []
+        if self.params.features.assort_mix:
+            targets = get_assort_targets(self.assort_rules, agent, bond_type, rand_gen)
+
+        # narrow to the smallest set of sub-buckets a match must come from
+        buckets = [members]
+        num_candidates = len(members)
+        for attr, values, include in targets:
+            if include and attr in self.attrs:
+                attr_members = self.attr_members[bond_type][key][attr]
+                # sorted so the draw doesn't depend on the iteration order of the set
+                attr_buckets = [
+                    attr_members[value]
+                    for value in sorted(values)
+                    if attr_members.get(value)
+                ]
+                num_attr_candidates = sum(len(bucket) for bucket in attr_buckets)
+                if num_attr_candidates < num_candidates:
+                    buckets = attr_buckets
+                    num_candidates = num_attr_candidates
+
+        # the partner must be in both the component and the bucket, draw from the smaller
+        pool: Optional[Container["agent.Agent"]] = None
+        if component is not None:
+            if len(component) < num_candidates:
+                buckets = [component]
+                pool = members
+            else:
+                pool = component
+
+        return sample_partner(
+            buckets, excluded, targets, rand_gen, self.max_tries, pool
+        )
+
+
+class AssortRule:
+    """
+    An assortative mixing definition [params.assort_mix] compiled for repeated use when partnering.  The attribute paths are resolved to getters once, and each partnering attempt turns the rule into a target: the set of values the partner's attribute must (or must not) take.
+    """
+
+    def __init__(self, name: str, assort_def: "parse_params.ObjMap"):
+        """
+        Compile an assort rule.
+
+        args:
+            name: name of the assort rule in the params
+            assort_def: the definition of the rule [params.assort_mix]
+        """
+        self.name = name
+        self.assort_def = assort_def
+        self.bond_types = set(assort_def.bond_types)
+        self.attribute = assort_def.attribute
+        self.partner_attribute = get_partner_attr(assort_def)
+        self.agent_value = str(assort_def.agent_value)
+        self.get_agent_attr = attrgetter(self.attribute)
+        self.get_partner_attr = attrgetter(self.partner_attribute)
+
+    def applies(self, agent: "agent.Agent", bond_type: str) -> bool:
+        """
+        Whether this rule is used when the agent seeks a partner of this bond type.
+
+        args:
+            agent: agent in need of a partner
+            bond_type: type of relationship that is being formed
+
+        returns:
+            whether the rule applies
+        """
+        if self.bond_types and bond_type not in self.bond_types:
+            return False
+
+        return (
+            self.partner_attribute == "location"
+            or self.agent_value == "__any__"
+            or str(self.get_agent_attr(agent)) == self.agent_value
+        )
+
+    def get_target(
+        self, agent: "agent.Agent", rand_gen
+    ) -> Tuple[str, FrozenSet[str], bool]:
+        """
+        Randomly select the type of partner this agent will assort with per the rule's `partner_values` and describe the partners that match it.
+
+        args:
+            agent: agent in need of a partner
+            rand_gen: random number generator
+
+        returns:
+            the partner attribute, the set of values, and whether the partner's attribute value must be in (`True`) or not in (`False`) the set
+        """
+        partner_type = get_partner_type(self.assort_def, rand_gen)
+        partner_values = self.assort_def.partner_values
+        attr = self.partner_attribute
+
+        if attr == "location":
+            agent_location = agent.location.name
+            agent_neighbors = agent.location.neighbors
+            if self.agent_value == "__any__":
+                if partner_type == "__same__":
+                    return attr, frozenset([agent_location]), True
+                elif partner_type == "__other__":
+                    if "__neighbor__" in partner_values:
+                        return (
+                            attr,
+                            frozenset(agent_neighbors | {agent_location}),
+                            False,
+                        )
+                    else:
+                        return attr, frozenset([agent_location]), False
+                elif partner_type == "__neighbor__":
+                    return attr, frozenset(agent_neighbors), True
+                else:
+                    raise ValueError(
+                        "When using same-assorting on location, only valid partner_types are __same__, __neighbor__ and __other__"
+                    )
+            else:
+                if partner_type == "__other__":
+                    partner_types = set(partner_values.keys()) - {"__other__"}
+                    if "__neighbor__" in partner_values:
+                        partner_types.remove("__neighbor__")
+                        return attr, frozenset(agent_neighbors | partner_types), False
+                    else:
+                        return attr, frozenset(partner_types), False
+                elif partner_type == "__neighbor__":
+                    return attr, frozenset(agent_neighbors), True
+                else:
+                    return attr, frozenset([partner_type]), True
+        elif self.agent_value == "__any__":
+            agent_attribute = str(self.get_partner_attr(agent))
+            if partner_type == "__same__":
+                return attr, frozenset([agent_attribute]), True
+            elif partner_type == "__other__":
+                return attr, frozenset([agent_attribute]), False
+            else:
+                raise ValueError(
+                    "When using same-assorting, only valid partner_types are __same__ and __other__"
+                )
+        else:
+            if partner_type == "__other__":
+                return attr, frozenset(partner_values.keys()) - {"__other__"}, False
+            else:
+                return attr, frozenset([partner_type]), True
+
+
+def compile_assort_rules(params: "parse_params.ObjMap") -> List[AssortRule]:
+    """
+    Compile the assortative mixing definitions in the params
+
+    args:
+        params: model parameters
+
+    returns:
+        list of compiled rules, in definition order
+    """
+    return [AssortRule(name, defn) for name, defn in params.assort_mix.items()]
+
+
+def get_assort_targets(
+    rules: List[AssortRule], agent: "agent.Agent", bond_type: str, rand_gen
+) -> List[Tuple[str, FrozenSet[str], bool]]:
+    """
+    Get the targets a partner must match for every assort rule that applies to this agent and bond type.
+
+    args:
+        rules: compiled assort rules
+        agent: agent in need of a partner
+        bond_type: type of relationship that is being formed
+        rand_gen: random number generator
+
+    returns:
+        list of targets (see `AssortRule.get_target`), empty if no rules apply
+    """
+    return [
+        rule.get_target(agent, rand_gen)
+        for rule in rules
+        if rule.applies(agent, bond_type)
+    ]
+
+
+def is_assortable(
+    agent: "agent.Agent", targets: List[Tuple[str, FrozenSet[str], bool]]
+) -> bool:
+    """
+    Does an agent match all of the assort targets?
+
+    args:
+        agent: potential partner
+        targets: targets from `get_assort_targets`
+
+    returns:
+        whether the agent matches
+    """
+    for attr, values, include in targets:
+        if (get_str_attr(agent, attr) in values) != include:
+            return False
+
+    return True
+
+
+def sample_partner(
+    buckets: List[Sequence["agent.Agent"]],
+    excluded: Set["agent.Agent"],
+    targets: List[Tuple[str, FrozenSet[str], bool]],
     rand_gen,
-    bond_type: str,
+    max_tries: int = 10,
+    pool: Optional[Container["agent.Agent"]] = None,
 ) -> Optional["agent.Agent"]:
     """
-    Get a partner for the agent.
+    Select an agent uniformly at random from the union of the buckets which is not excluded, matches the assort targets and (optionally) is in the pool.  Candidates are drawn and rejected up to `max_tries` times before scanning the buckets for matches.
 
     args:
-        agent : agent in need of a partner
-        partnerable_agents: agents that can be selected as a partner
-        sex_partners: mapping from sex_type to agents in the population that can sleep with that sex_type
-        pwid_agents: agents with `drug_type==="Inj"`
-        params: model parameters
+        buckets: disjoint sequences of candidate partners
+        excluded: agents which can't be selected (e.g. the agent and their partners)
+        targets: targets from `get_assort_targets`
         rand_gen: random number generator
-        bond_type: type of relationship that is being formed with the partner
+        max_tries: number of candidates to reject before scanning
+        pool: if passed, agents which can be selected
 
     returns:
         new partner or `None`
     """
-    eligible = copy(partnerable_agents)
-    eligible -= agent.get_partners()
-    eligible -= {agent}
+    total = sum(len(bucket) for bucket in buckets)
+    if total == 0:
+        return None
 
-    acts_allowed = params.classes.bond_types[bond_type].acts_allowed
+    if total > 2 * len(excluded):
+        for _ in range(max_tries):
+            i = min(utils.safe_random_int(0, total, rand_gen), total - 1)
+            for bucket in buckets:
+                if i < len(bucket):
+                    partner = bucket[i]
+                    break
+                i -= len(bucket)
+
+            if (
+                partner not in excluded
+                and (pool is None or partner in pool)
+                and is_assortable(partner, targets)
+            ):
+                return partner
+
+    eligible = [
+        partner
+        for bucket in buckets
+        for partner in bucket
+        if partner not in excluded
+        and (pool is None or partner in pool)
+        and is_assortable(partner, targets)
+    ]
+    return utils.safe_random_choice(eligible, rand_gen)
 
-    if "injection" in acts_allowed:
-        eligible &= pwid_agents.members
 
-    if "sex" in acts_allowed:
-        eligible &= sex_partners[agent.sex_type]
+def get_stub_pairs(deficits: np.ndarray, rand_gen) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pair up stubs (open partner slots) at random, configuration model style.  Each index appears in the stubs as many times as its deficit, pairs of an index with itself and repeats of a pair are dropped.
 
-    # short circuit to avoid attempting to assort with no eligible partners
-    if not eligible:
-        return None
+    args:
+        deficits: number of partners each agent still needs
+        rand_gen: np random number generator
+
+    returns:
+        the indices of the first and second agent in each pair
+    """
+    stubs = np.repeat(np.arange(len(deficits)), deficits)
+    rand_gen.shuffle(stubs)
+    num_pairs = len(stubs) // 2
+    left = stubs[:num_pairs]
+    right = stubs[num_pairs : 2 * num_pairs]
+
+    keep = left != right
+    left = left[keep]
+    right = right[keep]
+
+    pair_ids = np.minimum(left, right) * len(deficits) + np.maximum(left, right)
+    _, first = np.unique(pair_ids, return_index=True)
+    first.sort()
+    return left[first], right[first]
+
+
+def match_stubs(
+    agents: List["agent.Agent"],
+    bond_type: str,
+    params: "parse_params.ObjMap",
+    rand_gen,
+) -> Iterator[Tuple["agent.Agent", "agent.Agent"]]:
+    """
+    Match agents in need of partners by repeatedly pairing up their stubs and rejecting pairs that `PartnerPool.select` could never produce (incompatible sex types, a non-PWID partner for an injection bond, or agents that are already partners).  Pairs are checked in both directions, so the agent yielded first is the one seeking the other.
+
+    The caller is expected to bond each pair as it is yielded, later pairs are checked against the updated partners.
+
+    args:
+        agents: agents in need of partners for this bond type
+        bond_type: type of relationship that is being formed
+        params: model parameters
+        rand_gen: np random number generator
+
+    returns:
+        iterator of (agent, partner) pairs
+    """
+    deficits = np.array(
+        [
+            max(a.target_partners[bond_type] - len(a.partners[bond_type]), 0)
+            for a in agents
+        ],
+        dtype=int,
+    )
 
-    if params.features.assort_mix:
-        match_fns = get_match_fns(
-            params.assort_mix.values(), agent, bond_type, rand_gen
+    acts_allowed = params.classes.bond_types[bond_type].acts_allowed
+    sex_types = list(params.classes.sex_types.keys())
+    # can_seek[partner sex type, seeker sex type]
+    if "sex" in acts_allowed:
+        can_seek = np.array(
+            [
+                [
+                    seeker in params.classes.sex_types[partner].sleeps_with
+                    for seeker in sex_types
+                ]
+                for partner in sex_types
+            ],
+            dtype=bool,
         )
-        # if no definitions match this agent, don't try to assort
-        if len(match_fns) > 0:
-            for partner in utils.safe_shuffle(eligible, rand_gen):
-                if is_assortable(partner, match_fns):
-                    return partner
-            return None
+    else:
+        can_seek = np.ones((len(sex_types), len(sex_types)), dtype=bool)
+    sex_codes = np.array([sex_types.index(a.sex_type) for a in agents], dtype=int)
+    if "injection" in acts_allowed:
+        is_partner = np.array([a.drug_type == "Inj" for a in agents], dtype=bool)
+    else:
+        is_partner = np.ones(len(agents), dtype=bool)
 
-    return utils.safe_random_choice(eligible, rand_gen)
+    for _ in range(params.partnership.network.matching.rounds):
+        if deficits.sum() < 2:
+            break
 
+        left, right = get_stub_pairs(deficits, rand_gen)
+        forward = can_seek[sex_codes[right], sex_codes[left]] & is_partner[right]
+        backward = can_seek[sex_codes[left], sex_codes[right]] & is_partner[left]
+        valid = forward | backward
+        for i, j, fwd in zip(left[valid], right[valid], forward[valid]):
+            if deficits[i] <= 0 or deficits[j] <= 0:
+                continue
 
-# does an agent match the criteria of the randomly chosen assort values?
-def is_assortable(agent, match_fns):
-    for match_fn in match_fns:
-        if not match_fn(agent):
-            return False
+            agent, partner = (agents[i], agents[j]) if fwd else (agents[j], agents[i])
+            if partner in agent.get_partners():
+                continue
 
-    return True
+            yield agent, partner
+            deficits[i] -= 1
+            deficits[j] -= 1
 
 
 # get the attribute as a string, recurse if nested
 def get_str_attr(obj, attr):
-    attrs = attr.split(".")  # returns list of all attrs
-    if len(attrs) == 1:
-        return str(getattr(obj, attrs[0]))
-    else:
-        return get_str_attr(getattr(obj, attrs.pop(0)), ".".join(attrs))
-
-
-# if this assort rule applies for this agent, get the match function for a potential partner
-def get_match_fns(assort_defs, agent, bond_type, rand_gen):
-    match_fns = []
-    for assort_def in assort_defs:
-        if len(assort_def.bond_types) == 0 or bond_type in assort_def.bond_types:
-            if get_partner_attr(assort_def) == "location":
-                match_fns.append(get_location_match_fn(assort_def, agent, rand_gen))
-            elif assort_def.agent_value == "__any__":
-                match_fns.append(get_same_match_fn(assort_def, agent, rand_gen))
-            elif get_str_attr(agent, assort_def.attribute) == str(
-                assort_def.agent_value
-            ):
-                match_fns.append(get_match_fn(assort_def, rand_gen))
-
-    return match_fns
+    return str(attrgetter(attr)(obj))
 
 
 # pick a partner type randomly given the weights
@@ -116,75 +618,6 @@ def get_partner_attr(assort_def):
         return assort_def.partner_attribute
 
 
-# given an assort def, randomly select the type the partner must have given the
-# weights and return a function to determin if a potential partner matches it
-def get_match_fn(assort_def, rand_gen):
-    partner_types = list(assort_def.partner_values.keys())
-    partner_type = get_partner_type(assort_def, rand_gen)
-    attr = get_partner_attr(assort_def)
-    if partner_type == "__other__":
-        partner_types.remove("__other__")
-        return lambda ag: get_str_attr(ag, attr) not in partner_types
-    else:
-        return lambda ag: get_str_attr(ag, attr) == partner_type
-
-
-# given an assort def where agent_value == '__any__', return the match function
-def get_same_match_fn(assort_def, agent, rand_gen):
-    partner_type = get_partner_type(assort_def, rand_gen)
-    attr = get_partner_attr(assort_def)
-
-    agent_attribute = get_str_attr(agent, attr)
-    if partner_type == "__same__":
-        return lambda ag: get_str_attr(ag, attr) == agent_attribute
-    elif partner_type == "__other__":
-        return lambda ag: get_str_attr(ag, attr) != agent_attribute
-    else:
-        raise ValueError(
-            "When using same-assorting, only valid partner_types are __same__ and __other__"
-        )
-
-
-# given an assort def where partner_attribute == 'location', return the match function
-def get_location_match_fn(assort_def, agent, rand_gen):
-    partner_type = get_partner_type(assort_def, rand_gen)
-    attr = "location"
-
-    agent_location = get_str_attr(agent, attr)
-    agent_neighbors = agent.location.neighbors
-    if assort_def.agent_value == "__any__":
-        if partner_type == "__same__":
-            return lambda ag: get_str_attr(ag, attr) == agent_location
-        elif partner_type == "__other__":
-            if "__neighbor__" in assort_def.partner_values:
-                return lambda ag: get_str_attr(ag, attr) not in agent_neighbors.union(
-                    [agent_location]
-                )
-            else:
-                return lambda ag: get_str_attr(ag, attr) != agent_location
-        elif partner_type == "__neighbor__":
-            return lambda ag: get_str_attr(ag, attr) in agent_neighbors
-        else:
-            raise ValueError(
-                "When using same-assorting on location, only valid partner_types are __same__, __neighbor__ and __other__"
-            )
-    else:
-        partner_types = list(assort_def.partner_values.keys())
-        if partner_type == "__other__":
-            partner_types.remove("__other__")
-            if "__neighbor__" in assort_def.partner_values:
-                partner_types.remove("__neighbor__")
-                return lambda ag: get_str_attr(ag, attr) not in agent_neighbors.union(
-                    partner_types
-                )
-            else:
-                return lambda ag: get_str_attr(ag, attr) not in partner_types
-        elif partner_type == "__neighbor__":
-            return lambda ag: get_str_attr(ag, attr) in agent_neighbors
-        else:
-            return lambda ag: get_str_attr(ag, attr) == partner_type
-
-
 @utils.memo
 def sex_possible(
     agent_sex_type: str, partner_sex_type: str, sex_types: "parse_params.ObjMap"
@@ -246,28 +679,23 @@ def get_mean_rel_duration(params: "parse_params.ObjMap"):
     return mean_rel_duration
 
 
-def get_partnership_duration(
-    params: "parse_params.ObjMap", rand_gen, bond_type: str, race: Optional[str]
+def draw_partnership_duration(
+    location: "agent.Location", rand_gen, bond_type: str, race: Optional[str]
 ) -> int:
     """
-    Get duration of a relationship drawn from bins or a distribution per the params [params.partnership.duration]
+    Get duration of a relationship drawn from bins or a distribution per the location's params [params.partnership.duration].  Durations come from the location's compiled sampler for the bond type and race, which draws them in blocks from numpy random number generators.
 
     args:
-        params: model parameters
+        location: location whose params the duration is drawn from
         rand_gen: np random number generator
         bond_type: type of bond for the relationship whose duration is being determined
+        race: race whose durations are used
 
     returns:
         number of time steps the partnership should endure
     """
-
-    if params.partnership.duration[bond_type][race].type == "bins":
-        dur_info = params.partnership.duration[bond_type][race].bins
-        i = utils.get_independent_bin(rand_gen, dur_info)
-        duration = utils.safe_random_int(dur_info[i].min, dur_info[i].max, rand_gen)
-
-    else:
-        dist = params.partnership.duration[bond_type][race].distribution
-        duration = int(utils.safe_dist(dist, rand_gen))
-
-    return duration
+    sampler = location.samplers.get(
+        ("duration", bond_type, race),
+        location.params.partnership.duration[bond_type][race],
+    )
+    return sampler.draw(rand_gen)
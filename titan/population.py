@@ -47,12 +47,16 @@ class Population:
         self.np_random = np.random.default_rng(self.pop_seed)
 
         self.enable_graph = params.model.network.enable
-        self.components: List = []
 
         if self.enable_graph:
             self.graph = nx.Graph()
+            self.component_index = utils.DynamicComponents(
+                lambda agent: self.graph.adj[agent]
+            )
         else:
             self.graph = None
+        # component root -> agent.component value last assigned to its members
+        self.component_labels: Dict = {}
 
         self.params = params
 
@@ -86,16 +90,28 @@ class Population:
         self.pwid_agents = ag.AgentSet("PWID", parent=self.all_agents)
 
         # agents who can take on a partner
-        self.partnerable_agents: Dict[str, Set["ag.Agent"]] = {}
+        self.partnerable_agents: Dict[str, utils.RandomSet] = {}
+        for bond_type in self.params.classes.bond_types.keys():
+            self.partnerable_agents[bond_type] = utils.RandomSet()
+
+        # agents with fewer partners than their target
+        self.partner_deficits: Dict[str, utils.RandomSet] = {}
+        # number of agents still short of partners after the last round of partnering
+        self.num_unsatisfied: Dict[str, int] = {}
         for bond_type in self.params.classes.bond_types.keys():
-            self.partnerable_agents[bond_type] = set()
+            self.partner_deficits[bond_type] = utils.RandomSet()
+            self.num_unsatisfied[bond_type] = 0
 
         # who can sleep with whom
-        self.sex_partners: Dict[str, Set["ag.Agent"]] = {}
+        self.sex_partners: Dict[str, utils.RandomSet] = {}
         for sex_type in self.params.classes.sex_types.keys():
-            self.sex_partners[sex_type] = set()
+            self.sex_partners[sex_type] = utils.RandomSet()
+
+        # index of partnerable agents for fast partner selection
+        self.partner_pool = partnering.PartnerPool(self.params)
 
         self.relationships: Set["ag.Relationship"] = set()
+        self.relationship_store = ag.RelationshipStore(self.params.classes.bond_types)
 
         # find average partnership durations
         self.mean_rel_duration: Dict[str, Dict] = partnering.get_mean_rel_duration(
@@ -187,11 +203,7 @@ class Population:
         else:
             agent.sex_role = sex_role
 
-        agent_params = (
-            agent.location.params.demographics[race]
-            .sex_type[sex_type]
-            .drug_type[drug_type]
-        )
+        agent_params = agent.demographics.drug_type
 
         for exposure in self.exposures:
             agent_feature = getattr(agent, exposure.name)
@@ -199,9 +211,14 @@ class Population:
 
         for bond, bond_def in loc.params.classes.bond_types.items():
             agent.partners[bond] = set()
-            dist_info = agent_params.num_partners[bond]
+            sampler = loc.samplers.get(
+                ("num_partners", race, sex_type, drug_type, bond),
+                agent_params.num_partners[bond],
+                rounding=None,
+            )
+            # drawn one at a time so seeded populations draw the same values as walking the params
             agent.mean_num_partners[bond] = ceil(
-                utils.safe_dist(dist_info, self.np_random)
+                sampler.draw_one(self.np_random)
                 * utils.safe_divide(
                     agent.location.params.calibration.sex.partner,
                     self.mean_rel_duration[bond][race],
@@ -238,8 +255,20 @@ class Population:
         for sex_type in self.params.classes.sex_types[agent.sex_type].sleeps_with:
             self.sex_partners[sex_type].add(agent)
 
+        self.partner_pool.add_agent(
+            agent,
+            [
+                bond
+                for bond, bond_agents in self.partnerable_agents.items()
+                if agent in bond_agents
+            ],
+        )
+
+        self.update_partner_deficits(agent)
+
         if self.enable_graph:
             self.graph.add_node(agent)
+            self.component_index.add_node(agent)
 
     def add_relationship(self, rel: "ag.Relationship"):
         """
@@ -249,9 +278,13 @@ class Population:
             rel : The Relationship to be added
         """
         self.relationships.add(rel)
+        self.relationship_store.add(rel)
+        self.update_partner_deficits(rel.agent1)
+        self.update_partner_deficits(rel.agent2)
 
         if self.enable_graph:
             self.graph.add_edge(rel.agent1, rel.agent2, type=rel.bond_type)
+            self.component_index.add_edge(rel.agent1, rel.agent2)
 
     def remove_agent(self, agent: "ag.Agent"):
         """
@@ -282,11 +315,17 @@ class Population:
 
         if self.enable_graph:
             self.graph.remove_node(agent)
+            self.component_index.remove_node(agent)
 
         for bond in self.partnerable_agents.values():
             if agent in bond:
                 bond.remove(agent)
 
+        for deficit_agents in self.partner_deficits.values():
+            deficit_agents.discard(agent)
+
+        self.partner_pool.remove_agent(agent)
+
         # mark agent component as -1 (no component)
         agent.component = "-1"
 
@@ -298,6 +337,7 @@ class Population:
             rel : Relationship to remove
         """
         self.relationships.remove(rel)
+        self.relationship_store.remove(rel)
 
         # without this relationship, are agents partnerable again?
         self.update_partnerability(rel.agent1)
@@ -305,6 +345,7 @@ class Population:
 
         if self.enable_graph:
             self.graph.remove_edge(rel.agent1, rel.agent2)
+            self.component_index.remove_edge(rel.agent1, rel.agent2)
 
     def get_age(self, loc: "location.Location", race: str) -> int:
         """
@@ -321,9 +362,7 @@ class Population:
         age = self.pop_random.randrange(bins[i].min, bins[i].max)
         return age
 
-    def update_agent_partners(
-        self, agent: "ag.Agent", bond_type: str, components: List
-    ) -> bool:
+    def update_agent_partners(self, agent: "ag.Agent", bond_type: str) -> bool:
         """
         Finds and bonds new partner. Creates relationship object for partnership,
             calcs partnership duration, adds it to the population, and adds to networkX graph if self.enable_graph
@@ -336,50 +375,78 @@ class Population:
         returns:
             True if no match was found for agent (used for retries)
         """
-        partnerable_agents = self.partnerable_agents[bond_type]
         if (
             self.pop_random.random()
             < self.params.partnership.network.same_component.prob
             and agent.has_partners()
         ):
-            # find agent's component
-            agent_component: Set["ag.Agent"] = set()
-            for comp in components:
-                if agent in comp:
-                    agent_component = comp
-                    break
-
-            partnerable_agents = partnerable_agents & agent_component
-
-        partner = partnering.select_partner(
-            agent,
-            partnerable_agents,
-            self.sex_partners,
-            self.pwid_agents,
-            self.params,
-            self.pop_random,
-            bond_type,
-        )
+            # restrict to the agent's component
+            if self.enable_graph and agent in self.graph:
+                agent_component = self.component_index.get_members(agent)
+            else:
+                agent_component = utils.RandomSet()
+
+            partner = self.partner_pool.select(
+                agent, bond_type, self.pop_random, agent_component
+            )
+        else:
+            # no component restriction, draw directly from the partner index
+            partner = self.partner_pool.select(agent, bond_type, self.pop_random)
         no_match = True
 
         if partner:
-            race = utils.safe_random_choice([agent.race, partner.race], self.pop_random)
-            duration = partnering.get_partnership_duration(
-                agent.location.params, self.np_random, bond_type, race
-            )
-            relationship = ag.Relationship(
-                agent, partner, duration, bond_type=bond_type
-            )
-            self.add_relationship(relationship)
-            # can partner still partner?
-            if len(partner.partners[bond_type]) > (
-                partner.target_partners[bond_type]
-                * self.params.calibration.partnership.buffer
-            ):
-                self.partnerable_agents[bond_type].remove(partner)
+            self.add_partnership(agent, partner, bond_type)
             no_match = False
         return no_match
 
+    def add_partnership(
+        self, agent: "ag.Agent", partner: "ag.Agent", bond_type: str
+    ) -> None:
+        """
+        Create a relationship between an agent and the partner they found, with a duration based on one of their races, and add it to the population.  If the partner now has too many partners, they are no longer partnerable.
+
+        args:
+            agent: Agent that was seeking a new partner
+            partner: Agent that was selected as the partner
+            bond_type: What type of bond the agent is seeking to make
+        """
+        race = utils.safe_random_choice([agent.race, partner.race], self.pop_random)
+        duration = partnering.draw_partnership_duration(
+            agent.location, self.np_random, bond_type, race
+        )
+        relationship = ag.Relationship(agent, partner, duration, bond_type=bond_type)
+        self.add_relationship(relationship)
+        # can partner still partner?
+        if len(partner.partners[bond_type]) > (
+            partner.target_partners[bond_type]
+            * self.params.calibration.partnership.buffer
+        ):
+            self.partnerable_agents[bond_type].remove(partner)
+            self.partner_pool.remove(partner, bond_type)
+
+    def use_stub_matching(self, bond_type: str) -> bool:
+        """
+        Whether partners for a bond type are first matched by pairing stubs [params.partnership.network.matching].  Stub matching isn't used for bond types with assort rules or if agents can be restricted to partnering within their component.
+
+        args:
+            bond_type: type of relationship that is being formed
+
+        returns:
+            whether to use stub matching
+        """
+        if self.params.partnership.network.matching.type != "stub":
+            return False
+
+        if self.enable_graph and self.params.partnership.network.same_component.prob:
+            return False
+
+        if self.params.features.assort_mix:
+            for rule in self.partner_pool.assort_rules:
+                if not rule.bond_types or bond_type in rule.bond_types:
+                    return False
+
+        return True
+
     def update_partner_assignments(self, t: int):
         """
         Determines which agents will seek new partners from All_agentSet.
@@ -392,27 +459,28 @@ class Population:
         if t % self.params.model.time.steps_per_year == 0:
             self.update_partner_targets()
 
-        if self.enable_graph:
-            network_components = [set(g.nodes()) for g in self.components]
-        else:
-            network_components = []
-
         # Now create partnerships until available partnerships are out
         for bond in self.params.classes.bond_types:
-            eligible_agents = deque(
-                [
+            if self.use_stub_matching(bond):
+                stub_agents = [
                     a
-                    for a in self.all_agents
-                    if len(a.partners[bond]) < a.target_partners[bond]
+                    for a in self.partner_deficits[bond]
+                    if a in self.partnerable_agents[bond]
                 ]
-            )
+                for agent, partner in partnering.match_stubs(
+                    stub_agents, bond, self.params, self.np_random
+                ):
+                    self.add_partnership(agent, partner, bond)
+
+            # agents still in need of partners seek them one at a time
+            eligible_agents = deque(self.partner_deficits[bond])
             attempts = {a: 0 for a in eligible_agents}
 
             while eligible_agents:
                 agent = eligible_agents.popleft()
                 if len(agent.partners[bond]) < agent.target_partners[bond]:
                     # no match
-                    if self.update_agent_partners(agent, bond, network_components):
+                    if self.update_agent_partners(agent, bond):
                         attempts[agent] += 1
 
                     # add agent back to eligible pool
@@ -423,6 +491,11 @@ class Population:
                     ):
                         eligible_agents.append(agent)
 
+            # agents who tried to find partners this round and are still short of them
+            self.num_unsatisfied[bond] = sum(
+                1 for a in self.partner_deficits[bond] if a in attempts
+            )
+
         if self.enable_graph:
             self.trim_graph()
 
@@ -449,24 +522,70 @@ class Population:
                     a.target_partners[bond] * self.params.calibration.partnership.buffer
                 ):
                     self.partnerable_agents[bond].remove(a)
+                    self.partner_pool.remove(a, bond)
             elif len(a.partners[bond]) < (
                 a.target_partners[bond] * self.params.calibration.partnership.buffer
             ):
                 self.partnerable_agents[bond].add(a)
+                self.partner_pool.add(a, bond)
+
+        self.update_partner_deficits(a)
+
+    def update_partner_deficits(self, a: "ag.Agent"):
+        """
+        Update which bond types an agent has fewer partners than their target for
+
+        args:
+            a: agent whose partners or targets changed
+        """
+        for bond, deficit_agents in self.partner_deficits.items():
+            if len(a.partners[bond]) < a.target_partners[bond]:
+                deficit_agents.add(a)
+            else:
+                deficit_agents.discard(a)
 
     def update_agent_components(self):
         """
         Update the component IDs associated with each agent based on the current state of the graph
         """
         if self.enable_graph:
-            self.components = utils.connected_components(self.graph)
-            for id, component in enumerate(self.components):
-                for agent in component.nodes:
-                    agent.component = str(id)
-
-            self.params.classes.components = list(
-                map(str, range(-1, len(self.components)))
+            # only relabel components whose members or rank changed
+            modified = self.component_index.pop_modified()
+            components = sorted(
+                self.component_index.members.items(),
+                key=lambda component: len(component[1]),
+                reverse=True,
             )
+            labels = {}
+            for id, (root, members) in enumerate(components):
+                label = str(id)
+                labels[root] = label
+                if root in modified or self.component_labels.get(root) != label:
+                    for agent in members:
+                        agent.component = label
+            self.component_labels = labels
+
+            component_names = list(map(str, range(-1, len(components))))
+            # only write when changed, writing to params invalidates everything compiled from them
+            if self.params.classes.get("components") != component_names:
+                self.params.classes.components = component_names
+
+    @property
+    def components(self) -> List:
+        """
+        Connected components of the graph as subgraphs, largest first (empty if graph not enabled)
+        """
+        if not self.enable_graph:
+            return []
+
+        return sorted(
+            [
+                self.graph.subgraph(members)
+                for members in self.component_index.iter_components()
+            ],
+            key=len,
+            reverse=True,
+        )
 
     def trim_graph(self):
         """
@@ -540,3 +659,5 @@ class Population:
                     a.location = utils.safe_random_choice(
                         self.geography.categories[new_loc], self.pop_random
                     )
+
+                self.partner_pool.update_agent(a)
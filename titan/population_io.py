@@ -1,6 +1,6 @@
 import os
 import csv
-from typing import Dict, Any
+from typing import Dict, Any, List
 from shutil import make_archive, unpack_archive
 from tempfile import mkdtemp
 import glob
@@ -24,9 +24,40 @@ agent_exposure_attrs = [
 
 # these are functionally saved in the relationships or other files and complicate the agent file
 agent_exclude_attrs = (
-    {"partners", "relationships"}.union(agent_feature_attrs).union(agent_exposure_attrs)
+    {"partners", "relationships", "cached_tables", "cached_demographics"}
+    .union(agent_feature_attrs)
+    .union(agent_exposure_attrs)
 )
 
+# relationship attributes saved to the relationships file
+rel_attrs = ["agent1", "agent2", "id", "duration", "total_duration", "bond_type"]
+
+
+def get_attrs(obj: Any) -> List[str]:
+    """
+    Get the names of the attributes an object holds: the `__slots__` of its class and base classes (base classes first), followed by anything in its `__dict__` if it has one.
+
+    args:
+        obj: an agent, feature or exposure
+
+    returns:
+        list of attribute names
+    """
+    attrs: List[str] = []
+    for cls in reversed(type(obj).__mro__):
+        slots = cls.__dict__.get("__slots__", ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        for attr in slots:
+            if attr not in attrs and attr not in ("__dict__", "__weakref__"):
+                attrs.append(attr)
+
+    for attr in getattr(obj, "__dict__", {}):
+        if attr not in attrs:
+            attrs.append(attr)
+
+    return attrs
+
 
 def write(pop: Population, dir: str, compress: bool = True) -> str:
     """
@@ -49,7 +80,7 @@ def write(pop: Population, dir: str, compress: bool = True) -> str:
 
     a = next(iter(pop.all_agents))
     # get all attributes
-    agent_attrs = [k for k in a.__dict__.keys() if k not in agent_exclude_attrs]
+    agent_attrs = [k for k in get_attrs(a) if k not in agent_exclude_attrs]
 
     write_class_file(agent_file, pop.all_agents, agent_attrs)
 
@@ -59,7 +90,7 @@ def write(pop: Population, dir: str, compress: bool = True) -> str:
     def write_extra_class(extra_attrs, extra_type):
         for extra in extra_attrs:
             extra_obj = getattr(a, extra)
-            extra_attrs = list(extra_obj.__dict__.keys())
+            extra_attrs = get_attrs(extra_obj)
             extra_file = os.path.join(dir, f"{pop.id}_{extra_type}_{extra}.csv")
             extra_files.append(extra_file)
             write_extra_class_file(extra_file, pop.all_agents, extra, extra_attrs)
@@ -70,9 +101,6 @@ def write(pop: Population, dir: str, compress: bool = True) -> str:
     # open relationship file
     rel_file = os.path.join(dir, f"{pop.id}_relationships.csv")
 
-    r = next(iter(pop.relationships))
-    rel_attrs = list(r.__dict__.keys())
-
     write_class_file(rel_file, pop.relationships, rel_attrs)
 
     if compress:
@@ -96,7 +124,10 @@ def write_extra_class_file(file_name, collection, extra, attrs):
         writer.writeheader()
         for item in collection:
             feat = getattr(item, extra)
-            writer.writerow({attr: repr(getattr(feat, attr)) for attr in attrs})
+            row = {attr: repr(getattr(feat, attr)) for attr in attrs}
+            # null features are shared between agents, so don't know their agent
+            row["agent"] = repr(item)
+            writer.writerow(row)
 
 
 def write_class_file(file_name, collection, attrs):
@@ -210,6 +241,9 @@ def create_agent(
     for extra in agent_extras:
         extra_row = agent_extras[extra][agent.id]
         agent_extra = getattr(agent, extra)
+        if agent_extra.is_null:
+            continue
+
         for attr, val in extra_row.items():
             if not attr == "agent":
                 setattr(agent_extra, attr, eval(val))
@@ -69,6 +69,13 @@ parser.add_argument(
     help="Path to saved population (directory or .tar.gz file)",
 )
 
+parser.add_argument(
+    "--paramscache",
+    type=str,
+    default=None,
+    help="Optional. Directory to cache parsed params in, the cached params are reused until the param or setting files change.",
+)
+
 
 def sweep_range(string):
     """
@@ -354,6 +361,7 @@ def main(
     error_on_unused: bool = False,
     save_pop: bool = False,
     pop_path: Optional[str] = None,
+    params_cache: Optional[str] = None,
 ):
     """
     Run TITAN!
@@ -370,6 +378,7 @@ def main(
         error_on_unused: error if there are parameters that are unused by the model
         save_pop: if true, will save the population to file after creation
         pop_path: path to a population to load instead of creating a new population for each run
+        params_cache: path to a directory to cache parsed params in
     """
     outfile_dir = setup_outdir(outdir, save_pop)
 
@@ -382,6 +391,7 @@ def main(
         params_path,
         outfile_dir,
         error_on_unused=error_on_unused,
+        cache_dir=params_cache,
     )
 
     # set up sweeps
@@ -434,6 +444,7 @@ def script_init():
     rows = args.rows.strip() if args.rows is not None else None
     sweepfile = args.sweepfile.strip() if args.sweepfile is not None else None
     poppath = args.poppath.strip() if args.poppath is not None else None
+    params_cache = args.paramscache.strip() if args.paramscache is not None else None
     main(
         args.setting.strip(),
         args.params.strip(),
@@ -446,6 +457,7 @@ def script_init():
         error_on_unused=args.error,
         save_pop=args.savepop,
         pop_path=poppath,
+        params_cache=params_cache,
     )
 
 
@@ -0,0 +1,293 @@
+import math
+from typing import Dict, Hashable, List, Optional, Union
+
+import numpy as np
+
+from . import distributions
+from . import parse_params
+from . import utils
+from .parse_params import ObjMap
+
+
+class Sampler:
+    """
+    A bins or distribution definition (e.g. [params.partnership.duration], [params.partnership.sex.frequency]) or a bare distribution definition [params.classes.distributions] (e.g. [params.demographics.num_partners]) compiled to numpy arrays so that values can be drawn for many agents or relationships with a single call.
+
+    When drawing single values from a numpy generator, a block of values is drawn at once and handed out in order (unless the generator is only used for a few draws, see `draw`), so the values drawn (and the state of the generator) only depend on the seed.  Other random number generators (e.g. `random.Random`) draw one value at a time exactly as the uncompiled definition would.
+    """
+
+    def __init__(
+        self,
+        defn: ObjMap,
+        cumulative: bool = False,
+        inclusive: bool = False,
+        rounding: Optional[str] = "trunc",
+        block_size: int = 256,
+    ):
+        """
+        Compile a definition into a Sampler
+
+        args:
+            defn: definition with a `type` of bins or distribution, or a distribution definition
+            cumulative: whether the bin probabilities are cumulative (see `utils.get_cumulative_bin`) instead of independent (see `utils.get_independent_bin`)
+            inclusive: whether a bin's `max` can be drawn
+            rounding: how to make values drawn from a distribution integers, `trunc` or `round`, or `None` to keep them as drawn
+            block_size: number of values to draw at once from a numpy generator
+        """
+        self.defn = defn
+        self.type = self.get_type(defn)
+        self.inclusive = inclusive
+        self.rounding = rounding
+        self.block_size = block_size
+
+        if self.type == "bins":
+            bins = list(defn.bins.values())
+            probs = np.array([b.prob for b in bins], dtype=float)
+            self.probs = np.cumsum(probs) if cumulative else probs
+            self.mins = np.array([b.min for b in bins], dtype=np.int64)
+            self.maxs = np.array([b.max for b in bins], dtype=np.int64)
+        elif self.type == "distribution":
+            self.dist_defn = defn if "dist_type" in defn else defn.distribution
+            self.dist_type = self.dist_defn.dist_type
+            self.args = [
+                utils.parse_var(d.value, d.value_type)
+                for d in self.dist_defn.vars.values()
+            ]
+            self.custom_dist = getattr(distributions, self.dist_type, None)
+        else:
+            raise Exception("Sampler must be defined as bins or distribution")
+
+        # the version of the params section compiled from, see `SamplerCache.get`
+        self.version = parse_params.get_version(defn)
+
+        self.buffer: List[Union[int, float]] = []
+        self.buffer_pos = 0
+        self.buffer_gen = None
+
+    @staticmethod
+    def get_type(defn: ObjMap) -> str:
+        """
+        Get the type of a definition, a bare distribution definition is of type distribution.
+        """
+        return "distribution" if "dist_type" in defn else defn.type
+
+    def same_as(self, other: "Sampler") -> bool:
+        """
+        Whether another sampler draws the same values as this one, i.e. it was compiled to the same arrays and arguments.
+        """
+        if (self.type, self.inclusive, self.rounding, self.block_size) != (
+            other.type,
+            other.inclusive,
+            other.rounding,
+            other.block_size,
+        ):
+            return False
+        elif self.type == "bins":
+            return (
+                np.array_equal(self.probs, other.probs)
+                and np.array_equal(self.mins, other.mins)
+                and np.array_equal(self.maxs, other.maxs)
+            )
+        else:
+            return self.dist_type == other.dist_type and self.args == other.args
+
+    def get_bins(self, rand_vals: np.ndarray) -> np.ndarray:
+        """
+        Get the index of the bin matched by each random value, the first bin whose probability is greater than or equal to the value (or the last bin if none are).
+
+        args:
+            rand_vals: random values in [0, 1)
+
+        returns:
+            array of bin indices
+        """
+        matches = rand_vals[:, np.newaxis] <= self.probs
+        return np.where(
+            matches.any(axis=1), matches.argmax(axis=1), len(self.probs) - 1
+        )
+
+    def sample_dist(self, rand_gen, size: int) -> np.ndarray:
+        """
+        Draw values from the distribution in the definition.
+
+        args:
+            rand_gen: numpy random number generator
+            size: number of values to draw
+
+        returns:
+            array of values
+        """
+        if self.dist_type == "randint":
+            start, stop = self.args
+            return np.floor(rand_gen.random(size) * (stop - start) + start)
+        elif self.custom_dist is not None:
+            return np.asarray(self.custom_dist(rand_gen, *self.args, size=size))
+        elif hasattr(rand_gen, self.dist_type):
+            return getattr(rand_gen, self.dist_type)(*self.args, size=size)
+        else:
+            raise AttributeError(f"Distribution type {self.dist_type} not found!")
+
+    def sample(self, rand_gen, size: int) -> np.ndarray:
+        """
+        Draw many values at once.
+
+        args:
+            rand_gen: numpy random number generator
+            size: number of values to draw
+
+        returns:
+            array of values, integers unless `rounding` is `None`
+        """
+        if self.type == "bins":
+            i = self.get_bins(rand_gen.random(size))
+            low = self.mins[i]
+            high = self.maxs[i] + 1 if self.inclusive else self.maxs[i]
+            values = np.floor(rand_gen.random(size) * (high - low) + low)
+        else:
+            values = self.sample_dist(rand_gen, size)
+            if self.rounding is None:
+                return values
+            elif self.rounding == "round":
+                values = np.round(values)
+            else:
+                values = np.trunc(values)
+
+        return values.astype(np.int64)
+
+    def draw(self, rand_gen, buffered: bool = True) -> Union[int, float]:
+        """
+        Draw a single value.
+
+        args:
+            rand_gen: random number generator
+            buffered: whether to draw a block of values from a numpy generator, turn off for generators only used for a few draws (e.g. the per relationship generators of counter-based streams) so that the rest of the block isn't wasted
+
+        returns:
+            a value, an integer unless `rounding` is `None`
+        """
+        if not isinstance(rand_gen, np.random.Generator):
+            return self.draw_one(rand_gen)
+        elif not buffered:
+            return self.sample(rand_gen, 1).tolist()[0]
+
+        if rand_gen is not self.buffer_gen or self.buffer_pos >= len(self.buffer):
+            self.buffer = self.sample(rand_gen, self.block_size).tolist()
+            self.buffer_pos = 0
+            self.buffer_gen = rand_gen
+
+        value = self.buffer[self.buffer_pos]
+        self.buffer_pos += 1
+        return value
+
+    def draw_one(self, rand_gen) -> Union[int, float]:
+        """
+        Draw a single value without buffering, using the random number generator the same way as walking the definition would (see `utils.safe_dist`).
+
+        args:
+            rand_gen: random number generator
+
+        returns:
+            a value, an integer unless `rounding` is `None`
+        """
+        if self.type == "bins":
+            rand_val = rand_gen.random()
+            for i, prob in enumerate(self.probs):
+                if rand_val <= prob:
+                    break
+
+            low = int(self.mins[i])
+            high = int(self.maxs[i])
+            if not self.inclusive:
+                return utils.safe_random_int(low, high, rand_gen)
+            elif low == high:
+                return low
+            else:
+                return rand_gen.randint(low, high)
+
+        value = utils.get_dist(rand_gen, self.dist_type)(*self.args)
+        if hasattr(value, "__iter__"):
+            value = value[0]
+
+        if self.rounding is None:
+            return value
+        elif self.rounding == "round":
+            return round(value)
+        else:
+            return int(value)
+
+
+class SamplerCache:
+    """
+    Compiled samplers, keyed by what they are used for (e.g. bond type and race).  A sampler is recompiled if the definition passed for its key is no longer the one it was compiled from, or if its section of the params has been changed since (see `parse_params.get_version`).  If the recompiled sampler would draw the same values, the old one is kept along with the values it has already drawn.
+    """
+
+    def __init__(self):
+        self.samplers: Dict[Hashable, Sampler] = {}
+
+    def get(self, key: Hashable, defn: ObjMap, **kwargs) -> Sampler:
+        """
+        Get the sampler for a key, compiling it from the definition if needed.
+
+        args:
+            key: what the sampler is used for
+            defn: the current definition for the key
+            **kwargs: passed to `Sampler`
+
+        returns:
+            the compiled sampler
+        """
+        sampler: Optional[Sampler] = self.samplers.get(key)
+        if (
+            sampler is None
+            or sampler.defn is not defn
+            or sampler.version != parse_params.get_version(defn)
+        ):
+            new_sampler = Sampler(defn, **kwargs)
+            if sampler is None or not sampler.same_as(new_sampler):
+                sampler = new_sampler
+                self.samplers[key] = sampler
+            else:
+                sampler.defn = defn
+                sampler.version = new_sampler.version
+
+        return sampler
+
+    def clear(self):
+        """
+        Remove all of the compiled samplers (e.g. after the params they were compiled from were scaled).
+        """
+        self.samplers.clear()
+
+
+def sparse_bernoulli(rand_gen, n: int, p: float) -> List[int]:
+    """
+    Run `n` independent trials with probability `p` of success and get which ones succeed, drawing a number of random values proportional to the number of successes instead of to `n`.  For a numpy generator the number of successes is drawn from a binomial distribution and that many trials are picked, otherwise the trials are walked by drawing the (geometric) gaps between successes.
+
+    args:
+        rand_gen: random number generator
+        n: number of trials
+        p: probability of success of each trial
+
+    returns:
+        indices of the successful trials, in increasing order
+    """
+    if n <= 0 or p <= 0:
+        return []
+    if p >= 1:
+        return list(range(n))
+
+    if isinstance(rand_gen, np.random.Generator):
+        num_successes = rand_gen.binomial(n, p)
+        return sorted(rand_gen.choice(n, num_successes, replace=False).tolist())
+
+    log_q = math.log1p(-p)
+    successes = []
+    i = -1
+    while True:
+        # 1 - random is in (0, 1] so the log is defined
+        i += int(math.log(1.0 - rand_gen.random()) / log_q) + 1
+        if i >= n:
+            break
+        successes.append(i)
+
+    return successes
@@ -0,0 +1,292 @@
+import hashlib
+import random
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np  # type: ignore
+
+
+class RandomStream(random.Random):
+    """
+    A `random.Random` whose uniform draws are handed out from blocks drawn at once from a numpy Generator.  All of the other methods (`randint`, `choice`, `shuffle`, `betavariate`, etc.) are built on `random()`, so they draw from the blocks as well.
+
+    The numpy Generator is available as `gen` for drawing from other distributions (e.g. poisson) on the same stream.
+    """
+
+    def __init__(self, gen: np.random.Generator, block_size: int = 1024):
+        """
+        Create a stream drawing from a numpy Generator
+
+        args:
+            gen: the numpy random number generator to draw blocks from
+            block_size: the number of uniforms to draw at once
+        """
+        self.gen = gen
+        self.block_size = block_size
+        self.buffer: List[float] = []
+        self.buffer_pos = 0
+        super().__init__()
+
+    def random(self) -> float:
+        """
+        Get the next uniform value in [0, 1) from the stream.
+        """
+        if self.buffer_pos >= len(self.buffer):
+            self.buffer = self.gen.random(self.block_size).tolist()
+            self.buffer_pos = 0
+
+        value = self.buffer[self.buffer_pos]
+        self.buffer_pos += 1
+        return value
+
+    def __reduce__(self):
+        return (
+            self.__class__,
+            (self.gen, self.block_size),
+            {"buffer": self.buffer, "buffer_pos": self.buffer_pos},
+        )
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+
+class RandomStreams:
+    """
+    Independent, named `RandomStream`s derived from one seed.  Each stream's generator is seeded from the seed and the stream's name, so a stream draws the same values for a given seed no matter how many values are drawn from the other streams.
+    """
+
+    def __init__(self, seed: int, block_size: int = 1024):
+        """
+        Create the streams for a seed
+
+        args:
+            seed: the seed all streams are derived from (e.g. the model's run seed)
+            block_size: the number of uniforms each stream draws at once
+        """
+        self.seed = seed
+        self.block_size = block_size
+        self.streams: Dict[str, RandomStream] = {}
+
+    def get(self, name: str) -> RandomStream:
+        """
+        Get a named stream, creating it the first time it is used.
+
+        args:
+            name: name of the stream (e.g. a feature's name)
+
+        returns:
+            the stream
+        """
+        stream = self.streams.get(name)
+        if stream is None:
+            # a stable (not per process) key for the name
+            key = int.from_bytes(hashlib.sha256(name.encode()).digest()[:8], "little")
+            seed_seq = np.random.SeedSequence(self.seed, spawn_key=(key,))
+            stream = RandomStream(
+                np.random.Generator(np.random.PCG64(seed_seq)), self.block_size
+            )
+            self.streams[name] = stream
+
+        return stream
+
+
+# Philox4x32-10 constants (Salmon et al. 2011, "Parallel random numbers: as easy as 1, 2, 3")
+PHILOX_M0 = 0xD2511F53
+PHILOX_M1 = 0xCD9E8D57
+PHILOX_W0 = 0x9E3779B9
+PHILOX_W1 = 0xBB67AE85
+PHILOX_ROUNDS = 10
+MASK_32 = 0xFFFFFFFF
+
+
+def philox(counter: Tuple[int, int, int, int], key: Tuple[int, int]) -> List[int]:
+    """
+    The Philox4x32-10 counter-based random number generator: a bijection of a counter of four 32 bit words under a key of two 32 bit words.
+
+    args:
+        counter: four 32 bit words
+        key: two 32 bit words
+
+    returns:
+        four random 32 bit words
+    """
+    c0, c1, c2, c3 = counter
+    k0, k1 = key
+    for _ in range(PHILOX_ROUNDS):
+        p0 = PHILOX_M0 * c0
+        p1 = PHILOX_M1 * c2
+        c0, c1, c2, c3 = (
+            (p1 >> 32) ^ c1 ^ k0,
+            p1 & MASK_32,
+            (p0 >> 32) ^ c3 ^ k1,
+            p0 & MASK_32,
+        )
+        k0 = (k0 + PHILOX_W0) & MASK_32
+        k1 = (k1 + PHILOX_W1) & MASK_32
+
+    return [c0, c1, c2, c3]
+
+
+def philox_array(counter: np.ndarray, key: Tuple[int, int]) -> np.ndarray:
+    """
+    `philox` for many counters at once.
+
+    args:
+        counter: array of shape (4, n) of 32 bit words
+        key: two 32 bit words
+
+    returns:
+        array of shape (4, n) of random 32 bit words
+    """
+    c0, c1, c2, c3 = counter.astype(np.uint64)
+    k0, k1 = key
+    mask = np.uint64(MASK_32)
+    shift = np.uint64(32)
+    for _ in range(PHILOX_ROUNDS):
+        p0 = np.uint64(PHILOX_M0) * c0
+        p1 = np.uint64(PHILOX_M1) * c2
+        c0, c1, c2, c3 = (
+            (p1 >> shift) ^ c1 ^ np.uint64(k0),
+            p1 & mask,
+            (p0 >> shift) ^ c3 ^ np.uint64(k1),
+            p0 & mask,
+        )
+        k0 = (k0 + PHILOX_W0) & MASK_32
+        k1 = (k1 + PHILOX_W1) & MASK_32
+
+    return np.stack([c0, c1, c2, c3])
+
+
+class CounterRandom:
+    """
+    Counter-based random numbers: each value is a function of the seed, the time step, the id of an agent or relationship, what the value is used for (`purpose`) and an index, computed with `philox`.  Values don't depend on the order agents or relationships are processed in, so they can be drawn one at a time (`random`, `stream`) or for many agents at once (`uniforms`) and get the same values.
+    """
+
+    def __init__(self, seed: int):
+        """
+        Create the counter-based generator for a seed
+
+        args:
+            seed: seed the values are derived from (e.g. the model's run seed)
+        """
+        self.seed = seed
+        self.key = (seed & MASK_32, (seed >> 32) & MASK_32)
+        self.purpose_codes: Dict[str, int] = {}
+
+    def get_purpose_code(self, purpose: str) -> int:
+        """
+        A stable (not per process) 32 bit code for a purpose.
+        """
+        code = self.purpose_codes.get(purpose)
+        if code is None:
+            code = int.from_bytes(
+                hashlib.sha256(purpose.encode()).digest()[:4], "little"
+            )
+            self.purpose_codes[purpose] = code
+        return code
+
+    def random(self, step: int, entity_id: int, purpose: str, index: int = 0) -> float:
+        """
+        Get a uniform value in [0, 1).
+
+        args:
+            step: the time step
+            entity_id: id of the agent or relationship
+            purpose: what the value is used for (e.g. `agent|hiv`)
+            index: which of the values for this step, entity and purpose
+
+        returns:
+            the value
+        """
+        words = philox(
+            (
+                int(entity_id) & MASK_32,
+                int(step) & MASK_32,
+                self.get_purpose_code(purpose),
+                (index >> 1) & MASK_32,
+            ),
+            self.key,
+        )
+        i = (index & 1) * 2
+        return ((words[i] >> 5) * 67108864 + (words[i + 1] >> 6)) / 9007199254740992
+
+    def uniforms(
+        self, step: int, entity_ids: np.ndarray, purpose: str, index: int = 0
+    ) -> np.ndarray:
+        """
+        Get a uniform value in [0, 1) for each of many entities, the same values `random` gives for each of them.
+
+        args:
+            step: the time step
+            entity_ids: ids of the agents or relationships
+            purpose: what the values are used for (e.g. `agent|hiv`)
+            index: which of the values for this step, entities and purpose
+
+        returns:
+            array of values
+        """
+        entity_ids = np.asarray(entity_ids, dtype=np.int64)
+        counter = np.empty((4, len(entity_ids)), dtype=np.uint64)
+        counter[0] = entity_ids.astype(np.uint64) & np.uint64(MASK_32)
+        counter[1] = step & MASK_32
+        counter[2] = self.get_purpose_code(purpose)
+        counter[3] = (index >> 1) & MASK_32
+        words = philox_array(counter, self.key)
+        i = (index & 1) * 2
+        high = (words[i] >> np.uint64(5)).astype(np.float64)
+        low = (words[i + 1] >> np.uint64(6)).astype(np.float64)
+        return (high * 67108864 + low) / 9007199254740992
+
+    def stream(self, step: int, entity_id: int, purpose: str) -> "CounterStream":
+        """
+        Get a `random.Random` handing out the values for a step, entity and purpose in order of index.
+        """
+        return CounterStream(self, step, entity_id, purpose)
+
+
+class CounterStream(random.Random):
+    """
+    A `random.Random` drawing the successive values of a `CounterRandom` for one time step, agent or relationship and purpose.  The numpy Generator `gen` (for other distributions, e.g. poisson) is a numpy Philox generator seeded from the seed, time step, entity and purpose.
+    """
+
+    def __init__(
+        self, counter_random: CounterRandom, step: int, entity_id: int, purpose: str
+    ):
+        self.counter_random = counter_random
+        self.step = step
+        self.entity_id = entity_id
+        self.purpose = purpose
+        self.index = 0
+        self.np_gen: Optional[np.random.Generator] = None
+        super().__init__()
+
+    def random(self) -> float:
+        value = self.counter_random.random(
+            self.step, self.entity_id, self.purpose, self.index
+        )
+        self.index += 1
+        return value
+
+    @property
+    def gen(self) -> np.random.Generator:
+        if self.np_gen is None:
+            # the entity, step and purpose go in the seed rather than the counter, as the counter is incremented as values are drawn
+            seed_seq = np.random.SeedSequence(
+                self.counter_random.seed,
+                spawn_key=(
+                    int(self.entity_id) & MASK_32,
+                    int(self.step) & MASK_32,
+                    self.counter_random.get_purpose_code(self.purpose),
+                ),
+            )
+            self.np_gen = np.random.Generator(np.random.Philox(seed_seq))
+        return self.np_gen
+
+    def __reduce__(self):
+        return (
+            self.__class__,
+            (self.counter_random, self.step, self.entity_id, self.purpose),
+            {"index": self.index, "np_gen": self.np_gen},
+        )
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
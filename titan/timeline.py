@@ -0,0 +1,108 @@
+import logging
+from typing import Dict, List, NamedTuple, Optional
+
+from . import utils
+from .parse_params import ObjMap
+
+
+class ParamLayer(NamedTuple):
+    """
+    A params object scaled by the timeline and the params it is layered over (see `Location.create_params`)
+    """
+
+    params: ObjMap
+    base: Optional[ObjMap]
+
+
+class ParamChange(NamedTuple):
+    """
+    A scaling (or un-scaling if `undo`) of one param in one layer at a time step
+    """
+
+    layer: int
+    param: str
+    scalar: float
+    undo: bool
+
+
+class Timeline:
+    """
+    The timeline scaling definitions [params.timeline_scaling] of the model's params and each location's params, compiled into a schedule of the param changes to make at each time step.  Stepping the timeline only touches the params changing at that step.
+
+    The changes are written to the params, so anything compiled from them (e.g. samplers and param tables) sees them through the params' versions (see `parse_params.get_version`).
+    """
+
+    def __init__(self, params: ObjMap):
+        """
+        Create a timeline for the model's params
+
+        args:
+            params: model parameters
+        """
+        self.params = params
+        self.layers: List[ParamLayer] = []
+        self.schedule: Dict[int, List[ParamChange]] = {}
+        # the definitions the schedule was compiled from, the schedule is recompiled if they are replaced
+        self.compiled_from: Optional[ObjMap] = None
+
+    def add_layer(self, params: ObjMap, base: Optional[ObjMap] = None):
+        """
+        Add a params object to be scaled per its timeline scaling definitions.
+
+        args:
+            params: the params to scale
+            base: the params `params` is layered over, if any
+        """
+        self.layers.append(ParamLayer(params, base))
+        self.compiled_from = None
+
+    def compile(self):
+        """
+        Build the schedule of param changes from the layers' timeline scaling definitions.  A param is scaled at its `start_time` and un-scaled at its `stop_time`.
+        """
+        self.schedule = {}
+        for i, layer in enumerate(self.layers):
+            for defn in layer.params.timeline_scaling.timeline.values():
+                param = defn.parameter
+                if param == "ts_default":
+                    continue
+
+                self.schedule.setdefault(defn.start_time, []).append(
+                    ParamChange(i, param, defn.scalar, False)
+                )
+                if defn.stop_time != defn.start_time:
+                    self.schedule.setdefault(defn.stop_time, []).append(
+                        ParamChange(i, param, defn.scalar, True)
+                    )
+
+        self.compiled_from = self.params.timeline_scaling.timeline
+
+    def step(self, time: int):
+        """
+        Make the param changes scheduled for a time step.
+
+        args:
+            time: the current time step
+        """
+        if self.compiled_from is not self.params.timeline_scaling.timeline:
+            self.compile()
+
+        changes = self.schedule.get(time)
+        if not changes:
+            return
+
+        for change in changes:
+            layer = self.layers[change.layer]
+            if change.undo:
+                logging.info(f"timeline un-scaling - {change.param}")
+                scalar = 1 / change.scalar
+            else:
+                logging.info(f"timeline scaling - {change.param}")
+                scalar = change.scalar
+
+            # values a layer still shares with the model params are scaled with them
+            if not (
+                layer.base is self.params
+                and utils.is_shared_param(layer.params, layer.base, change.param)
+            ):
+                utils.scale_param(layer.params, change.param, scalar, base=layer.base)
@@ -1,6 +1,23 @@
 import random
+from collections.abc import MutableSet
 from functools import wraps
-from typing import TypeVar, Collection, Union, Iterable, Dict, Tuple, Set
+from typing import (
+    Callable,
+    TypeVar,
+    Collection,
+    Union,
+    Iterable,
+    Iterator,
+    Dict,
+    Tuple,
+    Set,
+    List,
+    Type,
+    Optional,
+    Any,
+    Hashable,
+)
+from collections import OrderedDict, namedtuple
 from math import floor
 import logging
 import os
@@ -12,23 +29,87 @@ import oyaml as yaml  # type: ignore
 import networkx as nx  # type: ignore
 
 from . import distributions
+from . import parse_params
 from .parse_params import ObjMap
 
+MemoInfo = namedtuple("MemoInfo", ["hits", "misses", "maxsize", "currsize"])
 
-def memo(f):
+# memoized functions by qualified name, see get_memo_info
+memoized: Dict[str, Callable] = {}
+
+
+def memo_key(arg: Any) -> Hashable:
+    """
+    The key to cache an argument under.  ObjMaps all hash the same (see `ObjMap.__hash__`), so they are keyed by identity instead, along with their version so results from before they were changed aren't used (see `parse_params.get_version`).  Other objects holding params (e.g. locations) are keyed the same way by their `params_version`.
+    """
+    if type(arg) is ObjMap:
+        return (ObjMap, id(arg), parse_params.get_version(arg))
+    params_version = getattr(arg, "params_version", None)
+    if params_version is not None:
+        return (type(arg), id(arg), params_version)
+    return arg
+
+
+def memo(f: Optional[Callable] = None, *, maxsize: int = 1024):
     """
     Decorator to memoize a function
     (caches results given args, only use if deterministic)
+
+    The cache holds at most `maxsize` results, evicting the least recently used.  Results for params which have since been changed are no longer looked up (see `memo_key`) and are evicted in turn.  Counts of cache hits and misses are available from the memoized function's `cache_info()` (or for all memoized functions from `get_memo_info`).
+
+    args:
+        f: function to memoize
+        maxsize: the maximum number of results to cache
     """
-    cache = {}
 
-    @wraps(f)
-    def wrap(*arg):
-        if arg not in cache:
-            cache[arg] = f(*arg)
-        return cache[arg]
+    def decorator(f):
+        cache: OrderedDict = OrderedDict()
+        hits = misses = 0
+
+        @wraps(f)
+        def wrap(*args):
+            nonlocal hits, misses
+            key = tuple([memo_key(arg) for arg in args])
+            entry = cache.get(key)
+            if entry is not None:
+                hits += 1
+                cache.move_to_end(key)
+                return entry[0]
 
-    return wrap
+            misses += 1
+            value = f(*args)
+            # the args are held with the value so ids used as keys aren't reused
+            cache[key] = (value, args)
+            if len(cache) > maxsize:
+                cache.popitem(last=False)
+            return value
+
+        def cache_info() -> MemoInfo:
+            return MemoInfo(hits, misses, maxsize, len(cache))
+
+        def cache_clear():
+            nonlocal hits, misses
+            cache.clear()
+            hits = misses = 0
+
+        wrap.cache_info = cache_info  # type: ignore[attr-defined]
+        wrap.cache_clear = cache_clear  # type: ignore[attr-defined]
+        memoized[f"{f.__module__}.{f.__qualname__}"] = wrap
+        return wrap
+
+    if f is None:
+        return decorator
+    return decorator(f)
+
+
+def get_memo_info() -> Dict[str, MemoInfo]:
+    """
+    Get the cache hits, misses and sizes of all memoized functions, e.g. for profiling.
+
+    returns:
+        dictionary of function name to its `MemoInfo`
+    """
+    return {name: f.cache_info() for name, f in memoized.items()}  # type: ignore[attr-defined]
 
 
 def get_check_rand_int(seed: int) -> int:
@@ -70,6 +151,129 @@ def safe_divide(numerator: int, denominator: int) -> float:
 T = TypeVar("T")
 
 
+def null_setattr(self, name: str, value):
+    # writes to a disabled feature are ignored, it stays inactive
+    pass
+
+
+def make_null(cls: Type[T]) -> T:
+    """
+    Create an immutable instance of a feature or exposure class to be shared by all agents for which it is disabled.  The instance has the attribute values set by the class's constructor and no agent.  Assigning an attribute on it does nothing, so that writes from elsewhere in the model leave it inactive.  Its methods have no agent to act on, so callers must not call them on the null instance (check `is_null`).  Pickling the instance stores a reference to the class's `get_null`.
+
+    args:
+        cls: feature or exposure class
+
+    returns:
+        the null instance
+    """
+    null_cls = type(
+        f"Null{cls.__name__}",
+        (cls,),
+        {
+            "__slots__": (),
+            "__module__": cls.__module__,
+            "__setattr__": null_setattr,
+            # unpickle to the class's shared null instance
+            "__reduce__": lambda self: (cls.get_null, ()),  # type: ignore[attr-defined]
+            "is_null": True,
+        },
+    )
+    obj = cls(None)  # type: ignore[call-arg]
+    obj.__class__ = null_cls
+    return obj
+
+
+class RandomSet(MutableSet):
+    """
+    A set which supports uniform random selection of a member in constant time.  Members are stored in a list with a mapping from member to position, removals swap the last member into the removed member's position.
+
+    Iteration order depends only on the order of additions and removals (not on hashing), so seeded runs are reproducible.
+    """
+
+    def __init__(self, items: Iterable = ()):
+        """
+        Create a RandomSet
+
+        args:
+            items: initial members of the set
+        """
+        self.items: List = []
+        self.positions: Dict = {}
+        for item in items:
+            self.add(item)
+
+    def __contains__(self, item) -> bool:
+        return item in self.positions
+
+    def __iter__(self) -> Iterator:
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def __getitem__(self, i: int):
+        """
+        Get the member at position `i` in the set's iteration order
+        """
+        return self.items[i]
+
+    def __repr__(self) -> str:
+        return f"RandomSet({self.items!r})"
+
+    def __copy__(self) -> "RandomSet":
+        new = self.__class__.__new__(self.__class__)
+        new.items = self.items.copy()
+        new.positions = self.positions.copy()
+        return new
+
+    copy = __copy__
+
+    def add(self, item):
+        """
+        Add an item to the set (if not already present)
+        """
+        if item not in self.positions:
+            self.positions[item] = len(self.items)
+            self.items.append(item)
+
+    def discard(self, item):
+        """
+        Remove an item from the set (if present)
+        """
+        i = self.positions.pop(item, None)
+        if i is not None:
+            last = self.items.pop()
+            if i < len(self.items):
+                self.items[i] = last
+                self.positions[last] = i
+
+    def update(self, items: Iterable):
+        """
+        Add all of the items to the set
+        """
+        for item in items:
+            self.add(item)
+
+    def clear(self):
+        """
+        Remove all items from the set
+        """
+        self.items.clear()
+        self.positions.clear()
+
+    def choice(self, rand_gen):
+        """
+        Select a member uniformly at random
+
+        args:
+            rand_gen: random number generator
+
+        returns:
+            a member, or `None` if the set is empty
+        """
+        return safe_random_choice(self.items, rand_gen)
+
+
 def safe_random_choice(seq, rand_gen, weights=None):
     """
     Return None or a random choice from a collection of items
@@ -85,7 +289,9 @@ def safe_random_choice(seq, rand_gen, weights=None):
     if not seq:
         return None
 
-    if isinstance(seq, set):
+    if isinstance(seq, RandomSet):
+        seq = seq.items
+    elif isinstance(seq, set):
         seq = tuple(seq)
 
     # don't call out to random choices if we don't need to (for performance)
@@ -125,7 +331,7 @@ def safe_shuffle(seq: Collection[T], rand_gen) -> Iterable[T]:
         shuffled sequence, or `None` if empty
     """
     if seq:
-        if isinstance(seq, set):
+        if isinstance(seq, (set, RandomSet)):
             seq = list(seq)
         rand_gen.shuffle(seq)
         return seq
@@ -184,40 +390,78 @@ def binom_0(n: int, p: float):
     return (1 - p) ** n
 
 
-def get_param_from_path(params: ObjMap, param_path: str, delimiter: str):
+def get_param_from_path(
+    params: ObjMap, param_path: str, delimiter: str, base: Optional[ObjMap] = None
+):
     """
     Given a params object and a delimited path, get the leaf of the params tree
     and the last key to access it
+
+    If `base` is passed, `params` is a layer over it (see `Location.create_params`) and any part of the path `params` still shares with `base` is copied first, so the leaf can be changed without changing `base`.
     """
     path = param_path.split(delimiter)
     path_params = params
+    base_params = base
     for p in path[:-1]:
+        key: Any = p
         try:
-            path_params = path_params[p]
+            next_params = path_params[key]
         except KeyError:
-            path_params = path_params[int(p)]
+            key = int(p)
+            next_params = path_params[key]
+
+        if base_params is not None:
+            base_params = dict.get(base_params, key)
+            if next_params is base_params:
+                # the copy holds the same values, so it isn't a change to the params
+                next_params = parse_params.copy_into(next_params, path_params)
+                dict.__setitem__(path_params, key, next_params)
+
+        path_params = next_params
 
     return path_params, path[-1]
 
 
-def scale_param(params: ObjMap, param_path: str, scalar: float, delimiter="|"):
+def is_shared_param(params: ObjMap, base: ObjMap, param_path: str, delimiter="|"):
+    """
+    Whether a params layer still shares the leaf of a parameter path with the params it was layered over (i.e. changing the value in `base` changes it in `params`)
+    """
+    return (
+        get_param_from_path(params, param_path, delimiter)[0]
+        is get_param_from_path(base, param_path, delimiter)[0]
+    )
+
+
+def scale_param(
+    params: ObjMap,
+    param_path: str,
+    scalar: float,
+    delimiter="|",
+    base: Optional[ObjMap] = None,
+):
     """
     Given the params and a parameter path in the format prep|cap, scale the
-    current value by the scalar
+    current value by the scalar.  If `base` is passed, `params` is copied on write (see `get_param_from_path`).
     """
-    scaling_item, last_key = get_param_from_path(params, param_path, delimiter)
+    scaling_item, last_key = get_param_from_path(params, param_path, delimiter, base)
 
     old_val = scaling_item[last_key]
     logging.info(f"scaling - {param_path}: {old_val} => {old_val * scalar}")
     scaling_item[last_key] = old_val * scalar
 
 
-def override_param(params: ObjMap, param_path: str, value, delimiter="|"):
+def override_param(
+    params: ObjMap,
+    param_path: str,
+    value,
+    delimiter="|",
+    base: Optional[ObjMap] = None,
+):
     """
     Given the params and a parameter path in the format prep|cap, change the
-    current value to new value
+    current value to new value.  If `base` is passed, `params` is copied on write (see `get_param_from_path`).
     """
-    override_item, last_key = get_param_from_path(params, param_path, delimiter)
+    override_item, last_key = get_param_from_path(params, param_path, delimiter, base)
     try:
         old_val = override_item[last_key]
     except KeyError:
@@ -264,6 +508,162 @@ def connected_components(graph):
     )
 
 
+class DynamicComponents:
+    """
+    Connected components of a graph which is changing over time.  Added edges merge components with union-find, removed edges and nodes only mark their component as dirty, and dirty components are split apart (by a search over the graph restricted to the component's members) the next time the components are read.
+
+    Components are identified by a root member, which changes if the component is merged or rebuilt.
+    """
+
+    def __init__(self, neighbors: Callable[[T], Iterable[T]]):
+        """
+        Create an empty set of components
+
+        args:
+            neighbors: function returning the current neighbors of a node in the graph
+        """
+        self.neighbors = neighbors
+        self.parent: Dict = {}
+        # root -> members of the component (as a RandomSet so members can be sampled)
+        self.members: Dict[T, RandomSet] = {}
+        # roots of components which may need to be split
+        self.dirty: Set = set()
+        # roots of components whose members changed since `pop_modified`
+        self.modified: Set = set()
+        # nodes removed since the last rebuild
+        self.removed: Set = set()
+
+    def __len__(self) -> int:
+        self.rebuild()
+        return len(self.members)
+
+    def find(self, node: T) -> T:
+        """
+        Find the root of a node's component (without rebuilding dirty components)
+        """
+        parent = self.parent
+        while parent[node] is not node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def add_node(self, node: T):
+        """
+        Add a node to the graph as its own component
+        """
+        if node in self.removed:
+            self.rebuild()
+
+        if node not in self.parent:
+            self.parent[node] = node
+            self.members[node] = RandomSet([node])
+            self.modified.add(node)
+
+    def remove_node(self, node: T):
+        """
+        Remove a node (and implicitly its edges) from the graph
+        """
+        if node not in self.parent:
+            return
+
+        root = self.find(node)
+        self.members[root].discard(node)
+        self.removed.add(node)
+        self.dirty.add(root)
+        self.modified.add(root)
+
+    def add_edge(self, node1: T, node2: T):
+        """
+        Add an edge to the graph (and the nodes if not already present), merging the nodes' components (the smaller into the larger)
+        """
+        self.add_node(node1)
+        self.add_node(node2)
+        root1 = self.find(node1)
+        root2 = self.find(node2)
+        if root1 is root2:
+            return
+
+        if len(self.members[root1]) < len(self.members[root2]):
+            root1, root2 = root2, root1
+
+        self.parent[root2] = root1
+        self.members[root1] |= self.members.pop(root2)
+        self.modified.discard(root2)
+        self.modified.add(root1)
+        if root2 in self.dirty:
+            self.dirty.discard(root2)
+            self.dirty.add(root1)
+
+    def remove_edge(self, node1: T, node2: T):
+        """
+        Remove an edge from the graph, the nodes' component may need to be split
+        """
+        self.dirty.add(self.find(node1))
+
+    def rebuild(self):
+        """
+        Split apart any dirty components based on the current state of the graph
+        """
+        for root in self.dirty:
+            nodes = self.members.pop(root)
+            self.modified.discard(root)
+            unseen = set(nodes)
+            for node in nodes:
+                if node not in unseen:
+                    continue
+
+                unseen.discard(node)
+                component = RandomSet([node])
+                stack = [node]
+                while stack:
+                    for neighbor in self.neighbors(stack.pop()):
+                        if neighbor in unseen:
+                            unseen.discard(neighbor)
+                            component.add(neighbor)
+                            stack.append(neighbor)
+
+                for member in component:
+                    self.parent[member] = node
+                self.members[node] = component
+                self.modified.add(node)
+
+        self.dirty.clear()
+
+        # removed nodes are no longer part of any component
+        for node in self.removed:
+            del self.parent[node]
+        self.removed.clear()
+
+    def get_root(self, node: T) -> T:
+        """
+        Get the root member identifying a node's component
+        """
+        self.rebuild()
+        return self.find(node)
+
+    def get_members(self, node: T) -> RandomSet:
+        """
+        Get the members of a node's component
+        """
+        return self.members[self.get_root(node)]
+
+    def iter_components(self) -> Iterator[RandomSet]:
+        """
+        Iterate over the members of each component
+        """
+        self.rebuild()
+        return iter(self.members.values())
+
+    def pop_modified(self) -> Set:
+        """
+        Get the roots of components whose members have changed since this was last called
+        """
+        self.rebuild()
+        modified = self.modified
+        self.modified = set()
+        return modified
+
+
 def get_independent_bin(rand_gen, bin_def: ObjMap) -> int:
     """
     Get the bin key given independent bins.  A probability is selected at random, then each bin's `prob` is compared to it, the first bin that has a `prob` less than or equal to that probability is returned.